@@ -1,8 +1,16 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import threading
+import time
 from typing import Any, Set
+from urllib.parse import urlsplit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import xml.etree.ElementTree as xml
 from pprint import pprint
+from resource_cache import cache_for
 from team import Team
 from player import Player
 from stats import *
@@ -10,34 +18,285 @@ from stats import *
 
 BASE_DIR = Path(__file__).resolve().parent
 CACHE_DIR = BASE_DIR / "matches"
+BBAPI_URL = "http://bbapi.buzzerbeater.com"
+
+
+def check_document(text: str) -> None:
+    """Raise ValueError for a BBAPI document that must not be cached: errors
+    such as NotAuthorized come back with HTTP 200 as an <error> element."""
+    root = xml.fromstring(text)
+    error = root.find("error")
+    if error is not None:
+        raise ValueError(f"BBAPI error: {error.get('message', '')}")
+
+
+def is_played(row: dict[str, str]) -> bool:
+    """True for a schedule_matches row with both scores: the match is over."""
+    return bool(row["home_score"] and row["away_score"])
+
+
+def parse_schedule(data: str) -> list[dict[str, str]]:
+    """One row per match of a schedule.aspx document."""
+    root = xml.fromstring(data)
+    rows: list[dict[str, str]] = []
+
+    for match in root.findall("./schedule/match"):
+        match_id = match.attrib.get("id", "")
+        if not match_id:
+            continue
+
+        away = match.find("./awayTeam")
+        home = match.find("./homeTeam")
+        away_score = away.findtext("./score", "") if away is not None else ""
+        home_score = home.findtext("./score", "") if home is not None else ""
+
+        rows.append(
+            {
+                "id": match_id,
+                "start": match.attrib.get("start", ""),
+                "type": match.attrib.get("type", ""),
+                "away_team": away.findtext("./teamName", "") if away is not None else "",
+                "home_team": home.findtext("./teamName", "") if home is not None else "",
+                "away_score": away_score.strip() if away_score else "",
+                "home_score": home_score.strip() if home_score else "",
+            }
+        )
+
+    return rows
+
+
+def parse_boxscore(data: str) -> list[Team]:
+    """[away, home] Teams with the full-game box score of a boxscore.aspx
+    document."""
+    root = xml.fromstring(data)
+    away = root.find("./match/awayTeam")
+    home = root.find("./match/homeTeam")
+    xml_teams = [away, home]
+    bb_teams = [Team(), Team()]
+
+    for index, xml_team in enumerate(xml_teams):
+        bb_team = bb_teams[index]
+
+        assert isinstance(xml_team, xml.Element), ""
+        bb_team.id = int(xml_team.attrib["id"])
+        bb_team.name = xml_team.find("./teamName").text
+
+        bb_team.off_strategy = xml_team.find("./offStrategy").text
+        bb_team.def_strategy = xml_team.find("./defStrategy").text
+
+        quarters = xml_team.find("./score").attrib["partials"].split(",")
+        for i in range(len(quarters)):
+            bb_team.push_stat_sheet()
+        for num, pts in enumerate(quarters):
+            bb_team.stats.qtr[num].sheet[Statistic.Points] = int(pts)
+
+        totals = xml_team.find("./boxscore/teamTotals")
+
+        def add_team_stat(stat: Statistic, val: int):
+            bb_team.stats.full.sheet[stat] = val
+
+        def team_stat(s: str) -> int:
+            return int(totals.find(s).text)
+
+        add_team_stat(Statistic.Points, team_stat("./pts"))
+        add_team_stat(Statistic.FieldGoalsAtt, team_stat("./fga"))
+        add_team_stat(Statistic.FieldGoalsMade, team_stat("./fgm"))
+        add_team_stat(Statistic.ThreePointsAtt, team_stat("./tpa"))
+        add_team_stat(Statistic.ThreePointsMade, team_stat("./tpm"))
+        add_team_stat(Statistic.FreeThrowsAtt, team_stat("./fta"))
+        add_team_stat(Statistic.FreeThrowsMade, team_stat("./ftm"))
+        add_team_stat(Statistic.OffRebounds, team_stat("./oreb"))
+        add_team_stat(
+            Statistic.DefRebounds, team_stat("./reb") - team_stat("./oreb")
+        )
+        add_team_stat(Statistic.Assists, team_stat("./ast"))
+        add_team_stat(Statistic.Turnovers, team_stat("./to"))
+        add_team_stat(Statistic.Steals, team_stat("./stl"))
+        add_team_stat(Statistic.Blocks, team_stat("./blk"))
+        add_team_stat(Statistic.Fouls, team_stat("./pf"))
+
+        players = xml_team.findall("./boxscore/player")
+        for xml_player in players:
+            bb_player = Player()
+
+            assert isinstance(xml_player, xml.Element), ""
+            bb_player.id = int(xml_player.attrib["id"])
+            bb_player.name = f"{xml_player.find('./firstName').text} {xml_player.find('./lastName').text}"
+
+            perf = xml_player.find("./performance")
+            mins = xml_player.find("./minutes")
+
+            def add_stat(s: Statistic, val: int):
+                bb_player.stats.full.sheet[s] = val
+
+            def stat(s: str) -> int:
+                return int(perf.find(s).text)
+
+            def minutes(s: str) -> int:
+                return int(mins.find(s).text)
+
+            add_stat(Statistic.SecsPG, minutes("./PG") * 60)
+            add_stat(Statistic.SecsSG, minutes("./SG") * 60)
+            add_stat(Statistic.SecsSF, minutes("./SF") * 60)
+            add_stat(Statistic.SecsPF, minutes("./PF") * 60)
+            add_stat(Statistic.SecsC, minutes("./C") * 60)
+
+            add_stat(Statistic.Points, stat("./pts"))
+            add_stat(Statistic.FieldGoalsAtt, stat("./fga"))
+            add_stat(Statistic.FieldGoalsMade, stat("./fgm"))
+            add_stat(Statistic.ThreePointsAtt, stat("./tpa"))
+            add_stat(Statistic.ThreePointsMade, stat("./tpm"))
+            add_stat(Statistic.FreeThrowsAtt, stat("./fta"))
+            add_stat(Statistic.FreeThrowsMade, stat("./ftm"))
+            add_stat(Statistic.OffRebounds, stat("./oreb"))
+            add_stat(
+                Statistic.DefRebounds,
+                (stat("./reb") - stat("./oreb")),
+            )
+            add_stat(Statistic.Assists, stat("./ast"))
+            add_stat(Statistic.Turnovers, stat("./to"))
+            add_stat(Statistic.Steals, stat("./stl"))
+            add_stat(Statistic.Blocks, stat("./blk"))
+            add_stat(Statistic.Fouls, stat("./pf"))
+            bb_team.players.append(bb_player)
+
+    return bb_teams
+
+
+# Network defaults: connections kept alive per host, (connect, read)
+# timeouts in seconds, and retries of connection errors and 5xx responses
+# with exponential backoff (backoff * 2 ** retry seconds)
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+RETRIES = 3
+BACKOFF = 0.5
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class RateLimiter:
+    """Spaces calls shared by any number of threads to `rate` per second on
+    average, letting up to `burst` through at once after an idle spell."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.next_free = time.monotonic()
+        self.waited = 0.0
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next_free, now - (self.burst - 1) * self.interval)
+            self.next_free = start + self.interval
+            delay = start - now
+            if delay > 0:
+                self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
 
 
 class Network:
-    def __init__(self):
-        self.cookies = None
+    """BBAPI transport: one pooled keep-alive session, so consecutive calls
+    reuse the connection instead of each paying a new handshake.
+
+    `latency` maps endpoint path -> [calls, seconds], retries included. An
+    error status left after the retries raises requests.HTTPError, so the
+    error page is never cached as a document. A rate_limiter throttles
+    every call of the session, whichever thread makes it.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self.rate_limiter = rate_limiter
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency: dict[str, list] = {}
+        # Guards latency, updated from every thread sharing the session
+        self.lock = threading.Lock()
+
+    @property
+    def cookies(self):
+        return self.session.cookies
 
     def first_get(self, url, parameters=None):
-        r = requests.get(url, cookies=self.cookies, params=parameters)
-        self.cookies = r.cookies
-        return r.text
+        """GET starting a new cookie session (the BBAPI login)."""
+        self.session.cookies.clear()
+        return self.get(url, parameters)
 
     def get(self, url, parameters=None):
-        r = requests.get(url, cookies=self.cookies, params=parameters)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        start = time.perf_counter()
+        try:
+            r = self.session.get(url, params=parameters, timeout=self.timeout)
+        finally:
+            secs = time.perf_counter() - start
+            with self.lock:
+                timing = self.latency.setdefault(urlsplit(url).path, [0, 0.0])
+                timing[0] += 1
+                timing[1] += secs
+        r.raise_for_status()
         return r.text
 
+    def calls(self) -> int:
+        """Calls made so far, over every endpoint."""
+        with self.lock:
+            return sum(calls for calls, _ in self.latency.values())
+
+    def latency_rows(self) -> list[list]:
+        """[endpoint, calls, total ms, ms/call], slowest total first."""
+        with self.lock:
+            latency = [(endpoint, tuple(timing)) for endpoint, timing in self.latency.items()]
+        return [
+            [endpoint, calls, round(secs * 1000, 3), round(secs * 1000 / calls, 3)]
+            for endpoint, (calls, secs) in sorted(latency, key=lambda item: item[1][1], reverse=True)
+        ]
+
+    def close(self) -> None:
+        self.session.close()
+
 
 class BBApi:
-    def __init__(self, login=None, password=None):
+    def __init__(
+        self,
+        login=None,
+        password=None,
+        network: Network | None = None,
+        base_url: str = BBAPI_URL,
+    ):
+        self.base_url = base_url
         if login is None or password is None:
             return
 
         self.login = login
         self.password = password
         self.logged_in = False
-        self.network = Network()
+        self.network = network or Network()
 
         p = {"login": self.login, "code": self.password}
-        data = self.network.first_get("http://bbapi.buzzerbeater.com/login.aspx", p)
+        data = self.network.first_get(f"{self.base_url}/login.aspx", p)
 
         root = xml.fromstring(data)
         if root.tag == "bbapi":
@@ -52,7 +311,7 @@ class BBApi:
 
     def arena(self, teamid=0):
         p = {"teamid": teamid}
-        data = self.network.get("http://bbapi.buzzerbeater.com/arena.aspx", p)
+        data = self.network.get(f"{self.base_url}/arena.aspx", p)
 
         root = xml.fromstring(data)
         arena = root.find("arena")
@@ -80,82 +339,52 @@ class BBApi:
         return arena_name, arena_seats, arena_expansion
 
     def get_xml_boxscore(self, matchid) -> str:
-        path = CACHE_DIR / f"boxscore_{matchid}.xml"
         p = {"matchid": matchid}
-
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-
-        text = self.network.get("http://bbapi.buzzerbeater.com/boxscore.aspx", p)
-
-        try:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(text, encoding="utf-8")
-        except OSError:
-            pass
-
-        return text
+        return cache_for(CACHE_DIR).fetch(
+            "boxscore",
+            matchid,
+            lambda: self.network.get(f"{self.base_url}/boxscore.aspx", p),
+            validate=check_document,
+        )
 
     def get_xml_pbp(self, matchid) -> str:
         p = {"matchid": matchid}
-        return self.network.get("http://bbapi.buzzerbeater.com/pbp.aspx", p)
+        return self.network.get(f"{self.base_url}/pbp.aspx", p)
 
     def get_xml_standings(self, leagueid: int, season: int) -> str:
-        path = CACHE_DIR / f"standings_{leagueid}_{season}.xml"
-
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-
         p = {"leagueid": str(leagueid), "season": str(season)}
-        text = self.network.get("http://bbapi.buzzerbeater.com/standings.aspx", p)
-
-        try:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(text, encoding="utf-8")
-        except OSError:
-            pass
-
-        return text
+        return cache_for(CACHE_DIR).fetch(
+            "standings",
+            f"{leagueid}_{season}",
+            lambda: self.network.get(f"{self.base_url}/standings.aspx", p),
+            validate=check_document,
+        )
 
     def get_xml_schedule(self, teamid, season) -> str:
-        path = CACHE_DIR / f"schedule_{teamid}_{season}.xml"
-
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-
         p = {"teamid": teamid, "season": season}
-        text = self.network.get("http://bbapi.buzzerbeater.com/schedule.aspx", p)
-
-        try:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(text, encoding="utf-8")
-        except OSError:
-            pass
-
-        return text
+        return cache_for(CACHE_DIR).fetch(
+            "schedule",
+            f"{teamid}_{season}",
+            lambda: self.network.get(f"{self.base_url}/schedule.aspx", p),
+            validate=check_document,
+        )
 
     def get_xml_countries(self) -> str:
-        return self.network.get("http://bbapi.buzzerbeater.com/countries.aspx")
+        return self.network.get(f"{self.base_url}/countries.aspx")
 
     def get_xml_seasons(self) -> str:
-        return self.network.get("http://bbapi.buzzerbeater.com/seasons.aspx")
-
-    def get_xml_player(self, playerid, *, use_cache: bool = False) -> str:
-        path = CACHE_DIR / f"player_{playerid}.xml"
-
-        if use_cache and path.exists():
-            return path.read_text(encoding="utf-8")
+        return self.network.get(f"{self.base_url}/seasons.aspx")
 
+    def get_xml_player(self, playerid, *, use_cache: bool = True) -> str:
+        """use_cache=False refetches even if the cached player is fresh."""
         p = {"playerid": playerid}
-        text = self.network.get("http://bbapi.buzzerbeater.com/player.aspx", p)
-
-        try:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(text, encoding="utf-8")
-        except OSError:
-            pass
-
-        return text
+        return cache_for(CACHE_DIR).fetch(
+            "player",
+            playerid,
+            lambda: self.network.get(f"{self.base_url}/player.aspx", p),
+            refresh=not use_cache,
+            validate=check_document,
+        )
 
     def player(self, playerid) -> str:
         return self.player_info(playerid).get("best_position", "")
@@ -202,101 +431,7 @@ class BBApi:
         return away_off, away_def, home_off, home_def
 
     def boxscore(self, matchid=0) -> list[Team]:
-        data = self.get_xml_boxscore(matchid)
-
-        root = xml.fromstring(data)
-        away = root.find("./match/awayTeam")
-        home = root.find("./match/homeTeam")
-        xml_teams = [away, home]
-        bb_teams = [Team(), Team()]
-
-        for index, xml_team in enumerate(xml_teams):
-            bb_team = bb_teams[index]
-
-            assert isinstance(xml_team, xml.Element), ""
-            bb_team.id = int(xml_team.attrib["id"])
-            bb_team.name = xml_team.find("./teamName").text
-
-            bb_team.off_strategy = xml_team.find("./offStrategy").text
-            bb_team.def_strategy = xml_team.find("./defStrategy").text
-
-            quarters = xml_team.find("./score").attrib["partials"].split(",")
-            for i in range(len(quarters)):
-                bb_team.push_stat_sheet()
-            for num, pts in enumerate(quarters):
-                bb_team.stats.qtr[num].sheet[Statistic.Points] = pts
-
-            totals = xml_team.find("./boxscore/teamTotals")
-
-            def add_team_stat(stat: Statistic, val: int):
-                bb_team.stats.full.sheet[stat] = val
-
-            def team_stat(s: str) -> int:
-                return int(totals.find(s).text)
-
-            add_team_stat(Statistic.Points, team_stat("./pts"))
-            add_team_stat(Statistic.FieldGoalsAtt, team_stat("./fga"))
-            add_team_stat(Statistic.FieldGoalsMade, team_stat("./fgm"))
-            add_team_stat(Statistic.ThreePointsAtt, team_stat("./tpa"))
-            add_team_stat(Statistic.ThreePointsMade, team_stat("./tpm"))
-            add_team_stat(Statistic.FreeThrowsAtt, team_stat("./fta"))
-            add_team_stat(Statistic.FreeThrowsMade, team_stat("./ftm"))
-            add_team_stat(Statistic.OffRebounds, team_stat("./oreb"))
-            add_team_stat(
-                Statistic.DefRebounds, team_stat("./reb") - team_stat("./oreb")
-            )
-            add_team_stat(Statistic.Assists, team_stat("./ast"))
-            add_team_stat(Statistic.Turnovers, team_stat("./to"))
-            add_team_stat(Statistic.Steals, team_stat("./stl"))
-            add_team_stat(Statistic.Blocks, team_stat("./blk"))
-            add_team_stat(Statistic.Fouls, team_stat("./pf"))
-
-            players = xml_team.findall("./boxscore/player")
-            for xml_player in players:
-                bb_player = Player()
-
-                assert isinstance(xml_player, xml.Element), ""
-                bb_player.id = int(xml_player.attrib["id"])
-                bb_player.name = f"{xml_player.find('./firstName').text} {xml_player.find('./lastName').text}"
-
-                perf = xml_player.find("./performance")
-                mins = xml_player.find("./minutes")
-
-                def add_stat(s: Statistic, val: int):
-                    bb_player.stats.full.sheet[s] = val
-
-                def stat(s: str) -> int:
-                    return int(perf.find(s).text)
-
-                def minutes(s: str) -> int:
-                    return int(mins.find(s).text)
-
-                add_stat(Statistic.SecsPG, minutes("./PG") * 60)
-                add_stat(Statistic.SecsSG, minutes("./SG") * 60)
-                add_stat(Statistic.SecsSF, minutes("./SF") * 60)
-                add_stat(Statistic.SecsPF, minutes("./PF") * 60)
-                add_stat(Statistic.SecsC, minutes("./C") * 60)
-
-                add_stat(Statistic.Points, stat("./pts"))
-                add_stat(Statistic.FieldGoalsAtt, stat("./fga"))
-                add_stat(Statistic.FieldGoalsMade, stat("./fgm"))
-                add_stat(Statistic.ThreePointsAtt, stat("./tpa"))
-                add_stat(Statistic.ThreePointsMade, stat("./tpm"))
-                add_stat(Statistic.FreeThrowsAtt, stat("./fta"))
-                add_stat(Statistic.FreeThrowsMade, stat("./ftm"))
-                add_stat(Statistic.OffRebounds, stat("./oreb"))
-                add_stat(
-                    Statistic.DefRebounds,
-                    (stat("./reb") - stat("./oreb")),
-                )
-                add_stat(Statistic.Assists, stat("./ast"))
-                add_stat(Statistic.Turnovers, stat("./to"))
-                add_stat(Statistic.Steals, stat("./stl"))
-                add_stat(Statistic.Blocks, stat("./blk"))
-                add_stat(Statistic.Fouls, stat("./pf"))
-                bb_team.players.append(bb_player)
-
-        return bb_teams
+        return parse_boxscore(self.get_xml_boxscore(matchid))
 
     def standings(self, league_id: int, season: int):
         data = self.get_xml_standings(league_id, season)
@@ -308,49 +443,15 @@ class BBApi:
         return team_ids
 
     def schedule(self, team_id, season):
-        data = self.get_xml_schedule(team_id, season)
-
-        root = xml.fromstring(data)
-        matches = root.findall("./schedule/match")
-
-        match_ids = [
-            match.attrib["id"]
-            for match in matches
-            if match.attrib["type"].startswith("league")
+        """IDs of the played league matches of a team's season schedule."""
+        return [
+            row["id"]
+            for row in self.schedule_matches(team_id, season)
+            if row["type"].startswith("league") and is_played(row)
         ]
 
-        return match_ids
-
     def schedule_matches(self, team_id, season) -> list[dict[str, str]]:
-        data = self.get_xml_schedule(team_id, season)
-
-        root = xml.fromstring(data)
-        matches = root.findall("./schedule/match")
-        rows: list[dict[str, str]] = []
-
-        for match in matches:
-            match_id = match.attrib.get("id", "")
-            if not match_id:
-                continue
-
-            away = match.find("./awayTeam")
-            home = match.find("./homeTeam")
-            away_score = away.findtext("./score", "") if away is not None else ""
-            home_score = home.findtext("./score", "") if home is not None else ""
-
-            rows.append(
-                {
-                    "id": match_id,
-                    "start": match.attrib.get("start", ""),
-                    "type": match.attrib.get("type", ""),
-                    "away_team": away.findtext("./teamName", "") if away is not None else "",
-                    "home_team": home.findtext("./teamName", "") if home is not None else "",
-                    "away_score": away_score.strip() if away_score else "",
-                    "home_score": home_score.strip() if home_score else "",
-                }
-            )
-
-        return rows
+        return parse_schedule(self.get_xml_schedule(team_id, season))
 
     def countries(self) -> list[dict[str, str]]:
         data = self.get_xml_countries()
@@ -437,69 +538,118 @@ class BBApi:
         return match_ids
 
 
+# Concurrent BBAPI calls of an AsyncBBApi
+CONCURRENCY = 8
+
+
+class AsyncBBApi:
+    """asyncio counterpart of BBApi.
+
+    Each call runs the matching BBApi method (same parsing and matches/
+    caching) on a worker thread, so independent fetches overlap on the
+    pooled Network instead of waiting for each other. At most
+    `concurrency` calls are in flight.
+    """
+
+    def __init__(self, api: BBApi, concurrency: int = CONCURRENCY) -> None:
+        self.api = api
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bbapi")
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @classmethod
+    async def connect(
+        cls,
+        login,
+        password,
+        *,
+        concurrency: int = CONCURRENCY,
+        base_url: str = BBAPI_URL,
+    ) -> "AsyncBBApi":
+        """Log in with a Network pooling a connection per concurrent call."""
+        network = Network(pool_size=max(POOL_SIZE, concurrency))
+        api = await asyncio.to_thread(BBApi, login, password, network, base_url)
+        return cls(api, concurrency)
+
+    @property
+    def logged_in(self) -> bool:
+        return getattr(self.api, "logged_in", False)
+
+    async def call(self, method, *args):
+        """Run a blocking callable like the BBApi methods: on the worker
+        threads, within the concurrency bound."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, method, *args)
+
+    async def boxscore(self, matchid) -> list[Team]:
+        return await self.call(self.api.boxscore, matchid)
+
+    async def get_xml_boxscore(self, matchid) -> str:
+        return await self.call(self.api.get_xml_boxscore, matchid)
+
+    async def get_xml_pbp(self, matchid) -> str:
+        return await self.call(self.api.get_xml_pbp, matchid)
+
+    async def schedule(self, team_id, season) -> list[str]:
+        return await self.call(self.api.schedule, team_id, season)
+
+    async def schedule_matches(self, team_id, season) -> list[dict[str, str]]:
+        return await self.call(self.api.schedule_matches, team_id, season)
+
+    async def player_info(self, playerid) -> dict[str, Any]:
+        return await self.call(self.api.player_info, playerid)
+
+    async def standings(self, league_id: int, season: int):
+        return await self.call(self.api.standings, league_id, season)
+
+    async def fan_out(self, fetch, ids, *, return_exceptions: bool = False) -> list:
+        """fetch(id) for every id, concurrently, results in input order.
+        With return_exceptions a failed fetch yields its exception instead
+        of cancelling the others."""
+        return await asyncio.gather(*(fetch(id) for id in ids), return_exceptions=return_exceptions)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if hasattr(self.api, "network"):
+            self.api.network.close()
+
+
+def fetch_all(api: BBApi, method: str, ids, *, concurrency: int = CONCURRENCY) -> list:
+    """Blocking helper: api.<method>(id) for every id, fetched concurrently
+    through an AsyncBBApi sharing api's session. Failures come back as the
+    raised exception in their slot."""
+    if not ids:
+        return []
+
+    async def run():
+        client = AsyncBBApi(api, concurrency)
+        try:
+            return await client.fan_out(getattr(client, method), ids, return_exceptions=True)
+        finally:
+            client.executor.shutdown(wait=False, cancel_futures=True)
+
+    return asyncio.run(run())
+
+
 def prefetch_data(
-    username: str, password: str, leagueid_: int, season_from: int, season_to: int
-):
-    api = BBApi(username, password)
-
-    unique_ids = set[str]()
-
-    leagueids = [
-        1,  # USA
-        86,  # Argentina,
-        107,  # Brasil
-        128,  # Canada
-        149,  # China
-        170,  # Turkiye
-        191,  # Espana
-        212,  # Deutschland
-        254,  # Italia
-        275,  # France
-        296,  # Hellas
-        893,  # Belgium
-        978,  # England
-        999,  # Isreal
-        1020,  # Nederland
-        1062,  # Portugal
-        1083,  # Rossiya
-        1104,  # Lietuva
-        1277,  # Srbija
-        2083,  # Polska
-    ]
-
-    # [ 2, 3, 4, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15, 16, 18, 19, 20, 29, 58]
-    season = 59
-
-    for leagueid in leagueids:
-        team_ids = api.standings(leagueid, season)
-        print(f"Season {season}: teams: {len(team_ids)}")
-        for team_id in team_ids:
-            match_ids = api.schedule(team_id, season)
-            unique_ids.update(match_ids)
-            print(f"LeagueID: {leagueid}, Season {season}: matches: {len(match_ids)}")
-
-    with open("uids-various.txt", "w", encoding='utf-8') as f:
-        for index, uid in enumerate(unique_ids):
-            print(f"Fetch {uid} ({index+1}/{len(unique_ids)})")
-            api.boxscore(uid)
-
-            f.write(str(uid) + "\n")
-
-    print(unique_ids)
-    print(len(unique_ids))
+    username: str, password: str, leagueids: list[int], season_from: int, season_to: int, **kwargs
+) -> dict[str, Any]:
+    """Crawl the box scores of leagueids over seasons season_from to
+    season_to (included) into the matches/ cache, resuming an earlier crawl.
+    See crawler.py, also for the command line."""
+    from crawler import RATE, connect, crawl
+
+    rate = kwargs.pop("rate", RATE)
+    api = connect(username, password, kwargs.get("concurrency", CONCURRENCY), rate)
+    return crawl(api, leagueids, list(range(season_from, season_to + 1)), **kwargs)
 
 
 if __name__ == "__main__":
-    import argparse
-
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--username", required=True)
-    parser.add_argument("--password", required=True)
-    parser.add_argument("--leagueid", type=int, required=True)
-    parser.add_argument("--season-from", type=int, required=True)
-    parser.add_argument("--season-to", type=int, required=True)
-    args = parser.parse_args()
-
-    prefetch_data(
-        args.username, args.password, args.leagueid, args.season_from, args.season_to
-    )
+    import sys
+
+    from crawler import main
+
+    sys.exit(main())
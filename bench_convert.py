@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for event.convert.
+
+Runs the converter over the bundled 123786926.json/138595249.json matches
+(re-encoded back into raw report columns) and every cached report under
+matches/, then prints events/sec for the columnar and the BBEvent list input.
+
+Use --min-events-per-sec to fail (exit code 1) when the columnar path drops
+below a throughput floor, e.g. in CI.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from comments import Comments
+from event import ReportColumns, convert
+from main import CACHE_DIR, parse_xml
+from resource_cache import cache_for
+from player import Player
+from serialize import read_game
+
+
+BASE_DIR = Path(__file__).resolve().parent
+BUNDLED_MATCHES = ("123786926.json", "138595249.json")
+
+SAVED_EVENT_CODES = {
+    ("foul", "504"): (504, 9),
+    ("foul", "507"): (505, 9),
+    ("foul", "803"): (803, 9),
+    ("rebound", "9317"): (931, 7),
+    ("rebound", "9318"): (931, 8),
+    ("rebound", "9319"): (931, 9),
+    ("rebound", "933"): (933, 9),
+    ("rebound", "934"): (934, 7),
+    ("break", "7060"): (706, 0),
+    ("break", "7061"): (706, 1),
+    ("break", "961"): (961, 9),
+    ("break", "962"): (962, 9),
+    ("break", "963"): (963, 9),
+}
+
+
+def columns_from_saved_game(game: dict) -> ReportColumns:
+    """Re-encode the events of a saved game JSON into raw report columns.
+
+    The result is not byte-identical to the original ReportString, but it has
+    the same mix of event types, which is what the converter cost depends on.
+    """
+    columns = ReportColumns()
+
+    def add(team, etype, result, player1=0, player2=0, gameclock=0):
+        columns.append(
+            team,
+            etype,
+            result,
+            0,
+            player1,
+            player2,
+            gameclock,
+            0,
+            f"{etype:03d}{result:X}0000",
+        )
+
+    for event in game["events"]:
+        kind = event["event_type"]
+        clock = event.get("gameclock", 0)
+        if kind == "shot":
+            scored = event["shot_result"] in ("1", "5")
+            if event["shot_result"] == "2":
+                result = 0
+            elif event["shot_result"] == "3":
+                result = 3
+            elif event["assistant"]:
+                result = 4 if scored else 5
+            else:
+                result = 1 if scored else 2
+            partner = event["assistant"] or event["defender"] or 0
+            add(event["attacking_team"], int(event["shot_type"]), result, event["attacker"], partner, clock)
+            columns.player1obj[-1] = Player()
+            columns.player1obj[-1].id = event["attacker"]
+            add(event["attacking_team"], 0, result, event["attacker"], partner, clock)
+        elif kind == "free_throw":
+            # Older saves carry no shot_result on free throws
+            etype = 502 if event.get("shot_result", "1") == "1" else 503
+            add(event["attacking_team"], etype, 9, event["attacker"], 0, clock)
+        elif kind == "interrupt":
+            add(event["attacking_team"], int(event["interrupt_type"]), 9, event["attacker"], event["defender"], clock)
+        elif kind == "injury":
+            add(event["injured_team"], int(event["injury_type"]), 9, event["injured_player"], 0, clock)
+        elif kind == "sub":
+            sub_type = int(event["sub_type"])
+            player_in = event["player_in"] + 1
+            player_out = event["player_out"] + 1
+            if sub_type == 9520:
+                add(0, 952, event["team"], player_in, player_out, clock)
+            else:
+                add(0, 951, sub_type - 9510 + 5 * event["team"], player_in, player_out, clock)
+        else:
+            subtype = event.get(f"{kind}_type")
+            etype, result = SAVED_EVENT_CODES[(kind, subtype)]
+            team = event.get("attacking_team", event.get("team", 0))
+            add(max(team, 0), etype, result, event.get("attacker", 0), event.get("defender", 0), clock)
+
+    return columns
+
+
+def load_corpus() -> list[tuple[str, ReportColumns]]:
+    corpus = []
+    for name in BUNDLED_MATCHES:
+        path = BASE_DIR / name
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                corpus.append((name, columns_from_saved_game(read_game(f))))
+
+    comments = Comments()
+    cache = cache_for(CACHE_DIR)
+    for matchid in cache.keys("report"):
+        events, ht, at = parse_xml(cache.peek("report", matchid))
+        comments.annotate(events, [ht, at])
+        corpus.append((cache.name("report", matchid), events))
+
+    return corpus
+
+
+def bench(corpus: list[tuple[str, ReportColumns]], repeat: int) -> dict[str, float]:
+    event_lists = [columns.to_events() for _, columns in corpus]
+    raw_events = sum(len(columns) for _, columns in corpus) * repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, columns in corpus:
+            convert(columns)
+    columnar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for events in event_lists:
+            convert(events)
+    listed = time.perf_counter() - start
+
+    return {
+        "matches": len(corpus),
+        "raw_events": raw_events,
+        "columnar_secs": columnar,
+        "columnar_events_per_sec": raw_events / columnar if columnar else 0.0,
+        "event_list_secs": listed,
+        "event_list_events_per_sec": raw_events / listed if listed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--min-events-per-sec", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if not corpus:
+        print("No matches to benchmark.")
+        return 1
+
+    result = bench(corpus, args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=4))
+    else:
+        print(f"matches:          {result['matches']}")
+        print(f"raw events:       {result['raw_events']}")
+        print(f"columnar:         {result['columnar_events_per_sec']:,.0f} events/s")
+        print(f"BBEvent list:     {result['event_list_events_per_sec']:,.0f} events/s")
+
+    if result["columnar_events_per_sec"] < args.min_events_per_sec:
+        print(
+            f"Throughput below floor: {result['columnar_events_per_sec']:,.0f} < {args.min_events_per_sec:,.0f} events/s"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Memory benchmark: bytes held per parsed and played game.
+
+Parses and plays every cached report_*.xml under matches/ plus the bundled
+123786926.json/138595249.json matches (re-encoded into report columns), keeps
+all resulting Game objects alive like a season-wide aggregation job would, and
+reports the traced Python heap per game.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+from bench_convert import BASE_DIR, BUNDLED_MATCHES, columns_from_saved_game
+from game import Game
+from main import CACHE_DIR, PLAY_ARGS, parse_xml
+from player import Player
+from resource_cache import cache_for
+from serialize import read_game
+from team import Team
+
+
+def bundled_game_inputs(name: str):
+    with open(BASE_DIR / name, encoding="utf-8") as f:
+        saved = read_game(f)
+
+    teams = []
+    for side in ("teamHome", "teamAway"):
+        team = Team()
+        team.id = saved[side]["id"]
+        team.name = saved[side]["name"]
+        for index, saved_player in enumerate(saved[side]["players"]):
+            player = Player(saved_player["name"] or "Lucky Fan")
+            player.id = saved_player["id"] or index + 1
+            team.players.append(player)
+        while len(team.players) < 12:
+            team.players.append(Player("Lucky Fan"))
+        for pos in range(5):
+            team.set_starter(pos, pos)
+        teams.append(team)
+
+    return columns_from_saved_game(saved), teams[0], teams[1]
+
+
+def load_inputs(copies: int) -> list:
+    inputs = []
+    cache = cache_for(CACHE_DIR)
+    for matchid in cache.keys("report"):
+        text = cache.peek("report", matchid)
+        inputs.append((f"report_{matchid}", lambda text=text: parse_xml(text)))
+    for name in BUNDLED_MATCHES:
+        if (BASE_DIR / name).exists():
+            inputs.append((name, lambda name=name: bundled_game_inputs(name)))
+    return inputs * copies
+
+
+def measure(inputs: list) -> dict[str, float]:
+    games = []
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    for matchid, load in inputs:
+        events, ht, at = load()
+        game = Game(matchid, events, ht, at, PLAY_ARGS, [])
+        game.play()
+        games.append(game)
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    events = sum(len(game.baseevents) for game in games)
+    held = current - baseline
+    return {
+        "games": len(games),
+        "events": events,
+        "bytes_per_game": held / len(games),
+        "bytes_per_event": held / events if events else 0.0,
+        "peak_bytes": peak - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=10, help="Times each match is held in memory")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.copies)
+    if not inputs:
+        print("No matches to benchmark.")
+        return 1
+
+    result = measure(inputs)
+    if args.json:
+        print(json.dumps(result, indent=4))
+    else:
+        print(f"games held:       {result['games']}")
+        print(f"bytes per game:   {result['bytes_per_game']:,.0f}")
+        print(f"bytes per event:  {result['bytes_per_event']:,.0f}")
+        print(f"peak:             {result['peak_bytes']:,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
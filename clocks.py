@@ -1,3 +1,4 @@
+from array import array
 import math
 import unittest
 
@@ -8,6 +9,85 @@ MINUTES_IN_OVER_TIME = 5
 QUARTER_TIME = MINUTES_IN_QUARTER_TIME * MINUTE
 REGULAR_TIME = QUARTER_TIME * NUM_QUARTERS
 OVER_TIME = MINUTES_IN_OVER_TIME * MINUTE
+# Report feeds (and the web tool) give every overtime a 7 minute slot
+FEED_OVER_TIME = 420
+# Last 5 minutes of the 4th quarter and of every overtime
+CLUTCH_TIME = 5 * MINUTE
+# Overtimes covered by the lookup tables; later clocks are computed
+MAX_OVERTIMES = 8
+
+
+class ClockTable:
+    """Per-second lookups for the clocks of a game, built once.
+
+    Periods are four quarters followed by MAX_OVERTIMES overtime slots of
+    overtime seconds each, and a clock belongs to the period it starts (720
+    is the first second of Q2). Quarter, remaining time label, seconds till
+    the break and clutch are then one index each, without the ceil/modulo
+    work of Gameclock.
+    """
+
+    def __init__(self, overtime: int = OVER_TIME, max_overtimes: int = MAX_OVERTIMES) -> None:
+        self.overtime = overtime
+        self.period_ends = array("I", [0])
+        for period in range(1, NUM_QUARTERS + max_overtimes + 1):
+            self.period_ends.append(self.period_ends[-1] + self.period_length(period))
+        size = self.period_ends[-1]
+
+        self.quarters = array("B", bytes(size))
+        self.till_breaks = array("H", bytes(2 * size))
+        self.clutch = bytearray(size)
+        self.labels: list[str] = []
+        for period in range(1, len(self.period_ends)):
+            start, end = self.period_ends[period - 1], self.period_ends[period]
+            for clock in range(start, end):
+                remaining = end - clock
+                self.quarters[clock] = period
+                self.till_breaks[clock] = remaining
+                self.clutch[clock] = clock >= REGULAR_TIME - CLUTCH_TIME and remaining <= CLUTCH_TIME
+                self.labels.append("%02d:%02d" % divmod(remaining, MINUTE))
+
+    def period_length(self, period: int) -> int:
+        return QUARTER_TIME if period <= NUM_QUARTERS else self.overtime
+
+    def period_start(self, period: int) -> int:
+        if period < len(self.period_ends):
+            return self.period_ends[period - 1]
+        return REGULAR_TIME + (period - NUM_QUARTERS - 1) * self.overtime
+
+    def quarter(self, clock: int) -> int:
+        if 0 <= clock < len(self.quarters):
+            return self.quarters[clock]
+        if clock < REGULAR_TIME:
+            return clock // QUARTER_TIME + 1
+        return NUM_QUARTERS + 1 + (clock - REGULAR_TIME) // self.overtime
+
+    def till_break(self, clock: int) -> int:
+        if 0 <= clock < len(self.till_breaks):
+            return self.till_breaks[clock]
+        if clock < REGULAR_TIME:
+            return QUARTER_TIME - clock % QUARTER_TIME
+        return self.overtime - (clock - REGULAR_TIME) % self.overtime
+
+    def is_clutch(self, clock: int) -> bool:
+        if 0 <= clock < len(self.clutch):
+            return self.clutch[clock] == 1
+        return clock >= REGULAR_TIME and self.till_break(clock) <= CLUTCH_TIME
+
+    def label(self, clock: int, quarter: int | None = None) -> str:
+        """Time left as "MM:SS". A clock that ends the given quarter reads
+        "00:00" rather than the full next period."""
+        if quarter is not None and clock > 0 and clock == self.period_start(quarter + 1):
+            return "00:00"
+        if 0 <= clock < len(self.labels):
+            return self.labels[clock]
+        return "%02d:%02d" % divmod(self.till_break(clock), MINUTE)
+
+
+# Clocks as played by Game (overtime normalized to 5 minutes)
+GAME_CLOCKS = ClockTable()
+# Raw report / event feed clocks
+FEED_CLOCKS = ClockTable(FEED_OVER_TIME)
 
 
 class Gameclock:
@@ -1,16 +1,37 @@
+import re
 import xml.etree.ElementTree as XML
+from functools import lru_cache
 from pathlib import Path
 from event import *
+from tracing import TraceLevel, tracer
 
 
-class Comments:
-    def __init__(self) -> None:
-        self.comments: dict[str, dict[int, str]] = {}
+COMMENTARY_FILES = {
+    "en": "commentary-en.xml",
+    "pl": "commentary-pl.xml",
+}
+
+PLACEHOLDER = re.compile(r"\$(event1|player1|player2|team1)\$")
+
+
+@lru_cache(maxsize=None)
+def split_template(text: str) -> tuple[str, ...]:
+    """Split a template into literal and placeholder segments. Even indexes
+    are literals, odd indexes placeholder names (without the dollars)."""
+    return tuple(PLACEHOLDER.split(text))
+
 
-        input_path = Path(__file__).resolve().with_name("commentary-en.xml")
-        tree = XML.parse(input_path)
-        root = tree.getroot()
+class CommentaryTable:
+    """Templates of one commentary XML, parsed once per process."""
 
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.mtime = path.stat().st_mtime_ns
+        self.comments: dict[str, dict[int, str]] = {}
+        # data[0:6] -> segments of the fully composed template
+        self.segments: dict[str, tuple[str, ...]] = {}
+
+        root = XML.parse(path).getroot()
         for child in root:
             tag = child.tag
             if tag == "Events":
@@ -24,6 +45,35 @@ class Comments:
                     else:
                         self.comments[key] = {ty: val}
 
+
+_TABLES: dict[str, CommentaryTable] = {}
+
+
+def load_commentary(language: str = "en") -> CommentaryTable:
+    """Return the shared table for a language, loading it on first use and
+    reloading it when the XML file changed on disk."""
+    path = Path(__file__).resolve().with_name(COMMENTARY_FILES[language])
+    table = _TABLES.get(language)
+    if table is None or table.mtime != path.stat().st_mtime_ns:
+        table = _TABLES[language] = CommentaryTable(path)
+    return table
+
+
+def roster_sides(teams: list[Team]) -> dict[int, str]:
+    """Map player id -> "(H)"/"(A)". Home wins when an id appears on both
+    rosters, same as scanning the home roster first."""
+    sides = {p.id: "(A)" for p in teams[1].players}
+    sides.update((p.id, "(H)") for p in teams[0].players)
+    return sides
+
+
+class Comments:
+    def __init__(self, language: str = "en") -> None:
+        table = load_commentary(language)
+        self.language = language
+        self.comments = table.comments
+        self.segments = table.segments
+
     def get_text2(self, data: str) -> str:
         loc2: int = 0
         loc3: str = ""
@@ -76,11 +126,14 @@ class Comments:
         evar1 = int(data[4], 16)  # ???
         event_variation = int(data[5], 16)
 
-        if __debug__:
-            print(
-                "\nRaw:\n\tprefix: {}\n\tresult: {}\n\tloc9: {}\n\tvar: {}".format(
-                    event_prefix, event_result, evar1, event_variation
-                )
+        if tracer.level >= TraceLevel.DEBUG:
+            tracer.emit(
+                TraceLevel.DEBUG,
+                "raw_text",
+                prefix=event_prefix,
+                result=event_result,
+                evar1=evar1,
+                variation=event_variation,
             )
 
         # Dunk
@@ -125,8 +178,37 @@ class Comments:
 
         return loc3
 
+    def get_segments(self, data: str) -> tuple[str, ...]:
+        """Memoized split_template(get_text(data)); the text only depends on
+        the event type, result and variation digits."""
+        key = data[0:6]
+        segments = self.segments.get(key)
+        if segments is None:
+            segments = self.segments[key] = split_template(self.get_text(data))
+        return segments
+
     def get_actors(self, event: BBEvent, teams: list[Team]):
-        loc3 = event.result % 16
+        return self.resolve_actors(
+            event.team,
+            event.type,
+            event.result,
+            event.variation,
+            event.player1,
+            event.player2,
+            teams,
+        )
+
+    def resolve_actors(
+        self,
+        team: int,
+        etype: int,
+        result: int,
+        variation: int,
+        player1: int,
+        player2: int,
+        teams: list[Team],
+    ):
+        loc3 = result % 16
         loc10 = 0
 
         if loc3 > 9:
@@ -136,57 +218,62 @@ class Comments:
         else:
             loc10 = 0
 
-        team_att = event.team
+        team_att = team
         team_def = (team_att + 1) % 2
-        event_prefix = event.type // 100
-        event_type = event.type
-
-        if __debug__:
-            print(
-                f"RAW2:\n\tloc3: {loc3}\n\tloc10: {loc10}\n\ttype: {event_type}\n\tprefix: {event_prefix}"
+        event_prefix = etype // 100
+        event_type = etype
+
+        if tracer.level >= TraceLevel.DEBUG:
+            tracer.emit(
+                TraceLevel.DEBUG,
+                "raw_actors",
+                loc3=loc3,
+                loc10=loc10,
+                type=event_type,
+                prefix=event_prefix,
             )
 
-        player_primary = teams[team_att].players[event.player1 - 1]
-        player_secondary = teams[team_def].players[event.player2 - 1]
+        player_primary = teams[team_att].players[player1 - 1]
+        player_secondary = teams[team_def].players[player2 - 1]
 
         if loc3 == 4 or loc3 == 5:
             if loc10 == 1 and loc3 == 5:
-                player_secondary = teams[team_def].players[event.player2 - 1]
+                player_secondary = teams[team_def].players[player2 - 1]
             else:
-                player_secondary = teams[team_att].players[event.player2 - 1]
+                player_secondary = teams[team_att].players[player2 - 1]
 
         if loc3 == 8 and event_prefix == 9 and event_type < 950:
-            player_primary = teams[team_def].players[event.player1 - 1]
+            player_primary = teams[team_def].players[player1 - 1]
 
         elif loc3 == 8 and event_prefix != 9:
-            player_secondary = teams[team_att].players[event.player2 - 1]
+            player_secondary = teams[team_att].players[player2 - 1]
 
         # Steal / turnover
         if event_type == 807 or event_type == 808:
-            player_primary = teams[team_def].players[event.player1 - 1]
-            player_secondary = teams[team_att].players[event.player2 - 1]
+            player_primary = teams[team_def].players[player1 - 1]
+            player_secondary = teams[team_att].players[player2 - 1]
 
         # Flagrant foul
         if event_type == 509 or event_type == 510:
-            player_primary = teams[team_def].players[event.player1 - 1]
+            player_primary = teams[team_def].players[player1 - 1]
 
         # Substition
         if event_type == 951:
-            team_att = 1 if event.result > 4 else 0
-            player_primary = teams[team_att].players[event.player1 - 1]
-            player_secondary = teams[team_att].players[event.player2 - 1]
+            team_att = 1 if result > 4 else 0
+            player_primary = teams[team_att].players[player1 - 1]
+            player_secondary = teams[team_att].players[player2 - 1]
             if player_primary.name == "":
                 assert False, "Lucky fan!"
 
         # Players swapping positions
         if event_type == 952:
-            team_att = event.result
-            player_primary = teams[team_att].players[event.player1 - 1]
-            player_secondary = teams[team_att].players[event.player2 - 1]
+            team_att = result
+            player_primary = teams[team_att].players[player1 - 1]
+            player_secondary = teams[team_att].players[player2 - 1]
 
         # Ball going out of bounds
-        if event_type == 934 and loc3 == 7 and event.variation != 2:
-            team_def = event.team
+        if event_type == 934 and loc3 == 7 and variation != 2:
+            team_def = team
             team_att = (team_def + 1) % 2
 
         if event_type != 1:
@@ -205,44 +292,97 @@ class Comments:
         event.player1obj = p1
         event.player2obj = p2
 
-        if __debug__:
-            print(event.to_string(p1, p2))
-
-        if "$player1$" in text:
-            loc = None
-            for p in teams[0].players:
-                if p.id == p1.id:
-                    loc = "(H)"
-                    break
-            if loc is None:
-                for p in teams[1].players:
-                    if p.id == p1.id:
-                        loc = "(A)"
-                        break
-            text = text.replace("$player1$", f"{p1.get_shortened_name()} {loc}")
-
-        if "$player2$" in text:
-            loc = None
-            for p in teams[0].players:
-                if p.id == p2.id:
-                    loc = "(H)"
-                    break
-            if loc is None:
-                for p in teams[1].players:
-                    if p.id == p2.id:
-                        loc = "(A)"
-                        break
-            text = text.replace("$player2$", f"{p2.get_shortened_name()} {loc}")
-
-        if "$team1$" in text:
-            text = text.replace("$team1$", teams[t1].name)
+        text = self.fill_template(text, p1, t1, p2, teams)
 
         event.comment = text
-        if __debug__:
-            print(event.to_string(p1, p2))
+        if tracer.level >= TraceLevel.DEBUG:
+            tracer.emit(TraceLevel.DEBUG, "comment", event=event.to_string(p1, p2))
 
         return text
 
+    def bind(self, columns: ReportColumns, teams: list[Team]) -> None:
+        """Columnar counterpart of get_comment.
+
+        Resolves the actor columns of a decoded report in place (create_shot
+        needs the shooter) and installs a renderer, so the comment text of an
+        event is only built the first time it is read.
+        """
+        actor_teams = []
+        for i in range(len(columns)):
+            p1, t1, p2, t2 = self.resolve_actors(
+                columns.team[i],
+                columns.type[i],
+                columns.result[i],
+                columns.variation[i],
+                columns.player1[i],
+                columns.player2[i],
+                teams,
+            )
+            columns.player1obj[i] = p1
+            columns.player2obj[i] = p2
+            actor_teams.append(t1)
+
+        sides = roster_sides(teams)
+
+        def render(i: int) -> str:
+            p1 = columns.player1obj[i]
+            p2 = columns.player2obj[i]
+            segments = self.get_segments(columns.data[i])
+            text = self.fill_segments(segments, p1, actor_teams[i], p2, teams, sides)
+            if tracer.level >= TraceLevel.DEBUG:
+                columns.comment[i] = text
+                tracer.emit(
+                    TraceLevel.DEBUG, "comment", event=columns[i].to_string(p1, p2)
+                )
+            return text
+
+        columns.renderer = render
+
+    def annotate(self, columns: ReportColumns, teams: list[Team]) -> None:
+        """Like bind, but renders every comment up front."""
+        self.bind(columns, teams)
+        for i in range(len(columns)):
+            columns.comment_at(i)
+
+    def fill_template(
+        self,
+        text: str,
+        p1,
+        t1,
+        p2,
+        teams: list[Team],
+        sides: dict[int, str] | None = None,
+    ) -> str:
+        if sides is None:
+            sides = roster_sides(teams)
+        return self.fill_segments(split_template(text), p1, t1, p2, teams, sides)
+
+    def fill_segments(
+        self,
+        segments: tuple[str, ...],
+        p1,
+        t1,
+        p2,
+        teams: list[Team],
+        sides: dict[int, str],
+    ) -> str:
+        if len(segments) == 1:
+            return segments[0]
+
+        parts = list(segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            if name == "player1":
+                parts[i] = f"{p1.get_shortened_name()} {sides.get(p1.id)}"
+            elif name == "player2":
+                parts[i] = f"{p2.get_shortened_name()} {sides.get(p2.id)}"
+            elif name == "team1":
+                parts[i] = teams[t1].name
+            else:
+                # $event1$ outside of a shot template is kept verbatim
+                parts[i] = f"${name}$"
+        return "".join(parts)
+
     def get_variant(self, key: str, ty: int) -> str:
         if ty in self.comments[key]:
             return self.comments[key][ty]
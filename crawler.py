@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Resumable crawl of league box scores over a range of seasons.
+
+For every league and season the crawl fetches the standings, then the
+schedule of every team in them, then the box score of every league match
+of those schedules. Everything runs on one AsyncBBApi, so at most
+--concurrency calls are in flight, and its Network shares one rate limiter.
+The documents land in the matches/ cache.
+
+Only played league matches are crawled. Progress (team IDs per standings
+page, match IDs per finished schedule, and the fetched box scores) is
+checkpointed to a JSON state file; a schedule with matches still to play is
+fetched again by the next run. A rerun with the same state file skips
+everything already done and retries what failed:
+
+    python crawler.py --username U --password P --season-from 55 --season-to 59
+    python crawler.py ... --leagues 2083 1104 --state matches/crawl_2083.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from tabulate import tabulate
+
+from bbapi import CACHE_DIR, CONCURRENCY, POOL_SIZE, AsyncBBApi, BBApi, Network, RateLimiter, is_played
+
+# Top division leagues of the crawl, by default
+LEAGUES = {
+    1: "USA",
+    86: "Argentina",
+    107: "Brasil",
+    128: "Canada",
+    149: "China",
+    170: "Turkiye",
+    191: "Espana",
+    212: "Deutschland",
+    254: "Italia",
+    275: "France",
+    296: "Hellas",
+    893: "Belgium",
+    978: "England",
+    999: "Israel",
+    1020: "Nederland",
+    1062: "Portugal",
+    1083: "Rossiya",
+    1104: "Lietuva",
+    1277: "Srbija",
+    2083: "Polska",
+}
+STATE_PATH = CACHE_DIR / "crawl_state.json"
+# BBAPI requests per second across every worker
+RATE = 10.0
+# Completed fetches between two checkpoints
+CHECKPOINT_EVERY = 50
+
+STAGES = ("standings", "schedule", "boxscore")
+
+
+class CrawlState:
+    """Checkpointed progress of a crawl: "<league>_<season>" -> team IDs,
+    "<team>_<season>" -> match IDs, and the match IDs with a box score."""
+
+    def __init__(self, path: Path = STATE_PATH) -> None:
+        self.path = Path(path)
+        self.standings: dict[str, list[str]] = {}
+        self.schedules: dict[str, list[str]] = {}
+        self.boxscores: set[str] = set()
+        self._unsaved = 0
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.standings = data.get("standings", {})
+            self.schedules = data.get("schedules", {})
+            self.boxscores = set(data.get("boxscores", []))
+
+    def save(self) -> None:
+        """Write the state atomically, so an interrupted save keeps the
+        previous checkpoint."""
+        data = {
+            "standings": self.standings,
+            "schedules": self.schedules,
+            "boxscores": sorted(self.boxscores, key=lambda matchid: (len(matchid), matchid)),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._unsaved = 0
+
+    def completed(self) -> None:
+        """Count a completed fetch, checkpointing every CHECKPOINT_EVERY."""
+        self._unsaved += 1
+        if self._unsaved >= CHECKPOINT_EVERY:
+            self.save()
+
+
+class Crawl:
+    """One crawl over an AsyncBBApi. `counts` maps stage -> Counter of
+    fetched/resumed/failed, and `errors` the last error per failed item."""
+
+    def __init__(self, client: AsyncBBApi, state: CrawlState) -> None:
+        self.client = client
+        self.state = state
+        self.counts = {stage: Counter() for stage in STAGES}
+        self.errors: dict[str, str] = {}
+        self._matches: set[str] = set()
+
+    async def run(self, leagueids: list[int], seasons: list[int]) -> None:
+        try:
+            await asyncio.gather(
+                *(self.league_season(leagueid, season) for leagueid in leagueids for season in seasons)
+            )
+        finally:
+            self.state.save()
+
+    async def league_season(self, leagueid: int, season: int) -> None:
+        key = f"{leagueid}_{season}"
+        team_ids = await self._fetch("standings", key, self.state.standings, self.standings, leagueid, season)
+        if team_ids is not None:
+            await asyncio.gather(*(self.team_season(team_id, season) for team_id in team_ids))
+
+    async def team_season(self, team_id: str, season: int) -> None:
+        key = f"{team_id}_{season}"
+        match_ids = await self._fetch("schedule", key, self.state.schedules, self.schedule, team_id, season)
+        if match_ids is None:
+            return
+        # Both teams of a match list it: fetch it once
+        new = [matchid for matchid in match_ids if matchid not in self._matches]
+        self._matches.update(new)
+        await asyncio.gather(*(self.boxscore(matchid) for matchid in new))
+
+    async def boxscore(self, matchid: str) -> None:
+        if matchid in self.state.boxscores:
+            self.counts["boxscore"]["resumed"] += 1
+            return
+        try:
+            await self.client.boxscore(matchid)
+        except Exception as e:
+            self._failed("boxscore", matchid, e)
+            return
+        self.state.boxscores.add(matchid)
+        self._completed("boxscore")
+
+    async def standings(self, leagueid: int, season: int) -> tuple[list, bool]:
+        return await self.client.standings(leagueid, season), True
+
+    async def schedule(self, team_id: str, season: int) -> tuple[list, bool]:
+        """Played league match IDs, and whether none is left to play."""
+        rows = [row for row in await self.client.schedule_matches(team_id, season) if row["type"].startswith("league")]
+        played = [row["id"] for row in rows if is_played(row)]
+        return played, len(played) == len(rows)
+
+    async def _fetch(self, stage: str, key: str, done: dict, fetch, *args) -> list[str] | None:
+        """IDs of a standings page or schedule: checkpointed ones, else
+        fetched, and checkpointed if fetch says they are final. None when
+        the fetch fails."""
+        if key in done:
+            self.counts[stage]["resumed"] += 1
+            return done[key]
+        try:
+            ids, final = await fetch(*args)
+        except Exception as e:
+            self._failed(stage, key, e)
+            return None
+        ids = [str(id) for id in ids]
+        if final:
+            done[key] = ids
+        self._completed(stage)
+        return ids
+
+    def _completed(self, stage: str) -> None:
+        self.counts[stage]["fetched"] += 1
+        self.state.completed()
+
+    def _failed(self, stage: str, key: str, error: Exception) -> None:
+        self.counts[stage]["failed"] += 1
+        self.errors[f"{stage} {key}"] = f"{type(error).__name__}: {error}"
+
+
+def connect(username: str, password: str, concurrency: int = CONCURRENCY, rate: float = RATE) -> BBApi:
+    """Log in with a Network pooling a connection per worker and limited
+    to rate requests per second."""
+    network = Network(pool_size=max(POOL_SIZE, concurrency), rate_limiter=RateLimiter(rate, concurrency))
+    return BBApi(username, password, network)
+
+
+def crawl(
+    api: BBApi,
+    leagueids: list[int],
+    seasons: list[int],
+    state_path: Path = STATE_PATH,
+    concurrency: int = CONCURRENCY,
+) -> dict[str, Any]:
+    """Crawl leagueids over seasons with a logged in api, resuming from
+    state_path. Returns the summary of print_summary."""
+    state = CrawlState(state_path)
+    calls_before = api.network.calls()
+    start = time.perf_counter()
+
+    async def run():
+        client = AsyncBBApi(api, concurrency)
+        try:
+            job = Crawl(client, state)
+            await job.run(leagueids, seasons)
+            return job
+        finally:
+            client.executor.shutdown(wait=False, cancel_futures=True)
+
+    job = asyncio.run(run())
+    wall_secs = time.perf_counter() - start
+    requests = api.network.calls() - calls_before
+    limiter = api.network.rate_limiter
+    return {
+        "stages": {stage: dict(counts) for stage, counts in job.counts.items()},
+        "errors": job.errors,
+        "matches": len(state.boxscores),
+        "requests": requests,
+        "wall_secs": round(wall_secs, 4),
+        "requests_per_sec": requests / wall_secs if wall_secs else 0.0,
+        "rate_limited_secs": round(limiter.waited, 4) if limiter is not None else 0.0,
+        "latency": api.network.latency_rows(),
+    }
+
+
+def print_summary(summary: dict[str, Any]) -> None:
+    rows = []
+    for stage, counts in summary["stages"].items():
+        rows.append([stage, counts.get("fetched", 0), counts.get("resumed", 0), counts.get("failed", 0)])
+    print(tabulate(rows, headers=["Stage", "Fetched", "Resumed", "Failed"]))
+    print()
+    if summary["latency"]:
+        print(tabulate(summary["latency"], headers=["Endpoint", "Calls", "Total ms", "ms/call"]))
+        print()
+    for key, error in summary["errors"].items():
+        print(f"{key}: {error}")
+
+    fetched = sum(counts.get("fetched", 0) for counts in summary["stages"].values())
+    wall_secs = summary["wall_secs"]
+    print(f"box scores: {summary['matches']} crawled")
+    print(
+        f"throughput: {summary['requests_per_sec']:,.1f} requests/s, "
+        f"{fetched / wall_secs if wall_secs else 0.0:,.1f} fetches/s "
+        f"({summary['rate_limited_secs']:.1f}s rate limited)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--season-from", type=int, required=True)
+    parser.add_argument("--season-to", type=int, required=True, help="Last season, included")
+    parser.add_argument("--leagues", type=int, nargs="+", default=list(LEAGUES), help="League IDs (default: top divisions)")
+    parser.add_argument("--state", type=Path, default=STATE_PATH, help="Checkpoint file to resume from")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="BBAPI calls in flight")
+    parser.add_argument("--rate", type=float, default=RATE, help="BBAPI requests per second")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    concurrency = max(1, args.concurrency)
+    api = connect(args.username, args.password, concurrency, args.rate)
+    if not api.logged_in:
+        print("BBAPI login failed.")
+        return 1
+
+    seasons = list(range(args.season_from, args.season_to + 1))
+    summary = crawl(api, args.leagues, seasons, args.state, concurrency)
+    api.network.close()
+
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        print_summary(summary)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
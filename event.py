@@ -1,14 +1,19 @@
+from array import array
 from enum import IntEnum, auto
+from functools import lru_cache
+from typing import Callable
 from venv import create
 
-from clocks import Gameclock
 from team import Team, opponent
 from player import Player
 import math
 from event_types import *
+from tracing import TraceLevel, tracer
 
 
 class Clocks:
+    __slots__ = ("game", "real", "shot")
+
     def __init__(self, game: int, real: int, shot: int) -> None:
         self.game = game
         self.real = real
@@ -16,18 +21,63 @@ class Clocks:
 
 
 class ShotPos:
+    __slots__ = ("x", "y")
+
     def __init__(self, posx: int, posy: int) -> None:
         self.x = posx
         self.y = posy
 
 
+class EventComments:
+    """Raw event indices whose commentary belongs to one converted event.
+
+    The text itself is rendered through the owning ReportColumns the first
+    time it is read.
+    """
+
+    __slots__ = ("columns", "indices")
+
+    def __init__(self, columns: "ReportColumns", index: int) -> None:
+        self.columns = columns
+        self.indices = [index]
+
+    def append(self, index: int) -> None:
+        self.indices.append(index)
+
+    def extend(self, other: "EventComments") -> None:
+        self.indices.extend(other.indices)
+
+    def render(self) -> list[str]:
+        comment_at = self.columns.comment_at
+        return [comment_at(index) for index in self.indices]
+
+
 class BaseEvent:
-    def __init__(self, comments: list[str], clocks: Clocks) -> None:
-        self.comments = comments
+    __slots__ = ("_comments", "gameclock", "realclock", "shotclock")
+
+    def __init__(self, comments: list[str] | EventComments, clocks: Clocks) -> None:
+        self._comments = comments
         self.gameclock = clocks.game
         self.realclock = clocks.real
         self.shotclock = clocks.shot
 
+    @property
+    def comments(self) -> list[str]:
+        comments = self._comments
+        if isinstance(comments, EventComments):
+            comments = self._comments = comments.render()
+        return comments
+
+    @comments.setter
+    def comments(self, comments: list[str]) -> None:
+        self._comments = comments
+
+    def merge_comments(self, comments: EventComments) -> None:
+        if isinstance(self._comments, EventComments):
+            self._comments.extend(comments)
+        else:
+            self._comments.extend(comments.render())
+
     def patch_shotclock(self, clock):
         self.shotclock = clock
 
@@ -36,6 +86,8 @@ class BaseEvent:
 
 
 class ShotEvent(BaseEvent):
+    __slots__ = ("shot_type", "shot_result", "attacker", "defender", "assistant", "att_team", "def_team", "shot_pos")
+
     def __init__(
         self,
         comments: list[str],
@@ -117,6 +169,8 @@ class ShotEvent(BaseEvent):
 
 
 class InterruptEvent(BaseEvent):
+    __slots__ = ("interrupt_type", "attacker", "defender", "att_team", "def_team")
+
     def __init__(
         self,
         comments: list[str],
@@ -149,6 +203,8 @@ class InterruptEvent(BaseEvent):
 
 
 class FoulEvent(BaseEvent):
+    __slots__ = ("foul_type", "attacker", "defender", "att_team", "def_team", "flagrant")
+
     def __init__(
         self,
         comments: list[str],
@@ -184,6 +240,8 @@ class FoulEvent(BaseEvent):
 
 
 class ReboundEvent(BaseEvent):
+    __slots__ = ("rebound_type", "attacker", "defender", "att_team", "def_team")
+
     def __init__(
         self,
         comments: list[str],
@@ -228,6 +286,8 @@ class ReboundEvent(BaseEvent):
 
 
 class FreeThrowEvent(BaseEvent):
+    __slots__ = ("free_throw_type", "shot_result", "attacker", "att_team")
+
     def __init__(
         self,
         comments: list[str],
@@ -260,6 +320,8 @@ class FreeThrowEvent(BaseEvent):
 
 
 class InjuryEvent(BaseEvent):
+    __slots__ = ("injury_type", "injured_player", "causedby_player", "injured_team", "causedby_team")
+
     def __init__(
         self,
         comments: list[str],
@@ -292,6 +354,8 @@ class InjuryEvent(BaseEvent):
 
 
 class SubEvent(BaseEvent):
+    __slots__ = ("sub_type", "player_in", "player_out", "team")
+
     def __init__(
         self,
         comments: list[str],
@@ -321,6 +385,8 @@ class SubEvent(BaseEvent):
 
 
 class BreakEvent(BaseEvent):
+    __slots__ = ("break_type", "team")
+
     def __init__(
         self, comments: list[str], clocks: Clocks, break_type: BreakType, team: int
     ) -> None:
@@ -337,6 +403,8 @@ class BreakEvent(BaseEvent):
 
 
 class BBEvent:
+    __slots__ = ("team", "type", "result", "variation", "player1", "player2", "gameclock", "realclock", "data", "comment", "player1obj", "player2obj")
+
     def __init__(
         self,
         team: int,
@@ -355,7 +423,7 @@ class BBEvent:
         self.variation = variation
         self.player1 = player1
         self.player2 = player2
-        self.gameclock = Gameclock(gameclock)
+        self.gameclock = gameclock
         self.realclock = realclock
         self.data = data
         self.comment = ""
@@ -381,7 +449,7 @@ class BBEvent:
             self.variation,
             self.player1,
             self.player2,
-            self.gameclock.clock,
+            self.gameclock,
             self.realclock,
             self.data,
             self.comment,
@@ -407,545 +475,554 @@ class BBEvent:
             self.player1,
             p2,
             self.player2,
-            self.gameclock.clock,
+            self.gameclock,
             self.realclock,
             self.data,
             self.comment,
         )
 
 
-def convert(events: list[BBEvent]) -> list[BaseEvent]:
-    bb_idx = 0
-    base_events: list[BaseEvent] = []
-    shotclock = 0
+class ReportColumns:
+    """Decoded ReportString stored as parallel typed arrays, one slot per raw
+    event (including the synthetic shot result events).
+
+    Indexing materializes a BBEvent on demand, so callers that still expect
+    a list of BBEvent keep working. Comments are rendered lazily: a None slot
+    in ``comment`` is filled by ``renderer`` the first time it is read.
+    """
+
+    def __init__(self) -> None:
+        self.team = array("b")
+        self.type = array("h")
+        self.result = array("b")
+        self.variation = array("b")
+        self.player1 = array("b")
+        self.player2 = array("b")
+        self.gameclock = array("i")
+        self.realclock = array("i")
+        self.data: list[str] = []
+        self.comment: list[str | None] = []
+        self.player1obj: list[Player | None] = []
+        self.player2obj: list[Player | None] = []
+        self.renderer: Callable[[int], str] | None = None
+
+    def __len__(self) -> int:
+        return len(self.type)
+
+    def __getitem__(self, index: int) -> BBEvent:
+        e = BBEvent(
+            team=self.team[index],
+            type=self.type[index],
+            result=self.result[index],
+            variation=self.variation[index],
+            player1=self.player1[index],
+            player2=self.player2[index],
+            gameclock=self.gameclock[index],
+            realclock=self.realclock[index],
+            data=self.data[index],
+        )
+        e.comment = self.comment_at(index)
+        if self.player1obj[index] is not None:
+            e.player1obj = self.player1obj[index]
+        if self.player2obj[index] is not None:
+            e.player2obj = self.player2obj[index]
+        return e
+
+    def append(
+        self,
+        team: int,
+        type: int,
+        result: int,
+        variation: int,
+        player1: int,
+        player2: int,
+        gameclock: int,
+        realclock: int,
+        data: str,
+    ) -> None:
+        self.team.append(team)
+        self.type.append(type)
+        self.result.append(result)
+        self.variation.append(variation)
+        self.player1.append(player1)
+        self.player2.append(player2)
+        self.gameclock.append(gameclock)
+        self.realclock.append(realclock)
+        self.data.append(data)
+        self.comment.append(None)
+        self.player1obj.append(None)
+        self.player2obj.append(None)
+
+    def comment_at(self, index: int) -> str:
+        text = self.comment[index]
+        if text is None:
+            if self.renderer is None:
+                return ""
+            text = self.comment[index] = self.renderer(index)
+        return text
+
+    def to_events(self) -> list[BBEvent]:
+        return [self[i] for i in range(len(self))]
+
+    @classmethod
+    def from_events(cls, events: list[BBEvent]) -> "ReportColumns":
+        columns = cls()
+        for e in events:
+            columns.append(
+                e.team,
+                e.type,
+                e.result,
+                e.variation,
+                e.player1,
+                e.player2,
+                e.gameclock,
+                e.realclock,
+                e.data,
+            )
+            columns.comment[-1] = e.comment or None
+            columns.player1obj[-1] = getattr(e, "player1obj", None)
+            columns.player2obj[-1] = getattr(e, "player2obj", None)
+        return columns
+
+
+def _convert_shot(events: ReportColumns, idx: int, comments, clocks, base_events):
+    team = events.team[idx]
+    etype = events.type[idx]
+    data = events.data[idx]
+    types = events.type
+
+    eresult = events.result[idx]
+    unknown5 = 0
+    if eresult > 9:
+        if eresult < 13 or eresult > 14:
+            unknown5 = 1
+        eresult -= 9
+
+    shot_type = ShotType(etype)
+    shooter = events.player1obj[idx]
+    shot_pos = create_shot(
+        team,
+        etype,
+        shooter.id,
+        shooter.name,
+        events.gameclock[idx],
+    )
+
+    result_idx = idx + 1
+    comments.append(result_idx)
+
+    assert types[result_idx] == 0, f"This should be a result event"
+    result_code = events.result[result_idx]
+    unknown2 = 1 if result_code == 1 or result_code == 4 else 0
+    if result_code == 0:
+        unknown2 = 2
+    elif result_code == 3 or result_code == 6:
+        unknown2 = 3
+    shot_result = ShotResult(unknown2)
+
+    next_idx = result_idx + 1
+    if types[next_idx] in (504, 507, 508, 509):
+        if shot_result == ShotResult.SCORED:
+            shot_result = ShotResult.SCORED_WITH_FOUL
+        elif shot_result == ShotResult.MISSED:
+            shot_result = ShotResult.MISSED_WITH_FOUL
+        elif shot_result == ShotResult.GOALTEND:
+            pass
+        else:
+            assert False, (
+                f"This shouldn't happen result: {str(shot_result)},\n"
+                f"next event: {types[next_idx]}\n",
+                f"data: {data}\n",
+                f"comments: {comments.render()}",
+            )
 
-    while bb_idx < len(events):
-        event = events[bb_idx]
-        bb_idx += 1
+    defender = None
+    assistant = None
+    if unknown5 == 1:
+        # CHECKME: alters shot, block attempt?
+        defender = events.player2[idx]
+        assistant = None
+    elif eresult <= 3 or eresult == 7 or eresult == 6:
+        defender = events.player2[idx]
+        assistant = None
+    else:
+        defender = None
+        assistant = events.player2[idx]
+
+    base_events.append(
+        ShotEvent(
+            comments,
+            clocks=clocks,
+            shot_type=shot_type,
+            shot_result=shot_result,
+            attacker=events.player1[idx],
+            defender=defender,
+            assistant=assistant,
+            att_team=team,
+            def_team=opponent(team),
+            shot_pos=shot_pos,
+        )
+    )
+    return next_idx
 
-        comments = [event.comment]
-        clocks = Clocks(event.gameclock.clock, event.realclock, 0)
 
-        etype = event.type
-        eprefix = etype // 100
-        eresult = event.result
-        evar1 = int(event.data[4], 16)
-        evar2 = int(event.data[5], 16)
-        unknown5 = 0
+def _convert_ignored(events: ReportColumns, idx: int, comments, clocks, base_events):
+    return idx + 1
 
-        if evar1 > 0:
-            eprefix = 99
 
-        if eresult > 9:
-            if eresult < 13 or eresult > 14:
-                unknown5 = 1
-            eresult -= 9
-        else:
-            unknown5 = 0
-
-        if etype >= 100 and etype < 500 and etype not in (210, 211, 212, 213, 214, 215):
-            shot_type = ShotType(etype)
-            shot_pos = create_shot(
-                event.team,
-                event.type,
-                event.player1obj.id,
-                event.player1obj.name,
-                event.gameclock.clock,
+def _convert_free_throw(shot_result: ShotResult):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        base_events.append(
+            FreeThrowEvent(
+                comments,
+                clocks,
+                FreeThrowType.REGULAR,
+                shot_result,
+                events.player1[idx],
+                events.team[idx],
             )
-
-            result_event = events[bb_idx]
-            bb_idx += 1
-            comments.append(result_event.comment)
-
-            assert result_event.type == 0, f"This should be a result event"
-            unknown2 = 1 if result_event.result == 1 or result_event.result == 4 else 0
-            if result_event.result == 0:
-                unknown2 = 2
-            elif result_event.result == 3 or result_event.result == 6:
-                unknown2 = 3
-            shot_result = ShotResult(unknown2)
-
-            next_event = events[bb_idx]
-            if next_event.type in (504, 507, 508, 509):
-                if shot_result == ShotResult.SCORED:
-                    shot_result = ShotResult.SCORED_WITH_FOUL
-                elif shot_result == ShotResult.MISSED:
-                    shot_result = ShotResult.MISSED_WITH_FOUL
-                elif shot_result == ShotResult.GOALTEND:
-                    pass
-                else:
-                    assert False, (
-                        f"This shouldn't happen result: {str(shot_result)},\n"
-                        f"next event: {next_event.type}\n",
-                        f"data: {event.data}\n",
-                        f"comments: {comments}",
-                    )
-
-            defender = None
-            assistant = None
-            if unknown5 == 1:
-                # CHECKME: alters shot, block attempt?
-                defender = event.player2
-                assistant = None
-            elif eresult <= 3 or eresult == 7 or eresult == 6:
-                defender = event.player2
-                assistant = None
-            else:
-                defender = None
-                assistant = event.player2
-
-            base_events.append(
-                ShotEvent(
-                    comments,
-                    clocks=clocks,
-                    shot_type=shot_type,
-                    shot_result=shot_result,
-                    attacker=event.player1,
-                    defender=defender,
-                    assistant=assistant,
-                    att_team=event.team,
-                    def_team=opponent(event.team),
-                    shot_pos=shot_pos,
-                )
+        )
+        return idx + 1
+
+    return convert_event
+
+
+def _convert_foul(foul_type: FoulType):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        team = events.team[idx]
+        base_events.append(
+            FoulEvent(
+                comments,
+                clocks,
+                foul_type,
+                events.player1[idx],
+                events.player2[idx],
+                team,
+                opponent(team),
+                flagrant=0,
+            )
+        )
+        return idx + 1
+
+    return convert_event
+
+
+def _convert_flagrant(flagrant: int):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        # Upgrade previous foul to flagrant one/two
+        prev_event = base_events[-1]
+        assert isinstance(prev_event, FoulEvent)
+        prev_event.flagrant = flagrant
+        prev_event.merge_comments(comments)
+        return idx + 1
+
+    return convert_event
+
+
+def _convert_timeout(events: ReportColumns, idx: int, comments, clocks, base_events):
+    break_type = (
+        BreakType.TIMEOUT_30 if events.result[idx] == 0 else BreakType.TIMEOUT_60
+    )
+    base_events.append(BreakEvent(comments, clocks, break_type, events.team[idx]))
+    return idx + 1
+
+
+def _convert_interrupt(interrupt_type: InterruptType, swapped: bool = False):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        team = events.team[idx]
+        attacker = events.player1[idx]
+        defender = events.player2[idx]
+        if swapped:
+            attacker, defender = defender, attacker
+        base_events.append(
+            InterruptEvent(
+                comments,
+                clocks,
+                interrupt_type,
+                attacker,
+                defender,
+                team,
+                opponent(team),
             )
+        )
+        return idx + 1
 
-        elif etype in (210, 211, 212, 213, 214):
-            # We can find these ourselves
-            pass
-        elif etype == 215:
-            # Garbage time
-            pass
+    return convert_event
 
-        elif etype == 502 or etype == 503:
-            if etype == 502:
-                shot_result = ShotResult.SCORED
-            elif etype == 503:
-                shot_result = ShotResult.MISSED
-
-            base_events.append(
-                FreeThrowEvent(
-                    comments,
-                    clocks,
-                    FreeThrowType.REGULAR,
-                    shot_result,
-                    event.player1,
-                    event.team,
-                )
-            )
-        elif etype == 504:
-            base_events.append(
-                FoulEvent(
-                    comments,
-                    clocks,
-                    FoulType.SHOOTING_FOUL,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                    flagrant=0,
-                )
-            )
-        elif etype == 505:
-            base_events.append(
-                FoulEvent(
-                    comments,
-                    clocks,
-                    FoulType.PERSONAL_FOUL,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                    flagrant=0,
-                )
-            )
-        elif etype == 507:
-            assert False, "FIXME: event 507"
-        elif etype == 508:
-            base_events.append(
-                FoulEvent(
-                    comments,
-                    clocks,
-                    FoulType.PERSONAL_FOUL,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                    flagrant=0,
-                )
-            )
-        elif etype == 509:
-            # Upgrade previous foul to flagrant one
-            prev_event = base_events[-1]
-            assert isinstance(prev_event, FoulEvent)
-            prev_event.flagrant = 1
-            prev_event.comments.append(*comments)
-        elif etype == 510:
-            # Upgrade previous foul to flagrant two
-            prev_event = base_events[-1]
-            assert isinstance(prev_event, FoulEvent)
-            prev_event.flagrant = 2
-            prev_event.comments.append(*comments)
-        elif etype == 706:
-            break_type = (
-                BreakType.TIMEOUT_30 if event.result == 0 else BreakType.TIMEOUT_60
-            )
-            base_events.append(BreakEvent(comments, clocks, break_type, event.team))
-        elif etype == 801:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.THREE_SEC_VIOLATION,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 802:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.BALL_THROWN_OUT,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 803:
-            base_events.append(
-                FoulEvent(
-                    comments,
-                    clocks,
-                    FoulType.OFFENSIVE_FOUL,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                    flagrant=0,
-                )
-            )
-        elif etype == 804:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.SHOTCLOCK_VIOLATION,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 807:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.BALL_STOLEN,
-                    event.player2,
-                    event.player1,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 808:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.PASS_INTERCEPTED,
-                    event.player2,
-                    event.player1,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 809:
-            # This assist is added as part of the shot event
-            base_events[-1].comments.extend(comments)
-        elif etype == 810:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.TRAVELLING,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
+
+def _convert_assist(events: ReportColumns, idx: int, comments, clocks, base_events):
+    # This assist is added as part of the shot event
+    base_events[-1].merge_comments(comments)
+    return idx + 1
+
+
+def _convert_injury(injury_type: InjuryType):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        team = events.team[idx]
+        base_events.append(
+            InjuryEvent(
+                comments,
+                clocks,
+                injury_type,
+                events.player1[idx],
+                events.player2[idx],
+                team,
+                opponent(team),
             )
-        elif etype == 812:
-            base_events.append(
-                InterruptEvent(
-                    comments,
-                    clocks,
-                    InterruptType.LOST_HANDLE,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
+        )
+        return idx + 1
+
+    return convert_event
+
+
+def _convert_unsupported(message: str):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        assert False, message
+
+    return convert_event
+
+
+REBOUND_RESULTS = {
+    7: ReboundType.OFF_REBOUND,
+    8: ReboundType.DEF_REBOUND,
+    9: ReboundType.DEFAULT_REBOUND,
+}
+
+
+def _convert_rebound(rebound_type: ReboundType | None = None):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        team = events.team[idx]
+        base_events.append(
+            ReboundEvent(
+                comments,
+                clocks,
+                rebound_type or REBOUND_RESULTS[events.result[idx]],
+                events.player1[idx],
+                events.player2[idx],
+                team,
+                opponent(team),
             )
-        elif etype == 901:
+        )
+        return idx + 1
+
+    return convert_event
+
+
+SUB_RESULTS = (
+    SubType.SUB_PG,
+    SubType.SUB_SG,
+    SubType.SUB_SF,
+    SubType.SUB_PF,
+    SubType.SUB_C,
+)
+
+
+def _convert_sub(events: ReportColumns, idx: int, comments, clocks, base_events):
+    result = events.result[idx]
+    team = 1 if result > 4 else 0
+    base_events.append(
+        SubEvent(
+            comments,
+            clocks,
+            SUB_RESULTS[result % 5],
+            events.player1[idx] - 1,
+            events.player2[idx] - 1,
+            team,
+        )
+    )
+    return idx + 1
+
+
+def _convert_swap(events: ReportColumns, idx: int, comments, clocks, base_events):
+    result = events.result[idx]
+    assert result == 0 or result == 1
+    base_events.append(
+        SubEvent(
+            comments,
+            clocks,
+            SubType.POS_SWAP,
+            events.player1[idx] - 1,
+            events.player2[idx] - 1,
+            result,
+        )
+    )
+    return idx + 1
+
+
+def _convert_break(break_type: BreakType):
+    def convert_event(events: ReportColumns, idx: int, comments, clocks, base_events):
+        base_events.append(BreakEvent(comments, clocks, break_type, -1))
+        return idx + 1
+
+    return convert_event
+
+
+def _build_converters() -> dict[int, Callable[..., int]]:
+    converters = {}
+    for etype in range(100, 500):
+        converters[etype] = _convert_shot
+    for etype in (210, 211, 212, 213, 214):
+        # We can find these ourselves
+        converters[etype] = _convert_ignored
+    # Garbage time
+    converters[215] = _convert_ignored
+
+    converters.update(
+        {
+            502: _convert_free_throw(ShotResult.SCORED),
+            503: _convert_free_throw(ShotResult.MISSED),
+            504: _convert_foul(FoulType.SHOOTING_FOUL),
+            505: _convert_foul(FoulType.PERSONAL_FOUL),
+            507: _convert_unsupported("FIXME: event 507"),
+            508: _convert_foul(FoulType.PERSONAL_FOUL),
+            509: _convert_flagrant(1),
+            510: _convert_flagrant(2),
+            706: _convert_timeout,
+            801: _convert_interrupt(InterruptType.THREE_SEC_VIOLATION),
+            802: _convert_interrupt(InterruptType.BALL_THROWN_OUT),
+            803: _convert_foul(FoulType.OFFENSIVE_FOUL),
+            804: _convert_interrupt(InterruptType.SHOTCLOCK_VIOLATION),
+            807: _convert_interrupt(InterruptType.BALL_STOLEN, swapped=True),
+            808: _convert_interrupt(InterruptType.PASS_INTERCEPTED, swapped=True),
+            809: _convert_assist,
+            810: _convert_interrupt(InterruptType.TRAVELLING),
+            812: _convert_interrupt(InterruptType.LOST_HANDLE),
             # Seems to be connected to the previous event
-            base_events.append(
-                InjuryEvent(
-                    comments,
-                    clocks,
-                    InjuryType.INJURY_OUT,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 902:
+            901: _convert_injury(InjuryType.INJURY_OUT),
             # Just an information that player will return
-            base_events.append(
-                InjuryEvent(
-                    comments,
-                    clocks,
-                    InjuryType.INJURY_BACK,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 903:
+            902: _convert_injury(InjuryType.INJURY_BACK),
             # Looks like a random message, seems to be irrelevant for other events
-            base_events.append(
-                InjuryEvent(
-                    comments,
-                    clocks,
-                    InjuryType.EXHAUSTED,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 904:
-            assert False, "CHECKME 904"
-            base_events.append(
-                InjuryEvent(
-                    comments,
-                    clocks,
-                    InjuryType.FAINTED,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 931:
-            if event.result == 7:
-                rebound_type = ReboundType.OFF_REBOUND
-            elif event.result == 8:
-                rebound_type = ReboundType.DEF_REBOUND
-            elif event.result == 9:
-                rebound_type = ReboundType.DEFAULT_REBOUND
-            base_events.append(
-                ReboundEvent(
-                    comments,
-                    clocks,
-                    rebound_type,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 933:
-            base_events.append(
-                ReboundEvent(
-                    comments,
-                    clocks,
-                    ReboundType.JUMP_BALL,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 934:
-            if event.result == 7:
-                pass  # FIXME offensive?
-            elif event.result == 8:
-                pass  # FIXME defensive?
-            base_events.append(
-                ReboundEvent(
-                    comments,
-                    clocks,
-                    ReboundType.REBOUND_OUT_OF_BOUNDS,
-                    event.player1,
-                    event.player2,
-                    event.team,
-                    opponent(event.team),
-                )
-            )
-        elif etype == 951:
-            team = 1 if event.result > 4 else 0
-            if event.result == 0 or event.result == 5:
-                sub_type = SubType.SUB_PG
-            elif event.result == 1 or event.result == 6:
-                sub_type = SubType.SUB_SG
-            elif event.result == 2 or event.result == 7:
-                sub_type = SubType.SUB_SF
-            elif event.result == 3 or event.result == 8:
-                sub_type = SubType.SUB_PF
-            elif event.result == 4 or event.result == 9:
-                sub_type = SubType.SUB_C
-
-            base_events.append(
-                SubEvent(
-                    comments,
-                    clocks,
-                    sub_type,
-                    event.player1 - 1,
-                    event.player2 - 1,
-                    team,
-                )
-            )
-        elif etype == 952:
-            assert event.result == 0 or event.result == 1
-            team = event.result
-            base_events.append(
-                SubEvent(
-                    comments,
-                    clocks,
-                    SubType.POS_SWAP,
-                    event.player1 - 1,
-                    event.player2 - 1,
-                    team,
-                )
-            )
-        elif etype == 961:
-            base_events.append(
-                BreakEvent(comments, clocks, BreakType.END_OF_QUARTER, -1)
-            )
-        elif etype == 962:
-            base_events.append(BreakEvent(comments, clocks, BreakType.END_OF_GAME, -1))
-        elif etype == 963:
-            base_events.append(BreakEvent(comments, clocks, BreakType.END_OF_HALF, -1))
-        else:
-            if etype != -100:
-                print(f"Unknown event {etype}")
+            903: _convert_injury(InjuryType.EXHAUSTED),
+            904: _convert_unsupported("CHECKME 904"),
+            931: _convert_rebound(),
+            933: _convert_rebound(ReboundType.JUMP_BALL),
+            # FIXME: result 7/8 might mean offensive/defensive
+            934: _convert_rebound(ReboundType.REBOUND_OUT_OF_BOUNDS),
+            951: _convert_sub,
+            952: _convert_swap,
+            961: _convert_break(BreakType.END_OF_QUARTER),
+            962: _convert_break(BreakType.END_OF_GAME),
+            963: _convert_break(BreakType.END_OF_HALF),
+        }
+    )
+    return converters
+
+
+# Raw event type -> handler, built once at import. Each handler appends the
+# converted event(s) and returns the index of the next raw event to read.
+EVENT_CONVERTERS = _build_converters()
+
+
+def convert(events: list[BBEvent] | ReportColumns) -> list[BaseEvent]:
+    if not isinstance(events, ReportColumns):
+        events = ReportColumns.from_events(events)
+
+    types = events.type
+    gameclocks = events.gameclock
+    realclocks = events.realclock
+    converters = EVENT_CONVERTERS
+
+    bb_idx = 0
+    base_events: list[BaseEvent] = []
+    count = len(types)
+
+    while bb_idx < count:
+        etype = types[bb_idx]
+        converter = converters.get(etype)
+        if converter is None:
+            if etype != -100 and tracer.level >= TraceLevel.DEBUG:
+                tracer.emit(TraceLevel.DEBUG, "unknown_event", type=etype)
+            bb_idx += 1
+            continue
+
+        comments = EventComments(events, bb_idx)
+        clocks = Clocks(gameclocks[bb_idx], realclocks[bb_idx], 0)
+        bb_idx = converter(events, bb_idx, comments, clocks, base_events)
 
     return base_events
 
 
-def create_shot(
-    team: int,
-    evtype: int,
-    pid: int,
-    pname: str,
-    gameclock: int,
-):
-    if evtype == 100:
-        loc8 = 0
-        loc9 = 90
-        loc10 = 94
-        loc11 = 16
-    elif evtype == 101:
-        loc8 = 60
-        loc9 = 20
-        loc10 = 94
-        loc11 = 16
-    elif evtype == 102:
-        loc8 = 0
-        loc9 = 60
-        loc10 = 94
-        loc11 = 16
-    elif evtype == 103:
-        loc8 = -12
-        loc9 = 22
-        loc10 = 94
-        loc11 = 16
-    elif evtype == 104:
-        loc8 = 40
-        loc9 = 60
-        loc10 = 94
-        loc11 = 40
-    elif evtype == 105:
-        loc8 = 40
-        loc9 = 60
-        loc10 = 130
-        loc11 = 60
-    elif evtype == 200:
-        loc8 = 0
-        loc9 = 90
-        loc10 = 40
-        loc11 = 450
-    elif evtype == 201:
-        loc8 = 50
-        loc9 = 20
-        loc10 = 45
-        loc11 = 30
-    elif evtype == 202:
-        loc8 = -10
-        loc9 = 60
-        loc10 = 45
-        loc11 = 40
-    elif evtype == 203:
-        loc8 = -15
-        loc9 = 4
-        loc10 = 35
-        loc11 = 50
-    elif evtype == 204:
-        loc8 = 70
-        loc9 = 20
-        loc10 = 55
-        loc11 = 35
-    elif evtype == 400:
-        loc8 = 0
-        loc9 = 90
-        loc10 = 8
-        loc11 = 40
-    elif evtype == 401:
-        loc8 = 0
-        loc9 = 90
-        loc10 = 8
-        loc11 = 24
-    elif evtype == 402:
-        loc8 = 0
-        loc9 = 90
-        loc10 = 9
-        loc11 = 42
-    else:
-        loc8 = 0
-        loc9 = 90
-        loc10 = 9
-        loc11 = 40
+# evtype -> (loc8, loc9, loc10, loc11): angle offset, angle spread,
+# distance offset and distance spread used by create_shot.
+SHOT_PARAMS = {
+    100: (0, 90, 94, 16),
+    101: (60, 20, 94, 16),
+    102: (0, 60, 94, 16),
+    103: (-12, 22, 94, 16),
+    104: (40, 60, 94, 40),
+    105: (40, 60, 130, 60),
+    200: (0, 90, 40, 450),
+    201: (50, 20, 45, 30),
+    202: (-10, 60, 45, 40),
+    203: (-15, 4, 35, 50),
+    204: (70, 20, 55, 35),
+    400: (0, 90, 8, 40),
+    401: (0, 90, 8, 24),
+    402: (0, 90, 9, 42),
+}
+DEFAULT_SHOT_PARAMS = (0, 90, 9, 40)
+
+
+def _shot_trig_table(team: int) -> dict[int, tuple[float, float]]:
+    # Angles are always whole degrees, so sin/cos can be precomputed with the
+    # exact same float operations create_shot used to run per shot.
+    table = {}
+    for degrees in range(-360, 361):
+        angle = math.radians(float(degrees))
+        if team == 0:
+            angle = -angle
+        table[degrees] = (math.sin(angle), math.cos(angle))
+    return table
+
+
+SHOT_TRIG = (_shot_trig_table(0), _shot_trig_table(1))
+SHOT_CACHE_SIZE = 1 << 16
+
+
+def compute_shot_position(
+    team: int, evtype: int, pid: int, gameclock: int
+) -> tuple[int, int]:
+    loc8, loc9, loc10, loc11 = SHOT_PARAMS.get(evtype, DEFAULT_SHOT_PARAMS)
 
     loc16 = pid >> gameclock % 3
     if loc16 < 0:
         loc16 *= -1
 
     loc12 = (loc16 - gameclock) % loc11 + loc10
-    loc13 = float((loc16 + gameclock) % loc9 + loc8)
+    loc13 = (loc16 + gameclock) % loc9 + loc8
     if gameclock % 2 == 1:
         loc13 = 180 - loc13
 
-    loc13 = math.radians(loc13)
     if team == 0:
-        loc13 = -loc13
-        x_coord = int(math.sin(loc13) * loc12 + 347)
-        y_coord = int(math.cos(loc13) * loc12 + 96)
+        sin, cos = SHOT_TRIG[0][loc13]
+        x_coord = int(sin * loc12 + 347)
+        y_coord = int(cos * loc12 + 96)
     else:
-        x_coord = int(math.sin(loc13) * loc12 + 21)
-        y_coord = int(math.cos(loc13) * loc12 + 96)
+        sin, cos = SHOT_TRIG[1][loc13]
+        x_coord = int(sin * loc12 + 21)
+        y_coord = int(cos * loc12 + 96)
 
     y_coord = max(min(y_coord, 188), 4)
     x_coord = max(min(x_coord, 364), 4)
     if evtype // 100 == 2:
         y_coord = max(min(y_coord, 176), 14)
 
-    return ShotPos(x_coord, y_coord)
+    return x_coord, y_coord
+
+
+# Re-parsing the same match (web reports, reruns over a cached season) hits the
+# same (pid, gameclock) pairs again, so single-shot lookups go through an LRU.
+shot_position = lru_cache(maxsize=SHOT_CACHE_SIZE)(compute_shot_position)
+
+
+def create_shot(
+    team: int,
+    evtype: int,
+    pid: int,
+    pname: str,
+    gameclock: int,
+):
+    return ShotPos(*shot_position(team, evtype, pid, gameclock))
 
 
 if __name__ == "__main__":
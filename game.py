@@ -1,18 +1,48 @@
+from array import array
+from bisect import bisect_right
 from typing import Dict
 
 from bbapi import BBApi
+from clocks import GAME_CLOCKS
 from team import Team
 from comments import Comments
+from serialize import write_game
 from event import *
 from event_types import *
 from stats import *
-import json
+from tracing import TraceLevel, tracer
+import time
+
+
+# Event class -> Extension hook called for it
+EVENT_HOOKS = {
+    ShotEvent: "on_shot_event",
+    InterruptEvent: "on_interrupt_event",
+    FoulEvent: "on_foul_event",
+    ReboundEvent: "on_rebound_event",
+    FreeThrowEvent: "on_free_throw_event",
+    InjuryEvent: "on_injury_event",
+    SubEvent: "on_sub_event",
+    BreakEvent: "on_break_event",
+}
 
 
 class Extension:
+    # True for extensions filling the possession columns of the box score
+    counts_possessions = False
+
     def __init__(self):
         pass
 
+    def overrides(self, hook: str) -> bool:
+        """True if this extension implements the hook itself, so Game.play can
+        skip the inherited no-ops."""
+        return getattr(type(self), hook) is not getattr(Extension, hook)
+
+    def on_game_start(self, game):
+        """Called once before the first event, with the starters on court."""
+        pass
+
     def on_shot_event(self, game, event):
         pass
 
@@ -42,7 +72,7 @@ class Game:
     def __init__(
         self,
         matchid: str,
-        events: list[BBEvent],
+        events: list[BBEvent] | ReportColumns,
         ht: Team,
         at: Team,
         args,
@@ -51,7 +81,7 @@ class Game:
         self.matchid = matchid
         self.events = events
         self.teams = [ht, at]
-        self.comments = Comments()
+        self.comments = Comments(getattr(args, "language", "en"))
         self.gameclock = 0
         self.shotclock = 24
         self.poss = 0
@@ -61,25 +91,30 @@ class Game:
         self.event_index = 0
         self.baseevents: list[BaseEvent] = []
         self.extensions = extensions
+        self.time_hooks = getattr(args, "time_hooks", False)
+        # "Class.method" -> [calls, seconds], filled when time_hooks is set
+        self.hook_timings: dict[str, list] = {}
 
     def update_clocks(self, shot: int, game: int):
-        self.shotclock = min(shot, Gameclock(game).till_break())
+        self.shotclock = min(shot, GAME_CLOCKS.till_break(game))
         self.gameclock = game
 
-        if self.args.print_events:
-            print(f"Set shotclock: {self.shotclock}")
+        if tracer.level >= TraceLevel.EVENTS:
+            tracer.emit(TraceLevel.EVENTS, "shotclock_set", shotclock=self.shotclock)
 
     def patch_clock(self, bev, prev_bev):
         clock_delta = bev.gameclock - prev_bev.gameclock
         bev.shotclock = max(0, self.shotclock - clock_delta)
 
-        if self.args.print_events:
-            print(f"Remaining shotclock: {bev.shotclock}")
+        if tracer.level >= TraceLevel.EVENTS:
+            tracer.emit(TraceLevel.EVENTS, "shotclock_left", shotclock=bev.shotclock)
 
     def update_possession(self, team: int):
         self.poss = team
-        if self.args.print_events:
-            print(f"Next possession: {self.teams[self.poss].name}")
+        if tracer.level >= TraceLevel.EVENTS:
+            tracer.emit(
+                TraceLevel.EVENTS, "possession", team=self.teams[self.poss].name
+            )
 
     def gameclock_normalized(self, gameclock: int):
         # TODO: translate gameclock at first parse
@@ -89,232 +124,50 @@ class Game:
         return clock
 
     def play(self) -> None:
-        idx = 0
-        for event in self.events:
-            comment = self.comments.get_comment(event, self.teams)
-            event.comment = comment
-            idx += 1
+        if not isinstance(self.events, ReportColumns):
+            self.events = ReportColumns.from_events(self.events)
+        # Actors are resolved now, commentary only when an event's comments
+        # are first read (tracing, saving, the web views).
+        self.comments.bind(self.events, self.teams)
 
+        counted = any(ext.counts_possessions for ext in self.extensions)
         for team in self.teams:
+            team.stats.possessions_counted = counted
             team.push_stat_sheet()
 
         self.baseevents = convert(self.events)
         prev_bev = BaseEvent([], Clocks(-1, -1, -1))
 
-        for idx, bev in enumerate(self.baseevents):
-            if self.args.print_events:
-                print()
-                print("###", bev.gameclock, bev.comments)
+        handlers, hooks = self.dispatch_tables()
+        for ext in self.extensions:
+            ext.on_game_start(self)
+        baseevents = self.baseevents
+        count = len(baseevents)
+
+        for idx, bev in enumerate(baseevents):
+            if tracer.level >= TraceLevel.EVENTS:
+                tracer.emit(
+                    TraceLevel.EVENTS,
+                    "event",
+                    gameclock=bev.gameclock,
+                    comments=bev.comments,
+                )
 
             self.event_index = idx
             gameclock = self.gameclock_normalized(bev.gameclock)
 
-            if isinstance(bev, ShotEvent):
-                att_team = self.teams[bev.att_team]
-                def_team = self.teams[bev.def_team]
-
-                if bev.is_3pt():
-                    pts = 3
-
-                    if not (bev.is_fouled() and bev.has_missed()):
-                        att_team.add_stats(Statistic.ThreePointsAtt, 1, bev.attacker)
-
-                    if bev.has_scored():
-                        att_team.add_stats(Statistic.ThreePointsMade, 1, bev.attacker)
-                else:
-                    pts = 2
-
-                if not (bev.is_fouled() and bev.has_missed()):
-                    att_team.add_stats(Statistic.FieldGoalsAtt, 1, bev.attacker)
-
-                self.patch_clock(bev, prev_bev)
-
-                if bev.has_scored():
-                    att_team.add_stats(Statistic.FieldGoalsMade, 1, bev.attacker)
-                    att_team.add_stats(Statistic.Points, pts, bev.attacker)
-                    for player in att_team.active:
-                        player.add_stats(Statistic.PlusMinus, pts)
-                    for player in def_team.active:
-                        player.add_stats(Statistic.PlusMinus, -pts)
-                    att_team.shot_chart.add_made(bev.shot_pos.x, bev.shot_pos.y)
-                    if not bev.is_fouled():
-                        self.update_clocks(24, gameclock)
-                        self.update_possession(bev.def_team)
-                else:
-                    att_team.shot_chart.add_miss(bev.shot_pos.x, bev.shot_pos.y)
-
-                if bev.is_blocked():
-                    def_team.add_stats(Statistic.Blocks, 1, bev.defender)
-
-                # Assist should only be awarded on made field goals.
-                if bev.is_assisted() and bev.has_scored():
-                    att_team.add_stats(Statistic.Assists, 1, bev.assistant)
-
-                for ext in self.extensions:
-                    ext.on_shot_event(self, bev)
-
-            elif isinstance(bev, FreeThrowEvent):
-                att_team = self.teams[bev.att_team]
-                def_team = self.teams[opponent(bev.att_team)]
-
-                att_team.add_stats(Statistic.FreeThrowsAtt, 1, bev.attacker)
-                if bev.has_scored():
-                    att_team.add_stats(Statistic.FreeThrowsMade, 1, bev.attacker)
-                    att_team.add_stats(Statistic.Points, 1, bev.attacker)
-
-                    for player in att_team.active:
-                        player.add_stats(Statistic.PlusMinus, 1)
-                    for player in def_team.active:
-                        player.add_stats(Statistic.PlusMinus, -1)
-
-                for ext in self.extensions:
-                    ext.on_free_throw_event(self, bev)
-
-            elif isinstance(bev, ReboundEvent):
-                att_team = self.teams[bev.att_team]
-                def_team = self.teams[bev.def_team]
-
-                if not bev.is_jumpball():
-                    self.patch_clock(bev, prev_bev)
-                    self.update_clocks(24, gameclock)
-
-                if bev.is_rebound():
-                    if bev.is_off_rebound():
-                        att_team.add_stats(Statistic.OffRebounds, 1, bev.attacker)
-                    else:
-                        def_team.add_stats(Statistic.DefRebounds, 1, bev.attacker)
-                        self.update_possession(bev.def_team)
-                elif bev.is_jumpball():
-                    bev.shotclock = 0
-                    self.update_clocks(24, gameclock)
-                    self.update_possession(bev.att_team)
-
-                    # Who will start each quarter
-                    if idx == 0:
-                        self.quater_poss = [
-                            bev.att_team,
-                            bev.def_team,
-                            bev.def_team,
-                            bev.att_team,
-                        ]
-
-                for ext in self.extensions:
-                    ext.on_rebound_event(self, bev)
-
-            elif isinstance(bev, InterruptEvent):
-                att_team = self.teams[bev.att_team]
-                def_team = self.teams[bev.def_team]
-
-                self.patch_clock(bev, prev_bev)
-
-                if bev.interrupt_type in (
-                    InterruptType.BALL_THROWN_OUT,
-                    InterruptType.LOST_HANDLE,
-                    InterruptType.THREE_SEC_VIOLATION,
-                    InterruptType.TRAVELLING,
-                ):
-                    att_team.add_stats(Statistic.Turnovers, 1, bev.attacker)
-                    self.update_clocks(24, gameclock)
-                    self.update_possession(bev.def_team)
-                elif bev.interrupt_type in (
-                    InterruptType.PASS_INTERCEPTED,
-                    InterruptType.BALL_STOLEN,
-                ):
-                    att_team.add_stats(Statistic.Turnovers, 1, bev.attacker)
-                    def_team.add_stats(Statistic.Steals, 1, bev.defender)
-                    self.update_clocks(24, gameclock)
-                    self.update_possession(bev.def_team)
-                elif bev.interrupt_type in (InterruptType.SHOTCLOCK_VIOLATION,):
-                    att_team.add_stats(Statistic.Turnovers, 1)
-                    self.update_clocks(24, gameclock)
-                    self.update_possession(bev.def_team)
-
-                for ext in self.extensions:
-                    ext.on_interrupt_event(self, bev)
-
-            elif isinstance(bev, FoulEvent):
-                att_team = self.teams[bev.att_team]
-                def_team = self.teams[bev.def_team]
-
-                self.patch_clock(bev, prev_bev)
-
-                if bev.foul_type == FoulType.OFFENSIVE_FOUL:
-                    att_team.add_stats(Statistic.Turnovers, 1, bev.attacker)
-                    att_team.add_stats(Statistic.Fouls, 1, bev.attacker)
-                    self.update_clocks(24, gameclock)
-                    self.update_possession(bev.def_team)
-                elif bev.foul_type == FoulType.PERSONAL_FOUL:
-                    if def_team.stats.qtr[self.quarter - 1].sheet[Statistic.Fouls] < 4:
-                        if bev.shotclock < 14:
-                            self.update_clocks(14, gameclock)
-                        else:
-                            self.update_clocks(bev.shotclock, gameclock)
-                    else:
-                        self.update_clocks(24, gameclock)
-                elif bev.foul_type == FoulType.SHOOTING_FOUL:
-                    self.update_clocks(24, gameclock)
-
-                if bev.foul_type in (
-                    FoulType.PERSONAL_FOUL,
-                    FoulType.SHOOTING_FOUL,
-                ):
-                    def_team.add_stats(Statistic.Fouls, 1, bev.defender)
-
-                for ext in self.extensions:
-                    ext.on_foul_event(self, bev)
-
-            elif isinstance(bev, InjuryEvent):
-                self.patch_clock(bev, prev_bev)
-
-                for ext in self.extensions:
-                    ext.on_injury_event(self, bev)
-
-            elif isinstance(bev, SubEvent):
-                team = self.teams[bev.team]
-                team.update_minutes(gameclock)
-
-                self.patch_clock(bev, prev_bev)
-
-                if bev.sub_type != SubType.POS_SWAP:
-                    team.make_sub(bev.sub_type, bev.player_out, bev.player_in)
-                else:
-                    team.make_swap(bev.player_in, bev.player_out)
-
-                for ext in self.extensions:
-                    ext.on_sub_event(self, bev)
-
-            elif isinstance(bev, BreakEvent):
-                if bev.break_type == BreakType.END_OF_QUARTER:
-                    self.update_clocks(24, bev.gameclock)
-
-                    if (
-                        self.quarter < 4
-                        or self.teams[0].points() == self.teams[1].points()
-                    ):
-                        self.teams[0].push_stat_sheet()
-                        self.teams[1].push_stat_sheet()
-                        self.quarter += 1
-
-                    if self.quarter <= 4:
-                        self.update_possession(self.quater_poss[self.quarter - 1])
-                elif bev.break_type == BreakType.END_OF_HALF:
-                    pass
-                elif bev.break_type == BreakType.END_OF_GAME:
-                    for team in self.teams:
-                        team.update_minutes(gameclock)
-                elif bev.break_type == BreakType.TIMEOUT_30:
-                    self.teams[bev.team].add_stats(Statistic.Timeouts30, 1)
-                elif bev.break_type == BreakType.TIMEOUT_60:
-                    self.teams[bev.team].add_stats(Statistic.Timeouts60, 1)
-
-                for ext in self.extensions:
-                    ext.on_break_event(self, bev)
+            event_class = type(bev)
+            handler = handlers.get(event_class)
+            if handler is not None:
+                handler(self, bev, prev_bev, gameclock)
+                for hook in hooks[event_class]:
+                    hook(self, bev)
 
             if (
-                idx + 1 < len(self.baseevents)
+                idx + 1 < count
                 and (
-                    bev.gameclock != self.baseevents[idx + 1].gameclock
-                    or isinstance(bev, ReboundEvent)
+                    bev.gameclock != baseevents[idx + 1].gameclock
+                    or event_class is ReboundEvent
                 )
             ) or bev.gameclock == -1:
                 prev_bev = bev
@@ -332,107 +185,443 @@ class Game:
             assert bbteams[0] == self.teams[1]
             assert bbteams[1] == self.teams[0]
 
-    def save(self, filename):
-        teams = []
-        for tid, team in enumerate(self.teams):
-            players = []
-
-            for pid, player in enumerate(team.players):
-                stats = {}
-                for qtr, stat in enumerate(player.stats.qtr, start=1):
-                    stats[f"q{qtr}"] = stat.player_stats()
-                stats["total"] = player.stats.full.player_stats()
-
-                p = {
-                    "id": player.id,
-                    "name": player.name,
-                    "starter": player.starter,
-                    "stats": stats,
-                }
-                players.append(p)
+    def dispatch_tables(self):
+        """Event class -> core handler, and event class -> hooks of the
+        extensions that override the matching Extension method. With
+        time_hooks set every call is wrapped in a timing counter."""
+        handlers = dict(EVENT_HANDLERS)
+        hooks = {}
+        for event_class, hook_name in EVENT_HOOKS.items():
+            hooks[event_class] = [
+                (f"{type(ext).__name__}.{hook_name}", getattr(ext, hook_name))
+                for ext in self.extensions
+                if ext.overrides(hook_name)
+            ]
+
+        if self.time_hooks:
+            for event_class, handler in handlers.items():
+                handlers[event_class] = self._timed(f"Game.{handler.__name__}", handler)
+            for event_class, entries in hooks.items():
+                hooks[event_class] = [self._timed(name, hook) for name, hook in entries]
+        else:
+            for event_class, entries in hooks.items():
+                hooks[event_class] = [hook for _, hook in entries]
+
+        return handlers, hooks
+
+    def _timed(self, name: str, func):
+        counter = self.hook_timings.setdefault(name, [0, 0.0])
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            start = perf_counter()
+            func(*args)
+            counter[0] += 1
+            counter[1] += perf_counter() - start
+
+        return timed
+
+    def play_shot(self, bev: ShotEvent, prev_bev: BaseEvent, gameclock: int) -> None:
+        att_team = self.teams[bev.att_team]
+        def_team = self.teams[bev.def_team]
+
+        if bev.is_3pt():
+            pts = 3
+
+            if not (bev.is_fouled() and bev.has_missed()):
+                att_team.add_stats(Statistic.ThreePointsAtt, 1, bev.attacker)
+
+            if bev.has_scored():
+                att_team.add_stats(Statistic.ThreePointsMade, 1, bev.attacker)
+        else:
+            pts = 2
+
+        if not (bev.is_fouled() and bev.has_missed()):
+            att_team.add_stats(Statistic.FieldGoalsAtt, 1, bev.attacker)
+
+        self.patch_clock(bev, prev_bev)
+
+        if bev.has_scored():
+            att_team.add_stats(Statistic.FieldGoalsMade, 1, bev.attacker)
+            att_team.add_stats(Statistic.Points, pts, bev.attacker)
+            for player in att_team.active:
+                player.add_stats(Statistic.PlusMinus, pts)
+            for player in def_team.active:
+                player.add_stats(Statistic.PlusMinus, -pts)
+            att_team.shot_chart.add_made(bev.shot_pos.x, bev.shot_pos.y)
+            if not bev.is_fouled():
+                self.update_clocks(24, gameclock)
+                self.update_possession(bev.def_team)
+        else:
+            att_team.shot_chart.add_miss(bev.shot_pos.x, bev.shot_pos.y)
+
+        if bev.is_blocked():
+            def_team.add_stats(Statistic.Blocks, 1, bev.defender)
+
+        # Assist should only be awarded on made field goals.
+        if bev.is_assisted() and bev.has_scored():
+            att_team.add_stats(Statistic.Assists, 1, bev.assistant)
+
+    def play_free_throw(
+        self, bev: FreeThrowEvent, prev_bev: BaseEvent, gameclock: int
+    ) -> None:
+        att_team = self.teams[bev.att_team]
+        def_team = self.teams[opponent(bev.att_team)]
 
-            stats = {}
-            for qtr, stat in enumerate(team.stats.qtr, start=1):
-                stats[f"q{qtr}"] = stat.team_stats()
-            stats["total"] = team.stats.full.team_stats()
+        att_team.add_stats(Statistic.FreeThrowsAtt, 1, bev.attacker)
+        if bev.has_scored():
+            att_team.add_stats(Statistic.FreeThrowsMade, 1, bev.attacker)
+            att_team.add_stats(Statistic.Points, 1, bev.attacker)
+
+            for player in att_team.active:
+                player.add_stats(Statistic.PlusMinus, 1)
+            for player in def_team.active:
+                player.add_stats(Statistic.PlusMinus, -1)
+
+    def play_rebound(
+        self, bev: ReboundEvent, prev_bev: BaseEvent, gameclock: int
+    ) -> None:
+        att_team = self.teams[bev.att_team]
+        def_team = self.teams[bev.def_team]
+
+        if not bev.is_jumpball():
+            self.patch_clock(bev, prev_bev)
+            self.update_clocks(24, gameclock)
+
+        if bev.is_rebound():
+            if bev.is_off_rebound():
+                att_team.add_stats(Statistic.OffRebounds, 1, bev.attacker)
+            else:
+                def_team.add_stats(Statistic.DefRebounds, 1, bev.attacker)
+                self.update_possession(bev.def_team)
+        elif bev.is_jumpball():
+            bev.shotclock = 0
+            self.update_clocks(24, gameclock)
+            self.update_possession(bev.att_team)
+
+            # Who will start each quarter
+            if self.event_index == 0:
+                self.quater_poss = [
+                    bev.att_team,
+                    bev.def_team,
+                    bev.def_team,
+                    bev.att_team,
+                ]
+
+    def play_interrupt(
+        self, bev: InterruptEvent, prev_bev: BaseEvent, gameclock: int
+    ) -> None:
+        att_team = self.teams[bev.att_team]
+        def_team = self.teams[bev.def_team]
+
+        self.patch_clock(bev, prev_bev)
+
+        if bev.interrupt_type in (
+            InterruptType.BALL_THROWN_OUT,
+            InterruptType.LOST_HANDLE,
+            InterruptType.THREE_SEC_VIOLATION,
+            InterruptType.TRAVELLING,
+        ):
+            att_team.add_stats(Statistic.Turnovers, 1, bev.attacker)
+            self.update_clocks(24, gameclock)
+            self.update_possession(bev.def_team)
+        elif bev.interrupt_type in (
+            InterruptType.PASS_INTERCEPTED,
+            InterruptType.BALL_STOLEN,
+        ):
+            att_team.add_stats(Statistic.Turnovers, 1, bev.attacker)
+            def_team.add_stats(Statistic.Steals, 1, bev.defender)
+            self.update_clocks(24, gameclock)
+            self.update_possession(bev.def_team)
+        elif bev.interrupt_type in (InterruptType.SHOTCLOCK_VIOLATION,):
+            att_team.add_stats(Statistic.Turnovers, 1)
+            self.update_clocks(24, gameclock)
+            self.update_possession(bev.def_team)
+
+    def play_foul(self, bev: FoulEvent, prev_bev: BaseEvent, gameclock: int) -> None:
+        att_team = self.teams[bev.att_team]
+        def_team = self.teams[bev.def_team]
+
+        self.patch_clock(bev, prev_bev)
+
+        if bev.foul_type == FoulType.OFFENSIVE_FOUL:
+            att_team.add_stats(Statistic.Turnovers, 1, bev.attacker)
+            att_team.add_stats(Statistic.Fouls, 1, bev.attacker)
+            self.update_clocks(24, gameclock)
+            self.update_possession(bev.def_team)
+        elif bev.foul_type == FoulType.PERSONAL_FOUL:
+            if def_team.stats.qtr[self.quarter - 1].sheet[Statistic.Fouls] < 4:
+                if bev.shotclock < 14:
+                    self.update_clocks(14, gameclock)
+                else:
+                    self.update_clocks(bev.shotclock, gameclock)
+            else:
+                self.update_clocks(24, gameclock)
+        elif bev.foul_type == FoulType.SHOOTING_FOUL:
+            self.update_clocks(24, gameclock)
+
+        if bev.foul_type in (
+            FoulType.PERSONAL_FOUL,
+            FoulType.SHOOTING_FOUL,
+        ):
+            def_team.add_stats(Statistic.Fouls, 1, bev.defender)
+
+    def play_injury(
+        self, bev: InjuryEvent, prev_bev: BaseEvent, gameclock: int
+    ) -> None:
+        self.patch_clock(bev, prev_bev)
+
+    def play_sub(self, bev: SubEvent, prev_bev: BaseEvent, gameclock: int) -> None:
+        team = self.teams[bev.team]
+        team.update_minutes(gameclock)
+
+        self.patch_clock(bev, prev_bev)
+
+        if bev.sub_type != SubType.POS_SWAP:
+            team.make_sub(bev.sub_type, bev.player_out, bev.player_in)
+        else:
+            team.make_swap(bev.player_in, bev.player_out)
+
+    def play_break(self, bev: BreakEvent, prev_bev: BaseEvent, gameclock: int) -> None:
+        if bev.break_type == BreakType.END_OF_QUARTER:
+            self.update_clocks(24, bev.gameclock)
+
+            if self.quarter < 4 or self.teams[0].points() == self.teams[1].points():
+                self.teams[0].push_stat_sheet()
+                self.teams[1].push_stat_sheet()
+                self.quarter += 1
+
+            if self.quarter <= 4:
+                self.update_possession(self.quater_poss[self.quarter - 1])
+        elif bev.break_type == BreakType.END_OF_HALF:
+            pass
+        elif bev.break_type == BreakType.END_OF_GAME:
+            for team in self.teams:
+                team.update_minutes(gameclock)
+        elif bev.break_type == BreakType.TIMEOUT_30:
+            self.teams[bev.team].add_stats(Statistic.Timeouts30, 1)
+        elif bev.break_type == BreakType.TIMEOUT_60:
+            self.teams[bev.team].add_stats(Statistic.Timeouts60, 1)
 
-            t = {"id": team.id, "name": team.name, "players": players, "stats": stats}
-            teams.append(t)
+    def to_json(self) -> dict:
+        teams = [team.to_json() for team in self.teams]
 
         events = []
         for event in self.baseevents:
             events.append(event.to_json())
 
-        game = {
+        return {
             "teamHome": teams[0],
             "teamAway": teams[1],
             "events": events,
         }
 
+    def save(self, filename, compact: bool = False):
+        """Stream the game document to filename; see serialize.write_game."""
         with open(filename, "w", encoding='utf-8') as f:
-            json.dump(game, f, indent=4, ensure_ascii=False)
+            write_game(self, f, compact_format=compact)
 
 
-class Possessions(Extension):
+# Event class -> Game method applying it to the box score and clocks
+EVENT_HANDLERS = {
+    ShotEvent: Game.play_shot,
+    FreeThrowEvent: Game.play_free_throw,
+    ReboundEvent: Game.play_rebound,
+    InterruptEvent: Game.play_interrupt,
+    FoulEvent: Game.play_foul,
+    InjuryEvent: Game.play_injury,
+    SubEvent: Game.play_sub,
+    BreakEvent: Game.play_break,
+}
+
+
+class PossessionOutcome(IntEnum):
+    SCORED = 0
+    MISSED = 1
+    TURNOVER = 2
+    END_OF_PERIOD = 3
+
+
+# Columns of a PossessionTable, in order
+POSSESSION_COLUMNS = ("start", "end", "start_clock", "end_clock", "team", "outcome", "points")
+
+# Longest transition possession counted as a fast break
+FAST_BREAK_SECS = 8
+
+
+class PossessionTable:
+    """Possessions of a game as parallel int arrays, one row per possession:
+    first/last event index, game clock when the ball was won and lost, team,
+    PossessionOutcome and points scored."""
+
+    __slots__ = POSSESSION_COLUMNS
+
     def __init__(self) -> None:
+        for column in POSSESSION_COLUMNS:
+            setattr(self, column, array("i"))
+
+    def __len__(self) -> int:
+        return len(self.team)
+
+    def append(self, *row: int) -> None:
+        for column, value in zip(POSSESSION_COLUMNS, row):
+            getattr(self, column).append(value)
+
+    def count(self, team: int) -> int:
+        return self.team.count(team)
+
+    def scored(self, team: int) -> int:
+        return sum(pts for side, pts in zip(self.team, self.points) if side == team)
+
+    def seconds(self, team: int) -> int:
+        return sum(
+            end - start
+            for side, start, end in zip(self.team, self.start_clock, self.end_clock)
+            if side == team
+        )
+
+    def points_per_possession(self, team: int) -> float | None:
+        count = self.count(team)
+        return round(self.scored(team) / count, 3) if count else None
+
+    def pace(self) -> float | None:
+        """Possessions per team per 48 minutes."""
+        secs = self.seconds(0) + self.seconds(1)
+        return round(len(self) / 2 * 2880 / secs, 1) if secs else None
+
+    def to_json(self) -> dict:
+        return {column: getattr(self, column).tolist() for column in POSSESSION_COLUMNS}
+
+
+class PossessionTracker(Extension):
+    """Splits the game into possessions while it is played.
+
+    A possession ends on a made field goal, a turnover, a defensive rebound
+    or the end of a period, or when the other team is next seen with the
+    ball (after free throws). Each one is added to `table` and passed to
+    on_possession(game, team) when given. The box score is left alone;
+    Possessions fills its columns.
+    """
+
+    def __init__(self, on_possession=None) -> None:
         super().__init__()
+        self.on_possession = on_possession
+        # Shotclock left at the end of each possession, per team
         self.possessions: list[list[int]] = [[], []]
-
-    def add_possession(self, game: Game, team, shotclock):
+        self.table = PossessionTable()
+        # Open possession: team with the ball (None between periods), its
+        # first event, the clock it started at and its latest event
+        self.team: int | None = None
+        self.start = 0
+        self.start_clock = 0
+        self.last = 0
+        self.last_clock = 0
+        self.last_shotclock = 24
+        self.points = 0
+        self.transition = False
+        # Box score row of the period the open possession was last seen in
+        self.row = None
+
+    def add_possession(self, game: Game, team, shotclock, secs):
         assert team == 0 or team == 1
         assert shotclock >= 0 and shotclock <= 24, f"Got shotclock {shotclock}!"
         self.possessions[team].append(shotclock)
-
-        if game.args.print_events:
-            print(
-                f"nPossessions: {len(self.possessions[1])}:{len(self.possessions[0])} (+1 {game.teams[team].name})"
+        if self.on_possession is not None:
+            self.on_possession(game, team)
+
+        if tracer.level >= TraceLevel.EVENTS:
+            tracer.emit(
+                TraceLevel.EVENTS,
+                "possessions",
+                away=len(self.possessions[1]),
+                home=len(self.possessions[0]),
+                team=game.teams[team].name,
             )
 
+    def advance(self, game: Game, event: BaseEvent, team: int) -> None:
+        """Add event to the possession of team, ending the other team's one."""
+        if self.team is not None and self.team != team:
+            outcome = PossessionOutcome.SCORED if self.points else PossessionOutcome.MISSED
+            self.end_possession(game, outcome, self.last_shotclock)
+        if self.team is None:
+            self.team = team
+        self.last = game.event_index
+        self.last_clock = max(self.start_clock, game.gameclock_normalized(event.gameclock))
+        self.last_shotclock = min(max(event.shotclock, 0), 24)
+        self.row = game.teams[team].stats.current
+
+    def end_possession(self, game: Game, outcome: PossessionOutcome, shotclock: int) -> None:
+        team = self.team
+        if team is None:
+            return
+        secs = self.last_clock - self.start_clock
+        self.table.append(
+            self.start, self.last, self.start_clock, self.last_clock, team, outcome, self.points
+        )
+        self.add_possession(game, team, shotclock, secs)
+
+        self.team = None
+        self.start = self.last + 1
+        self.start_clock = self.last_clock
+        self.points = 0
+        self.transition = outcome in (PossessionOutcome.MISSED, PossessionOutcome.TURNOVER)
+
     def on_shot_event(self, game, event: ShotEvent):
+        self.advance(game, event, event.att_team)
+        if event.has_scored():
+            self.points += 3 if event.is_3pt() else 2
         # For other shot results the def teams needs to rebound ball first
         if event.shot_result in (ShotResult.SCORED, ShotResult.GOALTEND):
-            self.add_possession(game, event.att_team, event.shotclock)
+            self.end_possession(game, PossessionOutcome.SCORED, event.shotclock)
+
+    def on_free_throw_event(self, game, event: FreeThrowEvent):
+        self.advance(game, event, event.att_team)
+        if event.has_scored():
+            self.points += 1
 
     def on_interrupt_event(self, game, event: InterruptEvent):
-        self.add_possession(game, event.att_team, event.shotclock)
+        self.advance(game, event, event.att_team)
+        self.end_possession(game, PossessionOutcome.TURNOVER, event.shotclock)
 
     def on_foul_event(self, game, event: FoulEvent):
+        self.advance(game, event, event.att_team)
         if event.foul_type == FoulType.OFFENSIVE_FOUL:
-            self.add_possession(game, event.att_team, event.shotclock)
-        # elif (
-        #     event.foul_type == FoulType.PERSONAL_FOUL
-        #     and game.teams[event.def_team]
-        #     .stats.qtr[game.quarter - 1]
-        #     .sheet[Statistic.Fouls]
-        #     > 4
-        # ):
-        #     self.add_possession(game, event.att_team, event.shotclock)
+            self.end_possession(game, PossessionOutcome.TURNOVER, event.shotclock)
 
     def on_rebound_event(self, game: Game, event: ReboundEvent):
+        self.advance(game, event, event.att_team)
         # Defensive team gained possession by rebounding ball
         # game.poss is already reflecting possession change
         if game.poss == event.def_team:
-            self.add_possession(game, event.att_team, event.shotclock)
-
-    def on_free_throw_event(self, game: Game, event: FreeThrowEvent):
-        pass
-
-    def on_injury_event(self, game: Game, event: InjuryEvent):
-        pass
-
-    def on_sub_event(self, game: Game, event: SubEvent):
-        pass
+            self.end_possession(game, PossessionOutcome.MISSED, event.shotclock)
 
     def on_break_event(self, game: Game, event: BreakEvent):
-        if event.break_type == BreakType.END_OF_QUARTER:
-            prev_bev = game.baseevents[game.event_index - 1]
-            if isinstance(prev_bev, ShotEvent) and prev_bev.shot_result not in (
-                ShotResult.SCORED,
-                ShotResult.GOALTEND,
-            ):
-                self.add_possession(game, prev_bev.att_team, event.shotclock)
-            elif isinstance(prev_bev, FreeThrowEvent):
-                self.add_possession(game, prev_bev.att_team, event.shotclock)
+        if event.break_type in (BreakType.END_OF_QUARTER, BreakType.END_OF_GAME):
+            clock = max(self.start_clock, game.gameclock_normalized(event.gameclock))
+            if self.team is not None:
+                self.last_clock = clock
+                outcome = PossessionOutcome.SCORED if self.points else PossessionOutcome.END_OF_PERIOD
+                self.end_possession(game, outcome, min(max(event.shotclock, 0), 24))
+            # Next period starts with a fresh possession
+            self.start = game.event_index + 1
+            self.start_clock = clock
+            self.transition = False
+
+
+class Possessions(PossessionTracker):
+    """PossessionTracker that also gives the team's box score its
+    possessions, time of possession and fast break points."""
+
+    counts_possessions = True
+
+    def add_possession(self, game: Game, team, shotclock, secs):
+        # A period break has already pushed the next period's row
+        row = self.row
+        row[Statistic.Possessions] += 1
+        row[Statistic.TimeOfPossession] += secs
+        if self.transition and secs <= FAST_BREAK_SECS and self.points:
+            row[Statistic.FastBreakPoints] += self.points
+        super().add_possession(game, team, shotclock, secs)
 
 
 class ShotTypes(Extension):
@@ -477,23 +666,359 @@ class ShotTypes(Extension):
         shot_type[result] += 1
         self.shot_types[event.att_team][str(event.shot_type)] = shot_type
 
-    def on_interrupt_event(self, game: Game, event: InterruptEvent):
-        pass
 
-    def on_foul_event(self, game: Game, event: FoulEvent):
-        pass
+class Checkpoint:
+    """Box score after the first event_index events of a game."""
+
+    __slots__ = (
+        "event_index",
+        "gameclock",
+        "quarter",
+        "teams",
+        "players",
+        "active",
+        "last_update",
+        "final",
+        "possessions_counted",
+    )
+
+    def __init__(self, game: Game, event: BaseEvent) -> None:
+        self.event_index = game.event_index + 1
+        self.gameclock = event.gameclock
+        self.quarter = game.quarter
+        self.teams = [team.stats.totals() for team in game.teams]
+        self.possessions_counted = game.teams[0].stats.possessions_counted
+        self.players = [
+            [player.stats.totals() for player in team.players] for team in game.teams
+        ]
+        self.active = [active_slots(team) for team in game.teams]
+        self.last_update = [team.last_update for team in game.teams]
+        # Minutes stop running once the game is over
+        self.final = (
+            isinstance(event, BreakEvent) and event.break_type == BreakType.END_OF_GAME
+        )
 
-    def on_rebound_event(self, game: Game, event: ReboundEvent):
-        pass
+    def score(self) -> tuple[int, int]:
+        return (self.teams[0][Statistic.Points], self.teams[1][Statistic.Points])
+
+    def seconds(self, side: int, slot: int, gameclock: int) -> list[int]:
+        """Per-position seconds of a player at gameclock, counting the time
+        played since the last minutes update for players on court."""
+        totals = self.players[side][slot]
+        secs = [totals[stat] for stat in POSITION_SECS]
+        active = self.active[side]
+        if slot in active and not self.final:
+            clock = gameclock
+            if self.quarter > 4:
+                clock -= (self.quarter - 4) * 420
+            secs[active.index(slot)] += max(0, clock - self.last_update[side])
+        return secs
+
+
+POSITION_SECS = (
+    Statistic.SecsPG,
+    Statistic.SecsSG,
+    Statistic.SecsSF,
+    Statistic.SecsPF,
+    Statistic.SecsC,
+)
+
+# Player columns of a keyframe row sent to the animation view, in order
+KEYFRAME_STATS = (
+    ("pts", Statistic.Points),
+    ("fgm", Statistic.FieldGoalsMade),
+    ("fga", Statistic.FieldGoalsAtt),
+    ("tpm", Statistic.ThreePointsMade),
+    ("tpa", Statistic.ThreePointsAtt),
+    ("ftm", Statistic.FreeThrowsMade),
+    ("fta", Statistic.FreeThrowsAtt),
+    ("or", Statistic.OffRebounds),
+    ("dr", Statistic.DefRebounds),
+    ("ast", Statistic.Assists),
+    ("to", Statistic.Turnovers),
+    ("stl", Statistic.Steals),
+    ("blk", Statistic.Blocks),
+    ("pf", Statistic.Fouls),
+    ("pm", Statistic.PlusMinus),
+)
+
+
+def active_slots(team: Team) -> list[int | None]:
+    """Roster indexes of the players on court, by position."""
+    slots = {id(player): slot for slot, player in enumerate(team.players)}
+    return [slots.get(id(player)) for player in team.active]
+
+
+class BoxScoreTimeline(Extension):
+    """Records cumulative box score checkpoints while a game is played.
+
+    A checkpoint is taken after every `every` events when set, and with
+    on_changes after every scoring, substitution and break event, which
+    keeps the score and lineups of at() exact. Only `every=1` records every
+    stat change, so box_score() needs it. Clocks are the report's game
+    clocks, as in the events; queries bisect them, so they are O(log n) in
+    the number of checkpoints.
+    """
+
+    def __init__(self, every: int = 0, on_changes: bool = True) -> None:
+        super().__init__()
+        self.every = every
+        self.on_changes = on_changes
+        self.checkpoints: list[Checkpoint] = []
+        self.gameclocks: list[int] = []
+        self.since_checkpoint = 0
+        # Latest clock seen; keeps gameclocks sorted for bisect even if a
+        # report's clock steps back
+        self.gameclock = 0
 
-    def on_free_throw_event(self, game: Game, event: FreeThrowEvent):
-        pass
+    def record(self, game: Game, event: BaseEvent, changed: bool) -> None:
+        self.since_checkpoint += 1
+        self.gameclock = max(self.gameclock, event.gameclock)
+        if (changed and self.on_changes) or (
+            self.every and self.since_checkpoint >= self.every
+        ):
+            self.checkpoints.append(Checkpoint(game, event))
+            self.gameclocks.append(self.gameclock)
+            self.since_checkpoint = 0
 
-    def on_injury_event(self, game: Game, event: InjuryEvent):
-        pass
+    def on_shot_event(self, game, event: ShotEvent):
+        self.record(game, event, event.has_scored())
 
-    def on_sub_event(self, game: Game, event: SubEvent):
-        pass
+    def on_free_throw_event(self, game, event: FreeThrowEvent):
+        self.record(game, event, event.has_scored())
 
-    def on_break_event(self, game: Game, event: BreakEvent):
-        pass
+    def on_sub_event(self, game, event: SubEvent):
+        self.record(game, event, True)
+
+    def on_break_event(self, game, event: BreakEvent):
+        self.record(game, event, True)
+
+    def on_interrupt_event(self, game, event: InterruptEvent):
+        self.record(game, event, False)
+
+    def on_foul_event(self, game, event: FoulEvent):
+        self.record(game, event, False)
+
+    def on_rebound_event(self, game, event: ReboundEvent):
+        self.record(game, event, False)
+
+    def on_injury_event(self, game, event: InjuryEvent):
+        self.record(game, event, False)
+
+    def at(self, gameclock: int) -> Checkpoint | None:
+        """Latest checkpoint taken at or before gameclock."""
+        index = bisect_right(self.gameclocks, gameclock)
+        return self.checkpoints[index - 1] if index else None
+
+    def box_score(self, gameclock: int) -> dict:
+        """Score line, lineups and team/player box score at gameclock."""
+        if self.every != 1:
+            raise ValueError("box_score() needs a checkpoint after every event (every=1)")
+        checkpoint = self.at(gameclock)
+        if checkpoint is None:
+            return {"gameclock": gameclock, "score": [0, 0], "active": [[], []], "teams": [], "players": []}
+
+        players = []
+        for side, rows in enumerate(checkpoint.players):
+            side_players = []
+            for slot, totals in enumerate(rows):
+                sheet = StatSheet(array("i", totals))
+                for stat, secs in zip(POSITION_SECS, checkpoint.seconds(side, slot, gameclock)):
+                    sheet.sheet[stat] = secs
+                side_players.append(sheet.player_stats())
+            players.append(side_players)
+
+        return {
+            "gameclock": gameclock,
+            "score": list(checkpoint.score()),
+            "active": checkpoint.active,
+            "teams": [StatSheet(totals).team_stats(checkpoint.possessions_counted) for totals in checkpoint.teams],
+            "players": players,
+        }
+
+    def keyframes(self) -> list[dict]:
+        """Compact checkpoints for the animation view: each one lets the
+        browser resume its replay after feed event "i" at clock "c" instead
+        of from the tip-off. Rows hold seconds played followed by
+        KEYFRAME_STATS; team rows carry no seconds and the point
+        differential as +/-."""
+        frames = []
+        for checkpoint, gameclock in zip(self.checkpoints, self.gameclocks):
+            home, away = checkpoint.score()
+            frames.append(
+                {
+                    "i": checkpoint.event_index,
+                    "c": gameclock,
+                    "a": checkpoint.active,
+                    "t": [
+                        [0] + [totals[stat] for _, stat in KEYFRAME_STATS[:-1]] + [diff]
+                        for totals, diff in zip(checkpoint.teams, (home - away, away - home))
+                    ],
+                    "p": [
+                        [
+                            [sum(checkpoint.seconds(side, slot, gameclock))]
+                            + [totals[stat] for _, stat in KEYFRAME_STATS]
+                            for slot, totals in enumerate(rows)
+                        ]
+                        for side, rows in enumerate(checkpoint.players)
+                    ],
+                }
+            )
+        return frames
+
+
+class Stint:
+    """Stretch of a game played by one five-man lineup of a team."""
+
+    __slots__ = (
+        "side",
+        "lineup",
+        "start",
+        "end",
+        "pts_for",
+        "pts_against",
+        "poss_for",
+        "poss_against",
+    )
+
+    def __init__(self, side: int, lineup: tuple[int, ...], start: int) -> None:
+        self.side = side
+        self.lineup = lineup
+        self.start = start
+        self.end = start
+        self.pts_for = 0
+        self.pts_against = 0
+        self.poss_for = 0
+        self.poss_against = 0
+
+    def secs(self) -> int:
+        return max(0, self.end - self.start)
+
+    def is_empty(self) -> bool:
+        """True for a lineup that never played: no time, points or possessions."""
+        return not (self.secs() or self.pts_for or self.pts_against or self.poss_for or self.poss_against)
+
+    def plus_minus(self) -> int:
+        return self.pts_for - self.pts_against
+
+
+# Columns of a LineupStints.by_lineup() row
+STINT_COLUMNS = ("stints", "secs", "pts_for", "pts_against", "poss_for", "poss_against")
+
+
+def lineup_key(team: Team) -> tuple[int, ...]:
+    """Sorted roster indexes of the players on court; positions don't matter."""
+    return tuple(sorted(slot for slot in active_slots(team) if slot is not None))
+
+
+class LineupStints(Extension):
+    """Splits a game into the stints of every five-man lineup of both teams.
+
+    The starters' stints open before the first event. A stint ends when a
+    substitution changes the team's lineup (position swaps don't) and at the
+    end of the game; lineups that only exist between substitutions at the
+    same clock get no stint. Possessions are counted by a PossessionTracker
+    and credited to the lineups on court; the box score columns are left to
+    Possessions.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tracker = PossessionTracker(on_possession=self.add_possession)
+        self.table = self.tracker.table
+        self.stints: list[Stint] = []
+        self.current: list[Stint | None] = [None, None]
+        # Stint each open one took over from
+        self.previous: list[Stint | None] = [None, None]
+
+    def on_game_start(self, game):
+        for side in (0, 1):
+            self.current[side] = Stint(side, lineup_key(game.teams[side]), 0)
+            self.stints.append(self.current[side])
+
+    def stint(self, game: Game, side: int, gameclock: int) -> Stint:
+        """Open stint of side, starting a new one if its lineup changed."""
+        stint = self.current[side]
+        stint.end = max(stint.end, gameclock)
+        lineup = lineup_key(game.teams[side])
+        if stint.lineup == lineup:
+            return stint
+
+        if stint.is_empty():
+            previous = self.previous[side]
+            if previous is not None and previous.lineup == lineup and previous.end == gameclock:
+                # Subbed out and straight back in: the earlier stint goes on
+                self.stints.remove(stint)
+                self.current[side] = previous
+                self.previous[side] = None
+                return previous
+            # Replaced by another substitution at the same clock
+            stint.lineup = lineup
+            return stint
+
+        self.previous[side] = stint
+        stint = self.current[side] = Stint(side, lineup, gameclock)
+        self.stints.append(stint)
+        return stint
+
+    def add_points(self, game: Game, event: BaseEvent, att_team: int, pts: int):
+        gameclock = game.gameclock_normalized(event.gameclock)
+        self.stint(game, att_team, gameclock).pts_for += pts
+        self.stint(game, opponent(att_team), gameclock).pts_against += pts
+
+    def add_possession(self, game: Game, team: int):
+        gameclock = game.gameclock_normalized(game.gameclock)
+        self.stint(game, team, gameclock).poss_for += 1
+        self.stint(game, opponent(team), gameclock).poss_against += 1
+
+    def on_shot_event(self, game, event: ShotEvent):
+        self.tracker.on_shot_event(game, event)
+        if event.has_scored():
+            self.add_points(game, event, event.att_team, 3 if event.is_3pt() else 2)
+
+    def on_free_throw_event(self, game, event: FreeThrowEvent):
+        self.tracker.on_free_throw_event(game, event)
+        if event.has_scored():
+            self.add_points(game, event, event.att_team, 1)
+
+    def on_interrupt_event(self, game, event: InterruptEvent):
+        self.tracker.on_interrupt_event(game, event)
+
+    def on_foul_event(self, game, event: FoulEvent):
+        self.tracker.on_foul_event(game, event)
+
+    def on_rebound_event(self, game, event: ReboundEvent):
+        self.tracker.on_rebound_event(game, event)
+
+    def on_sub_event(self, game, event: SubEvent):
+        self.stint(game, event.team, game.gameclock_normalized(event.gameclock))
+
+    def on_break_event(self, game, event: BreakEvent):
+        self.tracker.on_break_event(game, event)
+        if event.break_type == BreakType.END_OF_GAME:
+            gameclock = game.gameclock_normalized(event.gameclock)
+            for side in (0, 1):
+                self.stint(game, side, gameclock)
+
+    def by_lineup(self) -> list[dict[tuple[int, ...], list[int]]]:
+        """Per team, lineup -> summed STINT_COLUMNS over its stints."""
+        tables: list[dict[tuple[int, ...], list[int]]] = [{}, {}]
+        for stint in self.stints:
+            row = tables[stint.side].setdefault(stint.lineup, [0] * len(STINT_COLUMNS))
+            row[0] += 1
+            row[1] += stint.secs()
+            row[2] += stint.pts_for
+            row[3] += stint.pts_against
+            row[4] += stint.poss_for
+            row[5] += stint.poss_against
+        return tables
+
+    def to_json(self) -> list[list[dict]]:
+        """Per team, one row per lineup, longest played first."""
+        return [
+            [
+                {"lineup": list(lineup), **dict(zip(STINT_COLUMNS, row))}
+                for lineup, row in sorted(table.items(), key=lambda item: -item[1][1])
+            ]
+            for table in self.by_lineup()
+        ]
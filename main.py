@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
 import requests
 import xml.etree.ElementTree as XML
 from tabulate import tabulate, SEPARATING_LINE
@@ -11,15 +16,31 @@ from event import *
 from player import Player
 from team import Team
 from bbapi import *
+from comments import COMMENTARY_FILES
+from resource_cache import cache_for
+from serialize import compact
+from tracing import JsonLinesSink, TraceLevel, tracer
 
 
 BASE_DIR = Path(__file__).resolve().parent
 CACHE_DIR = BASE_DIR / "matches"
+# Game args of an offline replay: no BBAPI login, output or verification
+PLAY_ARGS = argparse.Namespace(
+    username=None,
+    password=None,
+    print_events=False,
+    print_stats=False,
+    save_charts=False,
+    verify=False,
+)
 
 
-def parse_report(report: str, at: Team, ht: Team) -> list[BBEvent]:
-    events = []
+HEX_DIGITS = {c: int(c, 16) for c in "0123456789abcdefABCDEF"}
+# Shared data strings for the synthetic shot result events, indexed by result.
+RESULT_EVENT_DATA = tuple("000{}0000".format(result) for result in range(16))
+
 
+def read_rosters(report: str, at: Team, ht: Team) -> int:
     # Read players
     i = 0
     index = 0
@@ -44,116 +65,285 @@ def parse_report(report: str, at: Team, ht: Team) -> list[BBEvent]:
     pos = 0
     while i < 197:
         id = int(report[i], 16) - 1
-        if __debug__:
-            print("starter: ", id, f"{ht.players[id]}")
+        if tracer.level >= TraceLevel.DEBUG:
+            tracer.emit(TraceLevel.DEBUG, "starter", index=id, player=str(ht.players[id]))
         ht.set_starter(id, pos)
         i += 1
         pos += 1
     pos = 0
     while i < 202:
         id = int(report[i], 16) - 1
-        if __debug__:
-            print("starter: ", id, f"{at.players[id]}")
+        if tracer.level >= TraceLevel.DEBUG:
+            tracer.emit(TraceLevel.DEBUG, "starter", index=id, player=str(at.players[id]))
         at.set_starter(id, pos)
         i += 1
         pos += 1
 
-    # Read events
-    while i < len(report):
-        s = report[i : i + 17]
-
-        e = BBEvent(
-            team=int(s[0]),
-            type=int(s[1:4]),
-            result=int(s[4], 16),
-            variation=int(s[6], 16),
-            player1=int(s[7], 16),
-            player2=int(s[8], 16),
-            gameclock=int(s[9:13]),
-            realclock=int(s[13:17]),
-            data=s[1:9],
-        )
-
-        sub_type = e.type // 100
-        if int(s[5]) > 0:
-            e.type = -100
-            e.result = 0
-            sub_type = 99
-
-        events.append(e)
-
-        if sub_type in (1, 2, 4):
-            n = BBEvent(
-                team=e.team,
-                type=0,
-                variation=0,
-                result=e.result,
-                player1=e.player1,
-                player2=e.player2,
-                gameclock=e.gameclock.clock,
-                realclock=e.realclock + 2,
-                data="",
-            )
-
-            if n.result > 9:
-                n.result -= 9
-            if e.result > 9:
-                n.data = "000{}0000".format(e.result - 9)
-            else:
-                n.data = "000{}0000".format(e.result)
+    return i
+
+
+# Characters of the rosters and starters at the start of a ReportString
+ROSTER_LENGTH = 202
+EVENT_LENGTH = 17
+
+
+class ReportDecoder:
+    """Decodes a ReportString fed in pieces of any size into parallel
+    columns, without allocating a BBEvent per chunk.
+
+    Every event is decoded as soon as its 17 characters have arrived, so a
+    report streamed out of its document is decoded while the rest is still
+    being read. The roster header is kept until finish() applies it to the
+    teams, which are only complete once the document is.
+    """
+
+    def __init__(self) -> None:
+        self.columns = ReportColumns()
+        self.header = ""
+        # Characters of an event whose chunk is not complete yet
+        self.pending = ""
+        self.size = 0
+
+    def feed(self, text: str) -> None:
+        text = "".join(text.split())
+        self.size += len(text)
+        if len(self.header) < ROSTER_LENGTH:
+            need = ROSTER_LENGTH - len(self.header)
+            self.header += text[:need]
+            text = text[need:]
+        if self.pending:
+            text = self.pending + text
+        end = len(text) - len(text) % EVENT_LENGTH
+        self._decode(text, end)
+        self.pending = text[end:]
+
+    def finish(self, at: Team, ht: Team) -> ReportColumns:
+        read_rosters(self.header, at, ht)
+        # A torn last event fails to decode, as any malformed chunk does
+        self._decode(self.pending, len(self.pending) and EVENT_LENGTH)
+        self.pending = ""
+
+        columns = self.columns
+        count = len(columns.type)
+        columns.comment = [None] * count
+        columns.player1obj = [None] * count
+        columns.player2obj = [None] * count
+        return columns
+
+    def _decode(self, text: str, end: int) -> None:
+        columns = self.columns
+        teams = columns.team.append
+        types = columns.type.append
+        results = columns.result.append
+        variations = columns.variation.append
+        players1 = columns.player1.append
+        players2 = columns.player2.append
+        gameclocks = columns.gameclock.append
+        realclocks = columns.realclock.append
+        datas = columns.data.append
+        hexval = HEX_DIGITS
+
+        for i in range(0, end, EVENT_LENGTH):
+            s = text[i : i + EVENT_LENGTH]
+            team = int(s[0])
+            etype = int(s[1:4])
+            result = hexval[s[4]]
+            player1 = hexval[s[7]]
+            player2 = hexval[s[8]]
+            gameclock = int(s[9:13])
+            realclock = int(s[13:17])
+
+            sub_type = etype // 100
+            if s[5] != "0":
+                etype = -100
+                result = 0
+                sub_type = 99
+
+            teams(team)
+            types(etype)
+            results(result)
+            variations(hexval[s[6]])
+            players1(player1)
+            players2(player2)
+            gameclocks(gameclock)
+            realclocks(realclock)
+            datas(s[1:9])
+
+            if sub_type in (1, 2, 4):
+                # Synthetic result event following every shot
+                if result > 9:
+                    result -= 9
+
+                teams(team)
+                types(0)
+                results(result)
+                variations(0)
+                players1(player1)
+                players2(player2)
+                gameclocks(gameclock)
+                realclocks(realclock + 2)
+                datas(RESULT_EVENT_DATA[result])
+
+
+def decode_report(report: str, at: Team, ht: Team) -> ReportColumns:
+    """Decode a whole ReportString into parallel columns in a single pass."""
+    decoder = ReportDecoder()
+    decoder.feed(report)
+    return decoder.finish(at, ht)
 
-            events.append(n)
 
-        i += 17
-
-    return events
-
-
-def parse_xml(text: str) -> tuple[list[BBEvent], Team, Team]:
-    tree = XML.ElementTree(XML.fromstring(text))
-    root = tree.getroot()
+def parse_report(report: str, at: Team, ht: Team) -> list[BBEvent]:
+    return decode_report(report, at, ht).to_events()
+
+
+VIEWMATCH_CHUNK_SIZE = 1 << 16
+
+
+def iter_text_chunks(text: str, size: int = VIEWMATCH_CHUNK_SIZE) -> Iterator[str]:
+    for i in range(0, len(text), size):
+        yield text[i : i + size]
+
+
+def is_player_tag(tag: str, side: str) -> bool:
+    return tag.startswith(f"{side}Player") and not tag.startswith(f"{side}PlayerNick")
+
+
+def empty_viewmatch_fields() -> dict[str, Any]:
+    return {
+        "HomeTeam": [],
+        "AwayTeam": [],
+        "HPlayer": [],
+        "APlayer": [],
+        "ReportString": None,
+    }
+
+
+class ViewmatchTarget:
+    """XMLParser target collecting the team headers, player names and
+    ReportString of a viewmatch (or pbp.aspx) document as it is fed.
+
+    No tree is built. Fields are collected per parent element and the parent
+    that holds the ReportString wins, which covers both the plain viewmatch
+    layout and payloads nested inside a BBAPI envelope. ReportString text
+    goes to a ReportDecoder piece by piece as the parser reads it.
+    """
+
+    def __init__(self) -> None:
+        # (tag, key) of the open elements
+        self.stack: list[tuple[str, int]] = []
+        self.containers: dict[int, dict[str, Any]] = {}
+        self.next_key = 0
+        self.text: list[str] = []
+        # Children of the open HomeTeam/AwayTeam element, and its depth
+        self.team_fields: list[tuple[str, str | None]] = []
+        self.team_depth = 0
+        self.decoder: ReportDecoder | None = None
+
+    def fields(self, key: int) -> dict[str, Any]:
+        fields = self.containers.get(key)
+        if fields is None:
+            fields = self.containers[key] = empty_viewmatch_fields()
+        return fields
+
+    def start(self, tag: str, attrib) -> None:
+        self.stack.append((tag, self.next_key))
+        self.next_key += 1
+        self.text = []
+        if tag in ("HomeTeam", "AwayTeam"):
+            self.team_fields = []
+            self.team_depth = len(self.stack)
+        elif tag == "ReportString" and len(self.stack) > 1:
+            self.decoder = ReportDecoder()
+
+    def data(self, text: str) -> None:
+        if self.decoder is not None:
+            self.decoder.feed(text)
+        else:
+            self.text.append(text)
+
+    def end(self, tag: str) -> None:
+        self.stack.pop()
+        text = "".join(self.text) or None
+        self.text = []
+        if not self.stack:
+            return
+
+        parent, parent_key = self.stack[-1]
+        if self.team_depth:
+            if len(self.stack) == self.team_depth:
+                self.team_fields.append((tag, text))
+            elif tag in ("HomeTeam", "AwayTeam"):
+                self.fields(parent_key)[tag] = self.team_fields
+                self.team_depth = 0
+            return
+        if tag == "ReportString":
+            decoder, self.decoder = self.decoder, None
+            assert decoder.size, "Missing report string"
+            self.fields(parent_key)[tag] = decoder
+        elif is_player_tag(tag, "H"):
+            assert text, "Missing HPlayer string"
+            self.fields(parent_key)["HPlayer"].append(text)
+        elif is_player_tag(tag, "A"):
+            assert text, "Missing APlayer string"
+            self.fields(parent_key)["APlayer"].append(text)
+
+    def close(self) -> dict[str, Any]:
+        for key in sorted(self.containers):
+            if self.containers[key]["ReportString"] is not None:
+                return self.containers[key]
+        if 0 in self.containers:
+            return self.containers[0]
+        return empty_viewmatch_fields()
+
+
+def extract_viewmatch(chunks: Iterable[str]) -> dict[str, Any]:
+    """Incrementally parse a viewmatch (or pbp.aspx) document; see
+    ViewmatchTarget. The "ReportString" field holds the ReportDecoder the
+    report was streamed into, or None."""
+    parser = XML.XMLParser(target=ViewmatchTarget())
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def parse_xml(text: str) -> tuple[ReportColumns, Team, Team]:
+    return parse_xml_stream(iter_text_chunks(text))
+
+
+def parse_xml_stream(chunks: Iterable[str]) -> tuple[ReportColumns, Team, Team]:
+    """Teams and decoded events of a viewmatch/pbp document. The
+    ReportString events are decoded while the document streams in; the
+    rosters are applied once the teams are known."""
+    fields = extract_viewmatch(chunks)
 
     ht = Team()
     at = Team()
-    report = ""
-
-    for child in root:
-        tag = child.tag
-        if tag == "HomeTeam":
-            for team in child:
-                if team.tag == "ID":
-                    assert team.text, "Missing team ID"
-                    ht.id = int(team.text)
-                elif team.tag == "Name":
-                    assert team.text, "Missing team name"
-                    ht.name = team.text
-                elif team.tag == "ShortName":
-                    assert team.text, "Missing team short name"
-                    ht.short = team.text
-        elif tag == "AwayTeam":
-            for team in child:
-                if team.tag == "ID":
-                    assert team.text
-                    at.id = int(team.text)
-                elif team.tag == "Name":
-                    assert team.text
-                    at.name = team.text
-                elif team.tag == "ShortName":
-                    assert team.text
-                    at.short = team.text
-        elif tag.startswith("HPlayer") and not tag.startswith("HPlayerNick"):
-            assert child.text, "Missing HPlayer string"
-            p = Player()
-            p.name = child.text
-            ht.players.append(p)
-        elif tag.startswith("APlayer") and not tag.startswith("APlayerNick"):
-            assert child.text, "Missing APlayer string"
-            p = Player()
-            p.name = child.text
-            at.players.append(p)
-        elif tag == "ReportString":
-            assert child.text, "Missing report string"
-            report = child.text.strip()
+
+    for tag, text in fields["HomeTeam"]:
+        if tag == "ID":
+            assert text, "Missing team ID"
+            ht.id = int(text)
+        elif tag == "Name":
+            assert text, "Missing team name"
+            ht.name = text
+        elif tag == "ShortName":
+            assert text, "Missing team short name"
+            ht.short = text
+    for tag, text in fields["AwayTeam"]:
+        if tag == "ID":
+            assert text
+            at.id = int(text)
+        elif tag == "Name":
+            assert text
+            at.name = text
+        elif tag == "ShortName":
+            assert text
+            at.short = text
+
+    for name in fields["HPlayer"]:
+        ht.players.append(Player(name))
+    for name in fields["APlayer"]:
+        at.players.append(Player(name))
 
     # Fill upto 12 players with empty objects, as the events events apparently reference these.
     while len(ht.players) < 12:
@@ -161,48 +351,200 @@ def parse_xml(text: str) -> tuple[list[BBEvent], Team, Team]:
     while len(at.players) < 12:
         at.players.append(Player("Lucky Fan"))
 
-    events = parse_report(report, at, ht)
+    events = (fields["ReportString"] or ReportDecoder()).finish(at, ht)
 
     return (events, ht, at)
 
 
 def get_xml_text(matchid) -> str:
-    path = CACHE_DIR / f"report_{matchid}.xml"
+    def load() -> str:
+        data = requests.get(
+            f"https://buzzerbeater.com/match/viewmatch.aspx?matchid={matchid}"
+        )
+        data.raise_for_status()
+        return data.text
 
-    if path.exists():
-        return path.read_text(encoding="utf-8")
+    return cache_for(CACHE_DIR).fetch("report", matchid, load, validate=check_report)
 
-    data = requests.get(
-        f"https://buzzerbeater.com/match/viewmatch.aspx?matchid={matchid}"
-    )
-    data.raise_for_status()
 
+def check_report(text: str) -> None:
+    """Raise ValueError for a page without a report (an error page), so it
+    isn't cached."""
+    if "<ReportString" not in text:
+        raise ValueError("Match page holds no ReportString")
+
+
+def print_hook_timings(game: Game) -> None:
+    rows = [
+        [name, calls, f"{secs * 1000:.3f}", f"{secs * 1e6 / calls:.2f}" if calls else "-"]
+        for name, (calls, secs) in sorted(
+            game.hook_timings.items(), key=lambda item: item[1][1], reverse=True
+        )
+    ]
+    print(tabulate(rows, headers=["Hook", "Calls", "Total ms", "us/call"]))
+
+
+def read_matchids(path: str) -> list[str]:
+    """Match IDs from a file ("-" for stdin), one per line. Blank lines and
+    lines starting with # are skipped."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def cached_schedule_matchids() -> list[str]:
+    """Played league match IDs of every schedule cached under matches/, in
+    key order without duplicates. Schedules the cache can't read are
+    skipped."""
+    cache = cache_for(CACHE_DIR)
+    matchids: dict[str, None] = {}
+    for key in cache.keys("schedule"):
+        data = cache.peek("schedule", key)
+        if data is None:
+            continue
+        for row in parse_schedule(data):
+            if row["type"].startswith("league") and is_played(row):
+                matchids[row["id"]] = None
+    return list(matchids)
+
+
+def play_match(matchid: str, args) -> dict[str, Any]:
+    """Fetch, parse, play and serialize one match into a batch record.
+
+    Failures are reported in the record instead of raised, so one broken
+    match does not abort a batch run.
+    """
+    start = time.perf_counter()
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(data.text, encoding="utf-8")
-    except OSError:
-        pass
+        text = get_xml_text(matchid)
+        events, ht, at = parse_xml(text)
+        game = Game(matchid, events, ht, at, args, [])
+        game.play()
+        document = game.to_json()
+        if getattr(args, "compact", False):
+            document = compact(document)
+        record = {"matchid": matchid, "ok": True, "game": document}
+    except Exception as e:
+        record = {"matchid": matchid, "ok": False, "error": f"{type(e).__name__}: {e}"}
+    record["secs"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _play_match_args(item: tuple[str, Any]) -> dict[str, Any]:
+    return play_match(*item)
+
+
+def run_batch(matchids: list[str], args, jobs: int, out: TextIO) -> int:
+    """Play every match and stream one NDJSON record per match to out, in
+    input order. Returns the number of failed matches."""
+    failures = 0
+    items = [(matchid, args) for matchid in matchids]
+
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        chunksize = max(1, len(items) // (jobs * 4))
+        records = executor.map(_play_match_args, items, chunksize=chunksize)
+    else:
+        executor = None
+        records = map(_play_match_args, items)
 
-    return data.text
+    try:
+        for record in records:
+            if not record["ok"]:
+                failures += 1
+                print(f"{record['matchid']}: {record['error']}", file=sys.stderr)
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+            out.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return failures
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--matchid", help="Match ID", required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--matchid", help="Match ID")
+    source.add_argument("--matchids", nargs="+", help="Batch mode: match IDs")
+    source.add_argument(
+        "--matchids-file", help="Batch mode: file with one match ID per line, - for stdin"
+    )
+    source.add_argument(
+        "--from-schedules",
+        action="store_true",
+        help="Batch mode: league matches of every cached schedule_*.xml",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Batch mode worker processes")
+    parser.add_argument("--output", help="Batch mode NDJSON output file (default: stdout)")
     parser.add_argument("--username", help="BBAPI username")
     parser.add_argument("--password", help="BBAPI password")
     parser.add_argument("--print-events", action="store_true")
     parser.add_argument("--print-stats", action="store_true")
     parser.add_argument("--save-charts", action="store_true")
     parser.add_argument("--verify", action="store_true")
+    parser.add_argument(
+        "--compact", action="store_true", help="Write games in the compact format (see serialize.py)"
+    )
+    parser.add_argument(
+        "--time-hooks", action="store_true", help="Print per-hook call counts and timings"
+    )
+    parser.add_argument(
+        "--language",
+        choices=sorted(COMMENTARY_FILES),
+        default="en",
+        help="Commentary language",
+    )
+    parser.add_argument(
+        "--trace",
+        choices=[level.name.lower() for level in TraceLevel],
+        help="Trace level (--print-events implies 'events')",
+    )
+    parser.add_argument("--trace-file", help="Write trace records as JSON lines")
     args = parser.parse_args()
 
-    text = get_xml_text(args.matchid)
-    events, ht, at = parse_xml(text)
-    game = Game(args.matchid, events, ht, at, args, [])
-    game.play()
-    game.save(f"{args.matchid}.json")
+    if args.matchid is None:
+        if args.print_events or args.print_stats or args.trace:
+            parser.error("--print-events, --print-stats and --trace need --matchid")
+        if args.matchids:
+            matchids = args.matchids
+        elif args.matchids_file:
+            matchids = read_matchids(args.matchids_file)
+        else:
+            matchids = cached_schedule_matchids()
+
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            failures = run_batch(matchids, args, max(1, args.jobs), out)
+        finally:
+            if args.output:
+                out.close()
+        print(f"{len(matchids) - failures}/{len(matchids)} matches played", file=sys.stderr)
+        return 1 if failures else 0
+
+    level = TraceLevel[args.trace.upper()] if args.trace else TraceLevel.OFF
+    if args.print_events:
+        level = max(level, TraceLevel.EVENTS)
+
+    trace_file = open(args.trace_file, "w", encoding="utf-8") if args.trace_file else None
+    tracer.configure(level, JsonLinesSink(trace_file) if trace_file else None)
+
+    try:
+        text = get_xml_text(args.matchid)
+        events, ht, at = parse_xml(text)
+        game = Game(args.matchid, events, ht, at, args, [])
+        game.play()
+        game.save(f"{args.matchid}.json", compact=args.compact)
+        if args.time_hooks:
+            print_hook_timings(game)
+    finally:
+        if trace_file:
+            trace_file.close()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
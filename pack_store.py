@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Compressed pack backend of the resource cache.
+
+Entries are appended to one segment file, each record being a fixed header
+(magic, codec, flags, name length, payload length, raw length, write time)
+followed by the entry name and its zlib or lzma compressed payload. A
+deletion appends a tombstone, and a rewrite appends a new record that
+shadows the old one. The index (entry name -> payload offset) is rebuilt by
+reading the headers at open and caught up on later appends, including those
+of other processes; a torn record at the end is ignored until complete.
+Appends hold an exclusive lock on the segment (where fcntl exists), so a
+torn tail found under it was left by a writer that died, and is cut off
+before the next record.
+
+Dead records are reclaimed by compaction, which runs on its own once they
+outweigh the live ones (past COMPACT_MIN_BYTES). Run it, and the import of
+existing loose files, from the command line:
+
+    python pack_store.py import [--delete-loose]
+    python pack_store.py compact
+    python pack_store.py stats
+"""
+
+import argparse
+import json
+import lzma
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+PACK_DIR = "pack"
+SEGMENT = "segment.dat"
+
+MAGIC = b"BBPK"
+# magic, codec, flags, name length, payload length, raw length, write time
+RECORD = struct.Struct("<4sBBHIId")
+TOMBSTONE = 1
+
+CODECS = {"raw": 0, "zlib": 1, "lzma": 2}
+_COMPRESS = {
+    0: lambda data: data,
+    1: lambda data: zlib.compress(data, 6),
+    2: lambda data: lzma.compress(data, preset=6),
+}
+_DECOMPRESS = {0: lambda data: data, 1: zlib.decompress, 2: lzma.decompress}
+
+_OPEN_FLAGS = getattr(os, "O_BINARY", 0)
+# Dead bytes past which a write or delete compacts the segment, once they
+# also exceed the live bytes
+COMPACT_MIN_BYTES = 64 << 20
+
+
+def _record_size(name: str, length: int) -> int:
+    return RECORD.size + len(name.encode("utf-8")) + length
+
+
+class PackEntry(NamedTuple):
+    offset: int
+    length: int
+    codec: int
+    raw_length: int
+    mtime: float
+
+
+class PackStore:
+    """Backend of ResourceCache keeping entries in directory/segment.dat."""
+
+    def __init__(self, directory: Path, codec: str = "zlib", compact_min_bytes: int = COMPACT_MIN_BYTES) -> None:
+        self.directory = Path(directory)
+        self.path = self.directory / SEGMENT
+        self.codec = CODECS[codec]
+        self.compact_min_bytes = compact_min_bytes
+        self.lock = threading.Lock()
+        self.index: dict[str, PackEntry] = {}
+        # Bytes of the segment read into the index, of its live records,
+        # and its identity
+        self.end = 0
+        self.live = 0
+        self._file_id: tuple[int, int] | None = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path.touch()
+
+    @staticmethod
+    def exists(directory: Path) -> bool:
+        return (Path(directory) / SEGMENT).exists()
+
+    def _catch_up(self) -> None:
+        """Index the records appended since the last call. Starts over
+        when the segment was replaced by a compaction."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        file_id = (stat.st_dev, stat.st_ino) if stat else None
+        if file_id != self._file_id or (stat and stat.st_size < self.end):
+            self.index = {}
+            self.end = 0
+            self.live = 0
+            self._file_id = file_id
+        if stat is None or stat.st_size == self.end:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.end)
+            position = self.end
+            while True:
+                header = f.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    break
+                magic, codec, flags, name_length, length, raw_length, mtime = RECORD.unpack(header)
+                if magic != MAGIC:
+                    raise ValueError(f"Corrupt pack segment {self.path} at byte {position}")
+                name = f.read(name_length)
+                offset = position + RECORD.size + name_length
+                if len(name) < name_length or offset + length > stat.st_size:
+                    break
+                f.seek(length, os.SEEK_CUR)
+                name = name.decode("utf-8")
+                old = self.index.pop(name, None)
+                if old is not None:
+                    self.live -= _record_size(name, old.length)
+                if not flags & TOMBSTONE:
+                    self.index[name] = PackEntry(offset, length, codec, raw_length, mtime)
+                    self.live += _record_size(name, length)
+                position = offset + length
+        self.end = position
+
+    def _lock_segment(self) -> int:
+        """Descriptor of the current segment, held under an exclusive lock
+        until closed."""
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT | _OPEN_FLAGS, 0o644)
+            if fcntl is None:
+                return fd
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                stat = None
+            fstat = os.fstat(fd)
+            if stat is not None and (stat.st_dev, stat.st_ino) == (fstat.st_dev, fstat.st_ino):
+                return fd
+            # Replaced by a compaction while waiting for the lock
+            os.close(fd)
+
+    def _append(self, record: bytes) -> None:
+        fd = self._lock_segment()
+        try:
+            self._catch_up()
+            if fcntl is not None and os.fstat(fd).st_size > self.end:
+                # A writer died mid-record: left in place, the torn record
+                # would swallow the start of this one
+                os.ftruncate(fd, self.end)
+            # One write call, so appends of concurrent processes don't interleave
+            os.write(fd, record)
+        finally:
+            os.close(fd)
+        self._catch_up()
+
+    @staticmethod
+    def _record(name: str, payload: bytes, codec: int, raw_length: int, flags: int = 0, mtime: float | None = None) -> bytes:
+        encoded = name.encode("utf-8")
+        header = RECORD.pack(
+            MAGIC, codec, flags, len(encoded), len(payload), raw_length, time.time() if mtime is None else mtime
+        )
+        return header + encoded + payload
+
+    def read(self, name: str) -> tuple[str, float] | None:
+        """(text, write time) of an entry, None if missing."""
+        with self.lock:
+            while True:
+                with open(self.path, "rb") as f:
+                    self._catch_up()
+                    stat = os.fstat(f.fileno())
+                    if (stat.st_dev, stat.st_ino) != self._file_id:
+                        # Replaced by a compaction since the open
+                        continue
+                    entry = self.index.get(name)
+                    if entry is None:
+                        return None
+                    f.seek(entry.offset)
+                    payload = f.read(entry.length)
+                break
+        try:
+            return _DECOMPRESS[entry.codec](payload).decode("utf-8"), entry.mtime
+        except (zlib.error, lzma.LZMAError, UnicodeDecodeError) as e:
+            raise ValueError(f"Corrupt pack entry {name} in {self.path}: {e}") from e
+
+    def write(self, name: str, text: str, mtime: float | None = None) -> int:
+        """Append an entry, returning its compressed size."""
+        data = text.encode("utf-8")
+        payload = _COMPRESS[self.codec](data)
+        with self.lock:
+            self._append(self._record(name, payload, self.codec, len(data), mtime=mtime))
+            self._compact_if_dead()
+        return len(payload)
+
+    def delete(self, name: str) -> None:
+        with self.lock:
+            self._catch_up()
+            if name in self.index:
+                self._append(self._record(name, b"", 0, 0, TOMBSTONE))
+                self._compact_if_dead()
+
+    def _compact_if_dead(self) -> None:
+        dead = self.end - self.live
+        if dead > self.compact_min_bytes and dead > self.live:
+            self._compact()
+
+    def scan(self) -> dict[str, tuple[int, float]]:
+        """Entry name -> (compressed size, write time)."""
+        with self.lock:
+            self._catch_up()
+            return {name: (entry.length, entry.mtime) for name, entry in self.index.items()}
+
+    def stats(self) -> dict:
+        with self.lock:
+            self._catch_up()
+            return {
+                "entries": len(self.index),
+                "segment_bytes": self.end,
+                "live_bytes": self.live,
+                "raw_bytes": sum(entry.raw_length for entry in self.index.values()),
+            }
+
+    def compact(self) -> tuple[int, int]:
+        """Rewrite the segment with only the live records. Returns the
+        segment size before and after. Appends of other processes wait for
+        it under the segment lock (where fcntl exists)."""
+        with self.lock:
+            return self._compact()
+
+    def _compact(self) -> tuple[int, int]:
+        fd = self._lock_segment()
+        try:
+            self._catch_up()
+            before = self.end
+            tmp = self.path.with_name(SEGMENT + ".compact")
+            with open(self.path, "rb") as src, open(tmp, "wb") as dst:
+                for name, entry in sorted(self.index.items(), key=lambda item: item[1].offset):
+                    src.seek(entry.offset)
+                    payload = src.read(entry.length)
+                    dst.write(self._record(name, payload, entry.codec, entry.raw_length, mtime=entry.mtime))
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            os.close(fd)
+        self._file_id = None
+        self._catch_up()
+        return before, self.end
+
+    def import_loose(self, directory: Path, *, delete: bool = False) -> int:
+        """Append every loose <kind>_<key>.xml of directory not already in
+        the pack, keeping its modification time. With delete the imported
+        files are removed. Returns the number imported."""
+        count = 0
+        for path in sorted(Path(directory).glob("*_*.xml")):
+            with self.lock:
+                self._catch_up()
+                present = path.name in self.index
+            if not present:
+                self.write(path.name, path.read_text(encoding="utf-8"), mtime=path.stat().st_mtime)
+                count += 1
+            if delete:
+                path.unlink()
+        return count
+
+
+def main():
+    from main import CACHE_DIR
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["import", "compact", "stats"])
+    parser.add_argument("--dir", type=Path, default=CACHE_DIR, help="Cache directory (default: matches/)")
+    parser.add_argument("--codec", choices=sorted(CODECS), default="zlib", help="Codec of imported entries")
+    parser.add_argument("--delete-loose", action="store_true", help="Remove loose files once imported")
+    args = parser.parse_args()
+
+    if args.command != "import" and not PackStore.exists(args.dir / PACK_DIR):
+        print(f"No pack in {args.dir}; create one with 'import'.")
+        return 1
+
+    store = PackStore(args.dir / PACK_DIR, args.codec)
+    if args.command == "import":
+        start = time.perf_counter()
+        count = store.import_loose(args.dir, delete=args.delete_loose)
+        print(f"Imported {count} files in {time.perf_counter() - start:.2f}s")
+    elif args.command == "compact":
+        before, after = store.compact()
+        print(f"Compacted {before:,} -> {after:,} bytes")
+    print(json.dumps(store.stats(), indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
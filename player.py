@@ -2,6 +2,8 @@ from stats import Stats, Statistic
 
 
 class Player:
+    __slots__ = ("id", "name", "stats", "starter")
+
     def __init__(self, name="") -> None:
         self.id = 0
         self.name = name
@@ -19,10 +21,11 @@ class Player:
         self.stats.add(stat, val)
 
     def secs_total(self):
+        totals = self.stats.totals()
         return (
-            self.stats.full.sheet[Statistic.SecsPG]
-            + self.stats.full.sheet[Statistic.SecsSG]
-            + self.stats.full.sheet[Statistic.SecsSF]
-            + self.stats.full.sheet[Statistic.SecsPF]
-            + self.stats.full.sheet[Statistic.SecsC]
+            totals[Statistic.SecsPG]
+            + totals[Statistic.SecsSG]
+            + totals[Statistic.SecsSF]
+            + totals[Statistic.SecsPF]
+            + totals[Statistic.SecsC]
         )
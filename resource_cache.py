@@ -0,0 +1,266 @@
+"""On-disk cache of fetched BBAPI and match report documents.
+
+Every document is an entry named ``<kind>_<key>.xml`` in the cache
+directory (matches/ by default), with a policy per kind:
+
+* boxscore, report: immutable once fetched (played matches don't change);
+* schedule, standings, player: refetched after a TTL, served stale when the
+  refetch fails.
+
+Loose files are written to a temp file renamed over the entry, so a
+concurrent reader sees the old or the new document, never half of one; a
+directory holding a pack (pack_store.PackStore) stores them compressed in
+one append-only segment instead. The cache is capped in bytes: past the cap
+the least recently used entries are removed. An entry the backend fails to
+read (I/O error, corrupt record) is a miss, refetched and rewritten.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from pack_store import PACK_DIR, PackStore
+
+HOUR = 3600
+
+# Kind -> seconds an entry stays fresh, None for immutable
+POLICIES: dict[str, float | None] = {
+    "boxscore": None,
+    "report": None,
+    "schedule": 6 * HOUR,
+    "standings": 6 * HOUR,
+    "player": 24 * HOUR,
+}
+MAX_BYTES = 1 << 30
+
+# What a backend raises for an entry it can't read or write
+BACKEND_ERRORS = (OSError, ValueError)
+
+COUNTERS = ("hits", "misses", "expired", "stale", "rejected", "writes", "evictions", "errors")
+
+
+class LooseFiles:
+    """Backend storing every entry as its own file in directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+
+    def read(self, name: str) -> tuple[str, float] | None:
+        """(text, write time) of an entry, None if missing."""
+        path = self.directory / name
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read(), os.fstat(f.fileno()).st_mtime
+        except OSError:
+            return None
+
+    def write(self, name: str, text: str) -> int:
+        """Store an entry atomically, returning its size on disk."""
+        data = text.encode("utf-8")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.directory / name)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return len(data)
+
+    def delete(self, name: str) -> None:
+        (self.directory / name).unlink(missing_ok=True)
+
+    def scan(self) -> dict[str, tuple[int, float]]:
+        """Entry name -> (size, write time)."""
+        entries = {}
+        for path in self.directory.glob("*_*.xml"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries[path.name] = (stat.st_size, stat.st_mtime)
+        return entries
+
+
+class ResourceCache:
+    def __init__(
+        self,
+        directory: Path,
+        policies: dict[str, float | None] = POLICIES,
+        max_bytes: int = MAX_BYTES,
+        backend=None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.backend = backend if backend is not None else LooseFiles(self.directory)
+        self.policies = policies
+        self.max_bytes = max_bytes
+        self.counters = {kind: dict.fromkeys(COUNTERS, 0) for kind in policies}
+        self.lock = threading.Lock()
+        # Entry name -> [bytes, last use], read from the backend on first use
+        self._entries: dict[str, list] | None = None
+        self._bytes = 0
+
+    @staticmethod
+    def name(kind: str, key) -> str:
+        return f"{kind}_{key}.xml"
+
+    def _index(self) -> dict[str, list]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                scanned = self.backend.scan()
+            except BACKEND_ERRORS:
+                scanned = {}
+            for name, (size, mtime) in scanned.items():
+                if name.split("_", 1)[0] in self.policies:
+                    self._entries[name] = [size, mtime]
+                    self._bytes += size
+        return self._entries
+
+    def _count(self, kind: str, counter: str) -> None:
+        self.counters[kind][counter] += 1
+
+    def is_fresh(self, kind: str, mtime: float) -> bool:
+        ttl = self.policies[kind]
+        return ttl is None or time.time() - mtime < ttl
+
+    def keys(self, kind: str) -> list[str]:
+        """Keys of every stored entry of kind, fresh or not, sorted."""
+        prefix = f"{kind}_"
+        names = [name for name in self.backend.scan() if name.startswith(prefix)]
+        return sorted(name[len(prefix) : -len(".xml")] for name in names)
+
+    def peek(self, kind: str, key) -> str | None:
+        """The stored document, fresh or not, without counting a use."""
+        found = self._read(kind, self.name(kind, key))
+        return found[0] if found is not None else None
+
+    def _read(self, kind: str, name: str) -> tuple[str, float] | None:
+        try:
+            return self.backend.read(name)
+        except BACKEND_ERRORS:
+            with self.lock:
+                self._count(kind, "errors")
+            return None
+
+    def get(self, kind: str, key) -> str | None:
+        """The cached document, or None if missing or expired."""
+        name = self.name(kind, key)
+        found = self._read(kind, name)
+        with self.lock:
+            if found is None:
+                self._count(kind, "misses")
+                return None
+            if not self.is_fresh(kind, found[1]):
+                self._count(kind, "expired")
+                return None
+            self._count(kind, "hits")
+            entry = self._index().get(name)
+            if entry is not None:
+                entry[1] = time.time()
+        return found[0]
+
+    def put(self, kind: str, key, text: str) -> None:
+        """Store a document. Write errors only count, as a cache that can't
+        be written must not fail the fetch."""
+        name = self.name(kind, key)
+        try:
+            size = self.backend.write(name, text)
+        except BACKEND_ERRORS:
+            with self.lock:
+                self._count(kind, "errors")
+            return
+
+        with self.lock:
+            self._count(kind, "writes")
+            entries = self._index()
+            old = entries.get(name)
+            if old is not None:
+                self._bytes -= old[0]
+            entries[name] = [size, time.time()]
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict(keep=name)
+
+    def _evict(self, keep: str) -> None:
+        entries = self._entries
+        for name, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if self._bytes <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                self.backend.delete(name)
+            except BACKEND_ERRORS:
+                continue
+            del entries[name]
+            self._bytes -= size
+            self._count(name.split("_", 1)[0], "evictions")
+
+    def fetch(
+        self,
+        kind: str,
+        key,
+        load: Callable[[], str],
+        *,
+        refresh: bool = False,
+        validate: Callable[[str], None] | None = None,
+    ) -> str:
+        """The cached document, else load() stored in the cache. An expired
+        document is returned when load() fails. With refresh the cached
+        copy is only that fallback. validate(text) raises for a loaded
+        document that must not be cached (an error page), which then counts
+        as a failed load."""
+        text = None if refresh else self.get(kind, key)
+        if text is not None:
+            return text
+        try:
+            text = load()
+            if validate is not None:
+                try:
+                    validate(text)
+                except Exception:
+                    with self.lock:
+                        self._count(kind, "rejected")
+                    raise
+        except Exception:
+            text = self.peek(kind, key)
+            if text is None:
+                raise
+            with self.lock:
+                self._count(kind, "stale")
+            return text
+        self.put(kind, key, text)
+        return text
+
+    def stats(self) -> dict:
+        with self.lock:
+            self._index()
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "kinds": {kind: dict(counters) for kind, counters in self.counters.items()},
+            }
+
+
+_caches: dict[Path, ResourceCache] = {}
+_caches_lock = threading.Lock()
+
+
+def cache_for(directory: Path) -> ResourceCache:
+    """The process-wide ResourceCache of directory: backed by its pack (see
+    pack_store.py) once one was created there, else by loose files."""
+    directory = Path(directory).resolve()
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            backend = None
+            if PackStore.exists(directory / PACK_DIR):
+                backend = PackStore(directory / PACK_DIR)
+            cache = _caches[directory] = ResourceCache(directory, backend=backend)
+        return cache
@@ -13,7 +13,7 @@ from typing import Any
 import requests
 
 from bb_site import BB_BASE, BB_UA, BBSiteClient
-from bbapi import BBApi
+from bbapi import BBApi, fetch_all
 from minutes_agg import current_week_for_season
 
 
@@ -304,9 +304,11 @@ def scrape_country(
         return {**country, "players": [], "error": str(exc)}
 
     players: list[dict[str, Any]] = []
-    for roster_player in roster:
+    infos = fetch_all(api, "player_info", [roster_player.player_id for roster_player in roster])
+    for roster_player, info in zip(roster, infos):
         try:
-            info = api.player_info(roster_player.player_id)
+            if isinstance(info, Exception):
+                raise info
             first_name = str(info.get("first_name") or "").strip()
             last_name = str(info.get("last_name") or "").strip()
             api_name = " ".join(part for part in [first_name, last_name] if part)
@@ -0,0 +1,172 @@
+"""Game document serialization.
+
+A game document is the dict built by ``Game.to_json``: ``teamHome`` and
+``teamAway`` (roster plus per-period stats) and ``events`` (one dict per
+event). It is stored in one of two formats:
+
+* verbose (version 0): the document itself, as written by older builds;
+* compact (version 1): short keys, stat rows and events as arrays, with the
+  key lists stored once under ``"k"``.
+
+``write_game`` streams either format straight from a played ``Game`` without
+building the event list, and ``expand`` turns any stored format back into
+the document shape.
+"""
+
+import json
+from typing import Any, Iterable, Iterator, TextIO
+
+FORMAT_VERSION = 1
+
+_PLAYER_FIELDS = ("id", "name", "starter", "stats")
+
+
+class Schema:
+    """Key lists of a compact document, learned from the first record of
+    each kind: "player"/"team" stat keys and one list per event type."""
+
+    def __init__(self, keys: dict[str, list[str]] | None = None) -> None:
+        self.keys: dict[str, list[str]] = keys if keys is not None else {}
+
+    def row(self, kind: str, record: dict) -> list | dict:
+        keys = self.keys.setdefault(kind, list(record))
+        if len(keys) != len(record) or any(key not in record for key in keys):
+            return record
+        return [record[key] for key in keys]
+
+    def record(self, kind: str, row: list | dict) -> dict:
+        if isinstance(row, dict):
+            return row
+        return dict(zip(self.keys[kind], row))
+
+
+def _compact_stats(schema: Schema, kind: str, stats: dict) -> dict:
+    return {period: schema.row(kind, values) for period, values in stats.items()}
+
+
+def _expand_stats(schema: Schema, kind: str, stats: dict) -> dict:
+    return {period: schema.record(kind, values) for period, values in stats.items()}
+
+
+def compact_team(schema: Schema, team: dict) -> dict:
+    out = dict(team)
+    players = []
+    for player in team["players"]:
+        if tuple(player) == _PLAYER_FIELDS:
+            player = [
+                player["id"],
+                player["name"],
+                player["starter"],
+                _compact_stats(schema, "player", player["stats"]),
+            ]
+        players.append(player)
+    out["players"] = players
+    out["stats"] = _compact_stats(schema, "team", team["stats"])
+    return out
+
+
+def expand_team(schema: Schema, team: dict) -> dict:
+    out = dict(team)
+    players = []
+    for player in team["players"]:
+        if isinstance(player, list):
+            player = dict(zip(_PLAYER_FIELDS, player))
+            player["stats"] = _expand_stats(schema, "player", player["stats"])
+        players.append(player)
+    out["players"] = players
+    out["stats"] = _expand_stats(schema, "team", team["stats"])
+    return out
+
+
+def compact_event(schema: Schema, event: dict) -> list:
+    """[event_type, *values] with the values in schema order."""
+    event_type = event["event_type"]
+    values = {key: value for key, value in event.items() if key != "event_type"}
+    row = schema.row(event_type, values)
+    if isinstance(row, dict):
+        return [event_type, row]
+    return [event_type, *row]
+
+
+def expand_event(schema: Schema, row: list) -> dict:
+    event_type = row[0]
+    if len(row) == 2 and isinstance(row[1], dict):
+        values = row[1]
+    else:
+        values = schema.record(event_type, row[1:])
+    return {"event_type": event_type, **values}
+
+
+def compact(document: dict) -> dict:
+    """Compact (version 1) form of a game document. Keys other than the
+    teams and events are kept as they are."""
+    schema = Schema()
+    out: dict[str, Any] = {"v": FORMAT_VERSION}
+    for key, value in document.items():
+        if key in ("teamHome", "teamAway"):
+            value = compact_team(schema, value)
+        elif key == "events":
+            value = [compact_event(schema, event) for event in value]
+        out[key] = value
+    out["k"] = schema.keys
+    return out
+
+
+def expand(data: dict) -> dict:
+    """Game document from any stored format."""
+    version = data.get("v", 0)
+    if version == 0:
+        return data
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported game document version {version}")
+
+    schema = Schema(data["k"])
+    out = {}
+    for key, value in data.items():
+        if key in ("v", "k"):
+            continue
+        if key in ("teamHome", "teamAway"):
+            value = expand_team(schema, value)
+        elif key == "events":
+            value = [expand_event(schema, row) for row in value]
+        out[key] = value
+    return out
+
+
+def iter_game_json(teams: list[dict], events: Iterable[dict], compact_format: bool) -> Iterator[str]:
+    """Chunks of a game document, one per team and per event."""
+    schema = Schema()
+    if compact_format:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        teams = [compact_team(schema, team) for team in teams]
+        yield '{"v":%d,' % FORMAT_VERSION
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False)
+        yield "{"
+    encode = encoder.encode
+    yield '"teamHome":' + encode(teams[0])
+    yield ',"teamAway":' + encode(teams[1])
+    yield ',"events":['
+    separator = ""
+    for event in events:
+        if compact_format:
+            event = compact_event(schema, event)
+        yield separator + encode(event)
+        separator = ","
+    yield "]"
+    if compact_format:
+        # Event keys are only known once every type has been seen
+        yield ',"k":' + encode(schema.keys)
+    yield "}"
+
+
+def write_game(game, fp: TextIO, *, compact_format: bool = False) -> None:
+    """Stream a played game to fp, serializing one event at a time."""
+    teams = [team.to_json() for team in game.teams]
+    events = (event.to_json() for event in game.baseevents)
+    for chunk in iter_game_json(teams, events, compact_format):
+        fp.write(chunk)
+
+
+def read_game(fp: TextIO) -> dict:
+    return expand(json.load(fp))
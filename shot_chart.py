@@ -1,20 +1,241 @@
+from array import array
+from functools import lru_cache
+import json
+import os
 from PIL import Image, ImageDraw
 from pathlib import Path
+import re
+import tempfile
+import threading
+
+
+@lru_cache(maxsize=None)
+def court_image() -> Image.Image:
+    """court.png decoded once per process. Shared: draw on a copy."""
+    court_path = Path(__file__).resolve().with_name("court.png")
+    with Image.open(court_path) as img:
+        img.load()
+        return img
 
 
 class ShotChart:
+    """Shots of a team, drawn onto a copy of the court only when rendered.
+
+    Shots are kept as (x, y, made) int triples until then, so charts that
+    are never saved cost no image memory or PNG decode.
+    """
+
     def __init__(self) -> None:
-        court_path = Path(__file__).resolve().with_name("court.png")
-        self.img = Image.open(court_path)
-        self.img_draw = ImageDraw.Draw(self.img)
+        self.shots = array("h")
+        self._img: Image.Image | None = None
+        self._drawn = 0
 
     def add_made(self, x, y):
-        self.img_draw.ellipse(
-            [(x - 2, y - 2), (x + 2, y + 2)], fill=None, outline="black", width=1
-        )
+        self.shots.extend((x, y, 1))
 
     def add_miss(self, x, y):
-        self.img_draw.text((x - 5, y - 5), text="X")
+        self.shots.extend((x, y, 0))
+
+    @property
+    def img(self) -> Image.Image:
+        """The chart with every shot recorded so far drawn on it."""
+        if self._img is None:
+            self._img = court_image().copy()
+        shots = self.shots
+        if self._drawn < len(shots):
+            img_draw = ImageDraw.Draw(self._img)
+            for i in range(self._drawn, len(shots), 3):
+                x, y, made = shots[i], shots[i + 1], shots[i + 2]
+                if made:
+                    img_draw.ellipse(
+                        [(x - 2, y - 2), (x + 2, y + 2)], fill=None, outline="black", width=1
+                    )
+                else:
+                    img_draw.text((x - 5, y - 5), text="X")
+            self._drawn = len(shots)
+        return self._img
 
     def save(self, name):
         self.img.save(name)
+
+
+COURT_SIZE = (368, 192)
+# Side of a heatmap bin in court pixels: a 46 x 24 grid
+GRID_CELL = 8
+# Shot results that count as made / as no field goal attempt (fouled misses)
+MADE_RESULTS = {"1", "2", "5"}
+NO_ATTEMPT_RESULTS = {"4"}
+
+# FG% colour scale: cold, average, hot
+_COLD = (49, 99, 206)
+_MID = (240, 200, 60)
+_HOT = (214, 40, 40)
+
+
+def fg_color(pct: float) -> tuple[int, int, int]:
+    if pct < 0.5:
+        low, high, t = _COLD, _MID, pct / 0.5
+    else:
+        low, high, t = _MID, _HOT, (pct - 0.5) / 0.5
+    return tuple(round(a + (b - a) * t) for a, b in zip(low, high))
+
+
+class ShotGrid:
+    """Made/attempted field goals binned into a fixed grid over the court.
+
+    Shots of either side are mirrored onto the right-hand basket, so grids
+    of any number of games add up bin by bin. `matchids` remembers which
+    games are in, so a cached grid only takes new matches.
+    """
+
+    def __init__(self, cell: int = GRID_CELL) -> None:
+        self.cell = cell
+        self.cols = -(-COURT_SIZE[0] // cell)
+        self.rows = -(-COURT_SIZE[1] // cell)
+        self.attempts = array("I", bytes(4 * self.cols * self.rows))
+        self.made = array("I", bytes(4 * self.cols * self.rows))
+        self.matchids: set[str] = set()
+
+    def add(self, x: int, y: int, made: bool, side: int = 0) -> None:
+        if side:
+            x = COURT_SIZE[0] - x
+        col = min(max(x, 0) // self.cell, self.cols - 1)
+        row = min(max(y, 0) // self.cell, self.rows - 1)
+        index = row * self.cols + col
+        self.attempts[index] += 1
+        if made:
+            self.made[index] += 1
+
+    def add_chart(self, chart: ShotChart, side: int = 0) -> None:
+        """Every shot of a played game's chart."""
+        shots = chart.shots
+        for i in range(0, len(shots), 3):
+            self.add(shots[i], shots[i + 1], shots[i + 2], side)
+
+    def add_game(self, matchid: str, document: dict, side: int) -> bool:
+        """Shots of side from a game document (see Game.to_json). Returns
+        False if the match is already in the grid."""
+        shots = (
+            (event["shot_pos_x"], event["shot_pos_y"], event["shot_result"])
+            for event in document["events"]
+            if event["event_type"] == "shot" and int(event["attacking_team"]) == side
+        )
+        return self.add_shots(matchid, shots, side)
+
+    def add_shots(self, matchid: str, shots, side: int) -> bool:
+        """(x, y, shot_result) shots of side in a match. Returns False if
+        the match is already in the grid."""
+        matchid = str(matchid)
+        if matchid in self.matchids:
+            return False
+        for x, y, result in shots:
+            result = str(result)
+            if result in NO_ATTEMPT_RESULTS:
+                continue
+            self.add(x, y, result in MADE_RESULTS, side)
+        self.matchids.add(matchid)
+        return True
+
+    def merge(self, other: "ShotGrid") -> None:
+        assert other.cell == self.cell
+        self.attempts = array("I", map(sum, zip(self.attempts, other.attempts)))
+        self.made = array("I", map(sum, zip(self.made, other.made)))
+        self.matchids |= other.matchids
+
+    def fg_pct(self, x: int, y: int) -> float | None:
+        """FG% of the bin holding court point (x, y)."""
+        index = min(y // self.cell, self.rows - 1) * self.cols + min(x // self.cell, self.cols - 1)
+        attempts = self.attempts[index]
+        return self.made[index] / attempts if attempts else None
+
+    def render(self, min_attempts: int = 1) -> Image.Image:
+        """Court with every bin of at least min_attempts shots coloured by
+        FG%, more opaque the more shots it holds. One pass over the bins."""
+        peak = max(self.attempts, default=0) or 1
+        pixels = []
+        for attempts, made in zip(self.attempts, self.made):
+            if attempts < min_attempts:
+                pixels.append((0, 0, 0, 0))
+                continue
+            alpha = round(70 + 150 * (attempts / peak) ** 0.5)
+            pixels.append((*fg_color(made / attempts), alpha))
+
+        overlay = Image.new("RGBA", (self.cols, self.rows))
+        overlay.putdata(pixels)
+        overlay = overlay.resize(
+            (self.cols * self.cell, self.rows * self.cell), Image.NEAREST
+        ).crop((0, 0, *COURT_SIZE))
+        img = court_image().convert("RGBA")
+        img.alpha_composite(overlay)
+        return img
+
+    def to_json(self) -> dict:
+        return {
+            "cell": self.cell,
+            "matchids": sorted(self.matchids),
+            "attempts": self.attempts.tolist(),
+            "made": self.made.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShotGrid":
+        grid = cls(data["cell"])
+        grid.attempts = array("I", data["attempts"])
+        grid.made = array("I", data["made"])
+        grid.matchids = set(data["matchids"])
+        return grid
+
+
+class ShotGridCache:
+    """Per team and season ShotGrids, kept in memory and as JSON files in
+    directory, so a scouting run only bins the matches it hasn't seen.
+    Updates are serialized by a lock and files are replaced atomically, so
+    concurrent reports neither lose matches nor leave half-written grids."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.grids: dict[tuple[str, str], ShotGrid] = {}
+        self.lock = threading.RLock()
+
+    def path(self, team_key: str, season: str) -> Path:
+        name = re.sub(r"[^A-Za-z0-9_-]+", "_", f"{team_key}_{season}")
+        return self.directory / f"{name}.json"
+
+    def get(self, team_key: str, season: str) -> ShotGrid:
+        key = (team_key, season)
+        with self.lock:
+            grid = self.grids.get(key)
+            if grid is None:
+                path = self.path(team_key, season)
+                try:
+                    grid = ShotGrid.from_json(json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError, KeyError):
+                    grid = ShotGrid()
+                self.grids[key] = grid
+            return grid
+
+    def update(self, team_key: str, season: str, games) -> ShotGrid:
+        """Add the (matchid, shots, side) games not in the grid yet (see
+        ShotGrid.add_shots) and write the grid back if any were new."""
+        with self.lock:
+            grid = self.get(team_key, season)
+            added = [grid.add_shots(matchid, shots, side) for matchid, shots, side in games]
+            if any(added):
+                try:
+                    self.save(self.path(team_key, season), grid)
+                except OSError:
+                    pass
+            return grid
+
+    def save(self, path: Path, grid: ShotGrid) -> None:
+        """Write grid to path through a temporary file, so readers see the
+        old grid or the new one."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(grid.to_json(), f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
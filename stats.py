@@ -1,4 +1,6 @@
+from array import array
 from enum import IntEnum
+from operator import itemgetter
 
 
 class Statistic(IntEnum):
@@ -38,123 +40,249 @@ class Statistic(IntEnum):
     TeamStats = 32
 
 
+# (period x stat) rows are int arrays; zeroed rows are copied from this one.
+EMPTY_ROW = array("i", bytes(4 * Statistic.TeamStats))
+
+_BOX_SCORE = itemgetter(
+    Statistic.Points,
+    Statistic.FieldGoalsMade,
+    Statistic.FieldGoalsAtt,
+    Statistic.ThreePointsMade,
+    Statistic.ThreePointsAtt,
+    Statistic.FreeThrowsMade,
+    Statistic.FreeThrowsAtt,
+    Statistic.PlusMinus,
+    Statistic.OffRebounds,
+    Statistic.DefRebounds,
+    Statistic.Assists,
+    Statistic.Turnovers,
+    Statistic.Steals,
+    Statistic.Blocks,
+    Statistic.Fouls,
+)
+_POSSESSION = itemgetter(
+    Statistic.Possessions,
+    Statistic.TimeOfPossession,
+    Statistic.FastBreakPoints,
+)
+_POSITION_SECS = itemgetter(
+    Statistic.SecsPG,
+    Statistic.SecsSG,
+    Statistic.SecsSF,
+    Statistic.SecsPF,
+    Statistic.SecsC,
+)
+
+
+def position_minutes(sheet) -> int:
+    pg, sg, sf, pf, c = _POSITION_SECS(sheet)
+    return round(pg / 60) + round(sg / 60) + round(sf / 60) + round(pf / 60) + round(c / 60)
+
+
 class StatSheet:
-    def __init__(self) -> None:
-        self.sheet = [0] * Statistic.TeamStats
+    """One period row of a Stats buffer."""
+
+    __slots__ = ("sheet",)
+
+    def __init__(self, sheet: array | None = None) -> None:
+        self.sheet = array("i", EMPTY_ROW) if sheet is None else sheet
+
+    def values(self):
+        """The row as an indexable snapshot, read once by the exporters."""
+        return self.sheet
 
     def __repr__(self) -> str:
+        s = self.values()
         return f"""Stats
-    MIN: {self.minutes()}
-    PTS: {self.sheet[Statistic.Points]}
-    FG:  {self.sheet[Statistic.FieldGoalsMade]} / {self.sheet[Statistic.FieldGoalsAtt]}
-    TP:  {self.sheet[Statistic.ThreePointsMade]} / {self.sheet[Statistic.ThreePointsAtt]}
-    FT:  {self.sheet[Statistic.FreeThrowsMade]} / {self.sheet[Statistic.FreeThrowsAtt]}
-    +/-: {self.sheet[Statistic.PlusMinus]}
-    OR:  {self.sheet[Statistic.OffRebounds]}
-    DR:  {self.sheet[Statistic.DefRebounds]}
-    TR:  {self.sheet[Statistic.OffRebounds] + self.sheet[Statistic.DefRebounds]}
-    AST: {self.sheet[Statistic.Assists]}
-    TO:  {self.sheet[Statistic.Turnovers]}
-    STL: {self.sheet[Statistic.Steals]}
-    BLK: {self.sheet[Statistic.Blocks]}
-    PF:  {self.sheet[Statistic.Fouls]}
+    MIN: {position_minutes(s)}
+    PTS: {s[Statistic.Points]}
+    FG:  {s[Statistic.FieldGoalsMade]} / {s[Statistic.FieldGoalsAtt]}
+    TP:  {s[Statistic.ThreePointsMade]} / {s[Statistic.ThreePointsAtt]}
+    FT:  {s[Statistic.FreeThrowsMade]} / {s[Statistic.FreeThrowsAtt]}
+    +/-: {s[Statistic.PlusMinus]}
+    OR:  {s[Statistic.OffRebounds]}
+    DR:  {s[Statistic.DefRebounds]}
+    TR:  {s[Statistic.OffRebounds] + s[Statistic.DefRebounds]}
+    AST: {s[Statistic.Assists]}
+    TO:  {s[Statistic.Turnovers]}
+    STL: {s[Statistic.Steals]}
+    BLK: {s[Statistic.Blocks]}
+    PF:  {s[Statistic.Fouls]}
         """
 
     def row(self):
+        s = self.values()
+        pts, fgm, fga, tpm, tpa, ftm, fta, pm, orb, drb, ast, to, stl, blk, pf = _BOX_SCORE(s)
         return [
-            f"{self.minutes()}",
-            f"{self.sheet[Statistic.Points]}",
-            f"{self.sheet[Statistic.FieldGoalsMade]}/{self.sheet[Statistic.FieldGoalsAtt]}",
-            f"{self.sheet[Statistic.ThreePointsMade]}/{self.sheet[Statistic.ThreePointsAtt]}",
-            f"{self.sheet[Statistic.FreeThrowsMade]}/{self.sheet[Statistic.FreeThrowsAtt]}",
-            f"{self.sheet[Statistic.PlusMinus]}",
-            f"{self.sheet[Statistic.OffRebounds]}",
-            f"{self.sheet[Statistic.DefRebounds]}",
-            f"{self.sheet[Statistic.OffRebounds] + self.sheet[Statistic.DefRebounds]}",
-            f"{self.sheet[Statistic.Assists]}",
-            f"{self.sheet[Statistic.Turnovers]}",
-            f"{self.sheet[Statistic.Steals]}",
-            f"{self.sheet[Statistic.Blocks]}",
-            f"{self.sheet[Statistic.Fouls]}",
+            f"{position_minutes(s)}",
+            f"{pts}",
+            f"{fgm}/{fga}",
+            f"{tpm}/{tpa}",
+            f"{ftm}/{fta}",
+            f"{pm}",
+            f"{orb}",
+            f"{drb}",
+            f"{orb + drb}",
+            f"{ast}",
+            f"{to}",
+            f"{stl}",
+            f"{blk}",
+            f"{pf}",
         ]
 
     def player_stats(self):
+        s = self.values()
+        secs_pg, secs_sg, secs_sf, secs_pf, secs_c = _POSITION_SECS(s)
+        pts, fgm, fga, tpm, tpa, ftm, fta, pm, orb, drb, ast, to, stl, blk, pf = _BOX_SCORE(s)
         return {
-            "secs_pg": self.sheet[Statistic.SecsPG],
-            "secs_sg": self.sheet[Statistic.SecsSG],
-            "secs_sf": self.sheet[Statistic.SecsSF],
-            "secs_pf": self.sheet[Statistic.SecsPF],
-            "secs_c": self.sheet[Statistic.SecsC],
-            "mins": self.minutes(),
-            "pts": self.sheet[Statistic.Points],
-            "fgm": self.sheet[Statistic.FieldGoalsMade],
-            "fga": self.sheet[Statistic.FieldGoalsAtt],
-            "tpm": self.sheet[Statistic.ThreePointsMade],
-            "tpa": self.sheet[Statistic.ThreePointsAtt],
-            "ftm": self.sheet[Statistic.FreeThrowsMade],
-            "fta": self.sheet[Statistic.FreeThrowsAtt],
-            "+/-": self.sheet[Statistic.PlusMinus],
-            "or": self.sheet[Statistic.OffRebounds],
-            "dr": self.sheet[Statistic.DefRebounds],
-            "tr": self.sheet[Statistic.OffRebounds] + self.sheet[Statistic.DefRebounds],
-            "ast": self.sheet[Statistic.Assists],
-            "to": self.sheet[Statistic.Turnovers],
-            "stl": self.sheet[Statistic.Steals],
-            "blk": self.sheet[Statistic.Blocks],
-            "pf": self.sheet[Statistic.Fouls],
+            "secs_pg": secs_pg,
+            "secs_sg": secs_sg,
+            "secs_sf": secs_sf,
+            "secs_pf": secs_pf,
+            "secs_c": secs_c,
+            "mins": position_minutes(s),
+            "pts": pts,
+            "fgm": fgm,
+            "fga": fga,
+            "tpm": tpm,
+            "tpa": tpa,
+            "ftm": ftm,
+            "fta": fta,
+            "+/-": pm,
+            "or": orb,
+            "dr": drb,
+            "tr": orb + drb,
+            "ast": ast,
+            "to": to,
+            "stl": stl,
+            "blk": blk,
+            "pf": pf,
             "dunks": None,
             "points_in_the_paint": None,
         }
 
-    def team_stats(self):
+    def team_stats(self, possessions: bool = False):
+        """possessions: whether a Possessions extension counted them; if
+        not, their fields are None rather than zero."""
+        values = self.values()
+        pts, fgm, fga, tpm, tpa, ftm, fta, pm, orb, drb, ast, to, stl, blk, pf = _BOX_SCORE(values)
+        poss, top, fastbreak = _POSSESSION(values) if possessions else (None,) * 3
         return {
-            "pts": self.sheet[Statistic.Points],
-            "fgm": self.sheet[Statistic.FieldGoalsMade],
-            "fga": self.sheet[Statistic.FieldGoalsAtt],
-            "tpm": self.sheet[Statistic.ThreePointsMade],
-            "tpa": self.sheet[Statistic.ThreePointsAtt],
-            "ftm": self.sheet[Statistic.FreeThrowsMade],
-            "fta": self.sheet[Statistic.FreeThrowsAtt],
-            "+/-": self.sheet[Statistic.PlusMinus],
-            "or": self.sheet[Statistic.OffRebounds],
-            "dr": self.sheet[Statistic.DefRebounds],
-            "tr": self.sheet[Statistic.OffRebounds] + self.sheet[Statistic.DefRebounds],
-            "ast": self.sheet[Statistic.Assists],
-            "to": self.sheet[Statistic.Turnovers],
-            "stl": self.sheet[Statistic.Steals],
-            "blk": self.sheet[Statistic.Blocks],
-            "pf": self.sheet[Statistic.Fouls],
+            "pts": pts,
+            "fgm": fgm,
+            "fga": fga,
+            "tpm": tpm,
+            "tpa": tpa,
+            "ftm": ftm,
+            "fta": fta,
+            "+/-": pm,
+            "or": orb,
+            "dr": drb,
+            "tr": orb + drb,
+            "ast": ast,
+            "to": to,
+            "stl": stl,
+            "blk": blk,
+            "pf": pf,
             "dunks": None,
             "points_in_the_paint": None,
-            "fastbreak_points": None,
+            "fastbreak_points": fastbreak,
             "second_chance_points": None,
             "bench_points": None,
             "points_of_turnovers": None,
             "biggest_lead": None,
-            "time_of_possession": None,
-            "possessions": None,
+            "time_of_possession": top,
+            "possessions": poss,
             "timeouts30": None,
             "timeouts60": None,
         }
 
     def minutes(self):
-        return (
-            round(self.sheet[Statistic.SecsPG] / 60)
-            + round(self.sheet[Statistic.SecsSG] / 60)
-            + round(self.sheet[Statistic.SecsSF] / 60)
-            + round(self.sheet[Statistic.SecsPF] / 60)
-            + round(self.sheet[Statistic.SecsC] / 60)
-        )
+        return position_minutes(self.values())
+
+
+class _TotalsRow:
+    """Read/write view of the derived totals of a Stats buffer.
+
+    Reads sum the column over every period. Writes (e.g. box score totals
+    loaded from BBApi) land in the unattributed row so the sum matches.
+    """
+
+    __slots__ = ("stats",)
+
+    def __init__(self, stats: "Stats") -> None:
+        self.stats = stats
+
+    def __getitem__(self, stat: int) -> int:
+        stats = self.stats
+        return stats.unattributed[stat] + sum(sheet.sheet[stat] for sheet in stats.qtr)
+
+    def __setitem__(self, stat: int, val: int) -> None:
+        self.stats.unattributed[stat] += val - self[stat]
+
+    def __len__(self) -> int:
+        return Statistic.TeamStats
+
+    def __iter__(self):
+        return iter(self.stats.totals())
+
+
+class TotalSheet(StatSheet):
+    __slots__ = ("stats",)
+
+    def __init__(self, stats: "Stats") -> None:
+        self.stats = stats
+        self.sheet = _TotalsRow(stats)
+
+    def values(self):
+        return self.stats.totals()
+
+    def team_stats(self, possessions: bool | None = None):
+        if possessions is None:
+            possessions = self.stats.possessions_counted
+        return super().team_stats(possessions)
 
 
 class Stats:
+    """(period x stat) buffer: one int row per period pushed so far. Totals
+    are column sums derived on demand."""
+
+    __slots__ = ("qtr", "current", "unattributed", "possessions_counted")
+
     def __init__(self) -> None:
-        self.full = StatSheet()
         self.qtr: list[StatSheet] = []
+        # Set when a Possessions extension fills the possession columns
+        self.possessions_counted = False
+        # Game-level values not attributed to a period (BBApi box scores)
+        self.unattributed = array("i", EMPTY_ROW)
+        # Row written by add(): the latest period once one has been pushed
+        self.current = self.unattributed
+
+    @property
+    def full(self) -> StatSheet:
+        return TotalSheet(self)
 
     def add(self, stat: Statistic, val: int):
-        self.full.sheet[stat] += val
-        self.qtr[-1].sheet[stat] += val
+        self.current[stat] += val
 
     def new_qtr_sheet(self):
-        self.qtr.append(StatSheet())
+        sheet = StatSheet()
+        self.qtr.append(sheet)
+        self.current = sheet.sheet
+
+    def totals(self) -> array:
+        rows = [sheet.sheet for sheet in self.qtr]
+        if not rows:
+            return array("i", self.unattributed)
+        return array("i", map(sum, zip(self.unattributed, *rows)))
+
+    def player_json(self) -> dict:
+        stats = {f"q{qtr}": sheet.player_stats() for qtr, sheet in enumerate(self.qtr, start=1)}
+        stats["total"] = self.full.player_stats()
+        return stats
+
+    def team_json(self) -> dict:
+        counted = self.possessions_counted
+        stats = {f"q{qtr}": sheet.team_stats(counted) for qtr, sheet in enumerate(self.qtr, start=1)}
+        stats["total"] = self.full.team_stats(counted)
+        return stats
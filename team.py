@@ -5,6 +5,7 @@ from typing import Optional
 from tabulate import tabulate, SEPARATING_LINE
 from event_types import *
 from shot_chart import ShotChart
+from tracing import TraceLevel, tracer
 
 
 def opponent(team: int) -> int:
@@ -22,7 +23,6 @@ class Team:
         self.last_update = 0
         self.shot_chart = ShotChart()
 
-        self.verbose = True
         self.off_strategy = "~unknown~"
         self.def_strategy = "~unknown~"
 
@@ -34,8 +34,15 @@ class Team:
         pout = self.players[player_out]
         pin = self.players[player_in]
 
-        if self.verbose:
-            print(f"{str(sub_type)} - OUT: {pout.name}, IN: {pin.name}")
+        if tracer.level >= TraceLevel.STATS:
+            tracer.emit(
+                TraceLevel.STATS,
+                "sub",
+                team=self.name,
+                sub_type=str(sub_type),
+                player_out=pout.name,
+                player_in=pin.name,
+            )
 
         if sub_type == SubType.SUB_PG:
             self.active[0] = pin
@@ -66,9 +73,15 @@ class Team:
         self.active[pos1] = p1
         self.active[pos2] = p2
 
-        if self.verbose:
-            print(
-                f"SWAP {self.name} - {p1.name} to {pos_name[pos1]} and {p2.name} to {pos_name[pos2]}"
+        if tracer.level >= TraceLevel.STATS:
+            tracer.emit(
+                TraceLevel.STATS,
+                "swap",
+                team=self.name,
+                player1=p1.name,
+                pos1=pos_name[pos1],
+                player2=p2.name,
+                pos2=pos_name[pos2],
             )
 
     def update_minutes(self, gameclock: int):
@@ -80,10 +93,15 @@ class Team:
         self.active[3].add_stats(Statistic.SecsPF, secs)
         self.active[4].add_stats(Statistic.SecsC, secs)
 
-        if self.verbose:
+        if tracer.level >= TraceLevel.STATS:
             for player in self.active:
-                print(
-                    f"MINUTES {self.short} - {player.name} +{secs}s = {player.secs_total()}"
+                tracer.emit(
+                    TraceLevel.STATS,
+                    "minutes",
+                    team=self.short,
+                    player=player.name,
+                    secs=secs,
+                    total=player.secs_total(),
                 )
 
         self.last_update = gameclock
@@ -93,14 +111,20 @@ class Team:
 
     def add_stats(self, stat: Statistic, val: int, pid: Optional[int] = None):
         if isinstance(pid, int):
-            if self.verbose:
-                print(
-                    f"{self.name},  {self.players[pid - 1].name},  {stat.name}: {val}"
+            if tracer.level >= TraceLevel.STATS:
+                tracer.emit(
+                    TraceLevel.STATS,
+                    "stat",
+                    team=self.name,
+                    player=self.players[pid - 1].name,
+                    stat=stat.name,
+                    value=val,
                 )
             self.players[pid - 1].stats.add(stat, val)
-        else:
-            if self.verbose:
-                print(f"{self.name},  --  {stat.name}: {val}")
+        elif tracer.level >= TraceLevel.STATS:
+            tracer.emit(
+                TraceLevel.STATS, "stat", team=self.name, player="--", stat=stat.name, value=val
+            )
         self.stats.add(stat, val)
 
     def push_stat_sheet(self):
@@ -108,6 +132,24 @@ class Team:
         for player in self.players:
             player.stats.new_qtr_sheet()
 
+    def to_json(self) -> dict:
+        """Roster and per-quarter/total stats of the team and its players."""
+        players = [
+            {
+                "id": player.id,
+                "name": player.name,
+                "starter": player.starter,
+                "stats": player.stats.player_json(),
+            }
+            for player in self.players
+        ]
+        return {
+            "id": self.id,
+            "name": self.name,
+            "players": players,
+            "stats": self.stats.team_json(),
+        }
+
     def print_stats(self):
         headers = [
             "Name",
@@ -139,9 +181,15 @@ class Team:
     def __eq__(self, other):
         def stats_eql(stat: Statistic):
             if self.stats.full.sheet[stat] != other.stats.full.sheet[stat]:
-                print(
-                    f"Not eql: {str(stat)} - {self.name}: {self.stats.full.sheet[stat]} != {other.stats.full.sheet[stat]}"
-                )
+                if tracer.level >= TraceLevel.DEBUG:
+                    tracer.emit(
+                        TraceLevel.DEBUG,
+                        "team_stat_mismatch",
+                        team=self.name,
+                        stat=str(stat),
+                        value=self.stats.full.sheet[stat],
+                        other=other.stats.full.sheet[stat],
+                    )
                 return False
             return True
 
@@ -174,19 +222,26 @@ class Team:
 
             def p_stats_eql(stat: Statistic):
                 if player.stats.full.sheet[stat] != other.stats.full.sheet[stat]:
-                    if __debug__:
-                        print(
-                            f"Not eql: {player.name} - {str(stat)}: {player.stats.full.sheet[stat]} != {other.stats.full.sheet[stat]}"
+                    if tracer.level >= TraceLevel.DEBUG:
+                        tracer.emit(
+                            TraceLevel.DEBUG,
+                            "player_stat_mismatch",
+                            player=player.name,
+                            stat=str(stat),
+                            value=player.stats.full.sheet[stat],
+                            other=other.stats.full.sheet[stat],
                         )
                     return False
                 return True
 
-            if __debug__:
-                print(
-                    player.name,
-                    player.stats.full.minutes() == other.stats.full.minutes(),
-                    player.stats.full.minutes(),
-                    other.stats.full.minutes(),
+            if tracer.level >= TraceLevel.DEBUG:
+                tracer.emit(
+                    TraceLevel.DEBUG,
+                    "player_minutes",
+                    player=player.name,
+                    equal=player.stats.full.minutes() == other.stats.full.minutes(),
+                    minutes=player.stats.full.minutes(),
+                    other_minutes=other.stats.full.minutes(),
                 )
 
             player_eql &= (
@@ -0,0 +1,180 @@
+"""Builders shared by the tests: a sample report and viewmatch document,
+the box score it plays to, and stand-ins for the BBAPI."""
+
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from game import Game
+from main import PLAY_ARGS, decode_report, parse_xml
+from player import Player
+from stats import Statistic
+from team import Team
+
+
+def make_teams() -> tuple[Team, Team]:
+    ht = Team()
+    at = Team()
+    for index in range(12):
+        ht.players.append(Player(f"Home Player{index}"))
+        at.players.append(Player(f"Away Player{index}"))
+    return ht, at
+
+
+def make_report() -> str:
+    header = "".join(f"{10000000 + i:08d}" for i in range(24)) + "12345" + "12345"
+    events = [
+        "09339012000000000",  # jump ball
+        "01004031700120010",  # three pointer, assisted
+        "12012001100250030",  # two pointer, missed
+        "19318011000260032",  # defensive rebound
+        "08079013100400045",  # steal
+        "09629000000000100",  # end of game
+    ]
+    return header + "".join(events)
+
+
+def play_report(report: str | None = None, extensions=(), *, starters: bool = False, args=PLAY_ARGS) -> Game:
+    """Play report (make_report() by default) between fresh make_teams()
+    teams, with the first five of each roster as starters if asked."""
+    ht, at = make_teams()
+    if starters:
+        for pos in range(5):
+            ht.set_starter(pos, pos)
+            at.set_starter(pos, pos)
+    game = Game(1, decode_report(report or make_report(), at, ht), ht, at, args, list(extensions))
+    game.play()
+    return game
+
+
+def make_document() -> str:
+    players = "".join(f"<HPlayer{i}>Home Player{i}</HPlayer{i}>" for i in range(12))
+    players += "".join(f"<HPlayerNick{i}>Nick{i}</HPlayerNick{i}>" for i in range(12))
+    players += "".join(f"<APlayer{i}>Away Player{i}</APlayer{i}>" for i in range(12))
+    return (
+        "<BBData>"
+        "<HomeTeam><ID>11</ID><Name>Home Five</Name><ShortName>HF</ShortName></HomeTeam>"
+        "<AwayTeam><ID>22</ID><Name>Away Five</Name><ShortName>AF</ShortName></AwayTeam>"
+        f"{players}<ReportString>\n{make_report()}\n</ReportString>"
+        "</BBData>"
+    )
+
+
+BOX_FIELDS = {
+    "pts": Statistic.Points,
+    "fgm": Statistic.FieldGoalsMade,
+    "fga": Statistic.FieldGoalsAtt,
+    "tpm": Statistic.ThreePointsMade,
+    "tpa": Statistic.ThreePointsAtt,
+    "ftm": Statistic.FreeThrowsMade,
+    "fta": Statistic.FreeThrowsAtt,
+    "oreb": Statistic.OffRebounds,
+    "ast": Statistic.Assists,
+    "to": Statistic.Turnovers,
+    "stl": Statistic.Steals,
+    "blk": Statistic.Blocks,
+    "pf": Statistic.Fouls,
+}
+POSITIONS = ("PG", "SG", "SF", "PF", "C")
+
+
+def box_lines(sheet) -> str:
+    fields = "".join(f"<{tag}>{sheet[stat]}</{tag}>" for tag, stat in BOX_FIELDS.items())
+    rebounds = sheet[Statistic.OffRebounds] + sheet[Statistic.DefRebounds]
+    return f"{fields}<reb>{rebounds}</reb>"
+
+
+def team_xml(tag: str, team) -> str:
+    players = []
+    for player in team.players:
+        first, last = player.name.split(" ")
+        minutes = "".join(f"<{pos}>0</{pos}>" for pos in POSITIONS)
+        players.append(
+            f'<player id="{player.id}"><firstName>{first}</firstName><lastName>{last}</lastName>'
+            f"<minutes>{minutes}</minutes><performance>{box_lines(player.stats.full.sheet)}</performance></player>"
+        )
+    return (
+        f'<{tag} id="{team.id}"><teamName>{team.name}</teamName>'
+        "<offStrategy>Base</offStrategy><defStrategy>M2M</defStrategy>"
+        f'<score partials="{team.points()}">{team.points()}</score>'
+        f"<boxscore><teamTotals>{box_lines(team.stats.full.sheet)}</teamTotals>{''.join(players)}</boxscore>"
+        f"</{tag}>"
+    )
+
+
+def make_boxscore() -> str:
+    """boxscore.aspx document matching the played sample document."""
+    events, ht, at = parse_xml(make_document())
+    game = Game("1", events, ht, at, PLAY_ARGS, [])
+    game.play()
+    return f"<bbapi><match>{team_xml('awayTeam', at)}{team_xml('homeTeam', ht)}</match></bbapi>"
+
+
+MATCHES_DIR = Path(__file__).resolve().parents[1] / "matches"
+
+# BBAPI endpoint -> cached file name, filled from the query parameters
+CACHED_FILES = {
+    "/schedule.aspx": "schedule_{teamid}_{season}.xml",
+    "/standings.aspx": "standings_{leagueid}_{season}.xml",
+    "/boxscore.aspx": "boxscore_{matchid}.xml",
+    "/player.aspx": "player_{playerid}.xml",
+}
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Answers BBAPI calls with the XML files of the server's directories."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+
+        body = None
+        if url.path == "/login.aspx":
+            body = '<bbapi version="1"><loggedIn /></bbapi>'
+        elif url.path in CACHED_FILES:
+            name = CACHED_FILES[url.path].format(**query)
+            for directory in server.directories:
+                if (directory / name).exists():
+                    body = (directory / name).read_text(encoding="utf-8")
+                    break
+        with server.lock:
+            server.in_flight -= 1
+
+        data = (body or "Not found").encode("utf-8")
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayApi:
+    logged_in = True
+
+    def __init__(self, logged_in=True):
+        self.logged_in = logged_in
+
+    def boxscore(self, matchid):
+        pass
+
+    def get_xml_boxscore(self, matchid):
+        return make_boxscore()
+
+
+def make_game_report(matchid="7", **kwargs):
+    """load_game_report of the sample document, without BBAPI."""
+    import web_tool
+
+    with mock.patch.object(web_tool, "get_xml_text", lambda matchid: make_document()):
+        return web_tool.load_game_report(matchid, "", "", api=ReplayApi(), **kwargs)
@@ -0,0 +1,91 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import bbapi
+from bbapi import AsyncBBApi, BBApi, fetch_all
+from tests.helpers import MATCHES_DIR, ReplayHandler, make_boxscore
+
+class AsyncBBApiTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        served = Path(tmp.name) / "served"
+        cache = Path(tmp.name) / "cache"
+        served.mkdir()
+        (served / "boxscore_7.xml").write_text(make_boxscore(), encoding="utf-8")
+        for playerid in range(1, 9):
+            (served / f"player_{playerid}.xml").write_text(
+                f"<bbapi><player id='{playerid}'><firstName>P</firstName><lastName>{playerid}</lastName>"
+                f"<age>{18 + playerid % 3}</age></player></bbapi>",
+                encoding="utf-8",
+            )
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+        self.server.directories = [MATCHES_DIR, served]
+        self.server.lock = threading.Lock()
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.server.delay = 0.0
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        # Empty client cache: every call goes to the stub
+        patcher = mock.patch.object(bbapi, "CACHE_DIR", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self, **kwargs) -> AsyncBBApi:
+        return asyncio.run(AsyncBBApi.connect("user", "code", base_url=self.base_url, **kwargs))
+
+    def test_methods_match_the_blocking_client(self):
+        client = self.connect()
+        self.addCleanup(client.close)
+        api = BBApi("user", "code", base_url=self.base_url)
+
+        async def run():
+            return await asyncio.gather(
+                client.schedule_matches(162312, 48),
+                client.standings(2083, 30),
+                client.player_info(3),
+                client.boxscore(7),
+            )
+
+        schedule, standings, info, (away, home) = asyncio.run(run())
+
+        self.assertTrue(client.logged_in)
+        self.assertEqual(schedule, api.schedule_matches(162312, 48))
+        self.assertEqual(standings, api.standings(2083, 30))
+        self.assertEqual(info, api.player_info(3))
+        self.assertEqual(home.name, "Home Five")
+        self.assertEqual(away.points(), api.boxscore(7)[0].points())
+
+    def test_fan_out_is_bounded_and_ordered(self):
+        self.server.delay = 0.05
+        client = self.connect(concurrency=3)
+        self.addCleanup(client.close)
+
+        infos = asyncio.run(client.fan_out(client.player_info, list(range(1, 9))))
+
+        self.assertEqual([info["last_name"] for info in infos], [str(i) for i in range(1, 9)])
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+
+    def test_fetch_all_returns_failures_in_place(self):
+        api = BBApi("user", "code", base_url=self.base_url)
+
+        infos = fetch_all(api, "player_info", [1, 99])
+
+        self.assertEqual(infos[0]["age"], 19)
+        self.assertIsInstance(infos[1], Exception)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import json
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest import mock
+
+import main
+from tests.helpers import make_document
+
+
+def batch_args() -> Namespace:
+    return Namespace(**vars(main.PLAY_ARGS))
+
+
+class BatchModeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache = Path(self.tmp.name)
+        for matchid in ("101", "102"):
+            (cache / f"report_{matchid}.xml").write_text(make_document(), encoding="utf-8")
+        (cache / "report_666.xml").write_text("<BBData><Broken>", encoding="utf-8")
+
+        patcher = mock.patch.object(main, "CACHE_DIR", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_records_are_streamed_in_input_order(self):
+        out = io.StringIO()
+
+        with mock.patch("sys.stderr", io.StringIO()):
+            failures = main.run_batch(["102", "666", "101"], batch_args(), 1, out)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(failures, 1)
+        self.assertEqual([record["matchid"] for record in records], ["102", "666", "101"])
+        self.assertEqual([record["ok"] for record in records], [True, False, True])
+        self.assertIn("ParseError", records[1]["error"])
+        self.assertEqual(records[0]["game"]["teamHome"]["name"], "Home Five")
+        self.assertEqual(records[0]["game"], records[2]["game"])
+
+    def test_schedules_queue_played_league_matches(self):
+        cache = Path(self.tmp.name)
+        matches = "".join(
+            f'<match id="{matchid}" type="{kind}"><awayTeam><score>{score}</score></awayTeam>'
+            f"<homeTeam><score>{score}</score></homeTeam></match>"
+            for matchid, kind, score in (("201", "league.rs", "80"), ("202", "league.rs", ""), ("203", "cup", "75"))
+        )
+        (cache / "schedule_1_70.xml").write_text(f"<bbapi><schedule>{matches}</schedule></bbapi>", encoding="utf-8")
+        # A schedule the cache can't read
+        (cache / "schedule_2_70.xml").mkdir()
+
+        self.assertEqual(main.cached_schedule_matchids(), ["201"])
+
+    def test_read_matchids_skips_blank_and_comment_lines(self):
+        path = Path(self.tmp.name) / "ids.txt"
+        path.write_text("# league 1\n101\n\n 102 \n", encoding="utf-8")
+
+        self.assertEqual(main.read_matchids(str(path)), ["101", "102"])
+
+
+if __name__ == "__main__":
+    unittest.main()
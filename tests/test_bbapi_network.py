@@ -0,0 +1,136 @@
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+import bbapi
+from bbapi import BBApi, Network, RateLimiter
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.paths.append(self.path)
+        server.clients.add(self.client_address)
+        if self.path.startswith("/flaky") and server.failures > 0:
+            server.failures -= 1
+            status, body = 503, b"busy"
+        elif "matchid=503" in self.path:
+            status, body = 503, b"<html>Service Unavailable</html>"
+        elif "matchid=401" in self.path:
+            status, body = 200, b'<bbapi version="1"><error message="NotAuthorized" /></bbapi>'
+        elif self.path.startswith("/login.aspx"):
+            status, body = 200, b'<bbapi version="1"><loggedIn /></bbapi>'
+        else:
+            status, body = 200, b"<bbapi />"
+        self.send_response(status)
+        if self.path.startswith("/login.aspx"):
+            self.send_header("Set-Cookie", "session=abc")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class NetworkTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.paths = []
+        self.server.clients = set()
+        self.server.failures = 0
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.network = Network(backoff=0)
+        self.addCleanup(self.network.close)
+
+    def test_calls_reuse_one_connection(self):
+        for _ in range(5):
+            self.assertEqual(self.network.get(f"{self.base}/boxscore.aspx", {"matchid": 1}), "<bbapi />")
+
+        self.assertEqual(len(self.server.clients), 1)
+        self.assertEqual(self.network.latency["/boxscore.aspx"][0], 5)
+        self.assertEqual(self.network.latency_rows()[0][:2], ["/boxscore.aspx", 5])
+
+    def test_latency_counts_calls_from_every_thread(self):
+        def fetch(worker):
+            for call in range(10):
+                self.network.get(f"{self.base}/endpoint{worker}-{call % 3}.aspx")
+                self.network.latency_rows()
+
+        threads = [threading.Thread(target=fetch, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.network.calls(), 80)
+        self.assertEqual(len(self.network.latency_rows()), 24)
+
+    def test_server_errors_are_retried(self):
+        self.server.failures = 2
+
+        self.assertEqual(self.network.get(f"{self.base}/flaky"), "<bbapi />")
+        self.assertEqual(self.server.paths, ["/flaky"] * 3)
+
+    def test_retries_are_bounded(self):
+        self.server.failures = 10
+        network = Network(retries=1, backoff=0)
+        self.addCleanup(network.close)
+
+        with self.assertRaises(requests.HTTPError):
+            network.get(f"{self.base}/flaky")
+        self.assertEqual(len(self.server.paths), 2)
+
+    def test_rate_limiter_spaces_calls_of_every_thread(self):
+        network = Network(rate_limiter=RateLimiter(50, burst=2))
+        self.addCleanup(network.close)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=network.get, args=(f"{self.base}/boxscore.aspx",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Two calls in the burst, the other four 20 ms apart
+        self.assertGreaterEqual(time.monotonic() - start, 0.075)
+        self.assertEqual(len(self.server.paths), 6)
+        self.assertGreater(network.rate_limiter.waited, 0)
+
+    def test_login_cookie_is_kept_for_later_calls(self):
+        self.network.session.cookies.set("stale", "1")
+
+        self.network.first_get(f"{self.base}/login.aspx", {"login": "user", "code": "code"})
+
+        self.assertEqual(dict(self.network.cookies), {"session": "abc"})
+
+    def test_error_responses_are_not_cached(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        api = BBApi("user", "code", Network(retries=0), base_url=self.base)
+        self.addCleanup(api.network.close)
+
+        with mock.patch.object(bbapi, "CACHE_DIR", Path(tmp.name)):
+            with self.assertRaises(requests.HTTPError):
+                api.get_xml_boxscore(503)
+            with self.assertRaises(ValueError):
+                api.get_xml_boxscore(401)
+            self.assertEqual(api.get_xml_boxscore(1), "<bbapi />")
+
+        self.assertEqual([path.name for path in Path(tmp.name).iterdir()], ["boxscore_1.xml"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from clocks import FEED_CLOCKS, GAME_CLOCKS, MAX_OVERTIMES, OVER_TIME, REGULAR_TIME, Gameclock
+from web_tool import nba_is_clutch
+
+# Two overtimes past the end of the tables, to cover the computed fallback
+LAST_CLOCK = REGULAR_TIME + (MAX_OVERTIMES + 2) * OVER_TIME
+
+
+class ClockTableTests(unittest.TestCase):
+    def test_game_table_matches_gameclock(self):
+        for clock in range(LAST_CLOCK):
+            gameclock = Gameclock(clock)
+            self.assertEqual(GAME_CLOCKS.till_break(clock), gameclock.till_break())
+            self.assertEqual(GAME_CLOCKS.is_clutch(clock), gameclock.is_clutch())
+            quarter = GAME_CLOCKS.quarter(clock)
+            self.assertEqual(GAME_CLOCKS.label(clock, quarter), Gameclock(clock, quarter).to_string())
+            if clock and GAME_CLOCKS.till_break(clock) == GAME_CLOCKS.period_length(quarter):
+                self.assertEqual(GAME_CLOCKS.label(clock, quarter - 1), "00:00")
+
+    def test_quarters_and_labels(self):
+        self.assertEqual(GAME_CLOCKS.quarter(0), 1)
+        self.assertEqual(GAME_CLOCKS.quarter(720), 2)
+        self.assertEqual(GAME_CLOCKS.quarter(REGULAR_TIME), 5)
+        self.assertEqual(GAME_CLOCKS.quarter(LAST_CLOCK), 5 + MAX_OVERTIMES + 2)
+        self.assertEqual(FEED_CLOCKS.label(REGULAR_TIME + 60), "06:00")
+        self.assertEqual(GAME_CLOCKS.label(REGULAR_TIME + 60), "04:00")
+        self.assertEqual(GAME_CLOCKS.label(LAST_CLOCK + 1), "04:59")
+
+    def test_feed_clutch_windows(self):
+        self.assertFalse(nba_is_clutch(2579, 80, 80))
+        self.assertTrue(nba_is_clutch("2580", 80, 80))
+        self.assertFalse(nba_is_clutch(2880 + 119, 80, 80))
+        self.assertTrue(nba_is_clutch(2880 + 120, 80, 80))
+        self.assertTrue(nba_is_clutch(2880 + 420 * 20 + 200, 80, 80))
+        self.assertFalse(nba_is_clutch(2700, 80, 86))
+        self.assertFalse(nba_is_clutch(None, 80, 80))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import unittest
+
+import comments
+from comments import Comments, load_commentary, roster_sides, split_template
+from main import decode_report
+from tests.helpers import make_report, make_teams, play_report
+
+
+class LazyCommentaryTests(unittest.TestCase):
+    def test_play_does_not_render_commentary(self):
+        game = play_report()
+
+        self.assertTrue(all(comment is None for comment in game.events.comment))
+        self.assertIsNotNone(game.events.player1obj[1])
+
+    def test_comments_are_rendered_once_on_first_read(self):
+        game = play_report()
+        calls = []
+        render = game.events.renderer
+
+        def counting_render(index):
+            calls.append(index)
+            return render(index)
+
+        game.events.renderer = counting_render
+        shot = game.baseevents[1]
+
+        first = shot.comments
+        second = shot.comments
+
+        self.assertIs(first, second)
+        self.assertEqual(calls, [1, 2])
+        self.assertIn("(H)", first[0])
+
+    def test_lazy_and_eager_commentary_match(self):
+        ht, at = make_teams()
+        eager = decode_report(make_report(), at, ht)
+        Comments().annotate(eager, [ht, at])
+        lazy = decode_report(make_report(), at, ht)
+        Comments().bind(lazy, [ht, at])
+
+        self.assertEqual(
+            [lazy.comment_at(i) for i in range(len(lazy))],
+            eager.comment,
+        )
+
+
+class RosterSidesTests(unittest.TestCase):
+    def test_home_wins_for_ids_on_both_rosters(self):
+        ht, at = make_teams()
+        ht.players[0].id = 7
+        at.players[0].id = 7
+        at.players[1].id = 8
+
+        sides = roster_sides([ht, at])
+
+        self.assertEqual(sides[7], "(H)")
+        self.assertEqual(sides[8], "(A)")
+
+
+class CommentaryTableTests(unittest.TestCase):
+    def test_tables_are_shared_between_instances(self):
+        self.assertIs(Comments().comments, Comments().comments)
+        self.assertIs(Comments().segments, Comments("en").segments)
+
+    def test_languages_are_loaded_on_demand(self):
+        comments._TABLES.pop("pl", None)
+        Comments()
+        self.assertNotIn("pl", comments._TABLES)
+
+        polish = Comments("pl")
+
+        self.assertIn("pl", comments._TABLES)
+        self.assertEqual(polish.comments["e0000"][1], "Kosz.")
+
+    def test_table_is_reloaded_when_xml_changes(self):
+        table = load_commentary("en")
+        stat = os.stat(table.path)
+        try:
+            os.utime(table.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.assertIsNot(load_commentary("en"), table)
+        finally:
+            os.utime(table.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def test_split_template_alternates_literals_and_placeholders(self):
+        self.assertEqual(
+            split_template("$event1$ off of a pass from $player2$."),
+            ("", "event1", " off of a pass from ", "player2", "."),
+        )
+        self.assertEqual(split_template("Scored."), ("Scored.",))
+
+
+if __name__ == "__main__":
+    unittest.main()
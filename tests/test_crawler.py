@@ -0,0 +1,148 @@
+import re
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import bbapi
+from bbapi import BBApi, Network, RateLimiter
+from crawler import CrawlState, crawl
+from tests.helpers import MATCHES_DIR, ReplayHandler, make_boxscore
+
+# Standings and schedules of this league season are in matches/
+LEAGUE, SEASON = 2083, 30
+# A team of the league
+TEAM = 165320
+
+
+class CrawlHandler(ReplayHandler):
+    """ReplayHandler answering every box score with the sample one, except
+    the matches the server's failing(matchid) picks (503)."""
+
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/boxscore.aspx":
+            return super().do_GET()
+        matchid = parse_qs(url.query)["matchid"][0]
+        with self.server.lock:
+            self.server.boxscores.append(matchid)
+        status = 503 if self.server.failing(matchid) else 200
+        data = (self.server.boxscore if status == 200 else "busy").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class CrawlerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_path = Path(tmp.name) / "crawl_state.json"
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CrawlHandler)
+        self.server.directories = [MATCHES_DIR]
+        self.server.lock = threading.Lock()
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.server.delay = 0.0
+        self.server.boxscore = make_boxscore()
+        self.server.boxscores = []
+        self.server.failing = lambda matchid: False
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        patcher = mock.patch.object(bbapi, "CACHE_DIR", Path(tmp.name) / "cache")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self) -> BBApi:
+        network = Network(retries=0, rate_limiter=RateLimiter(1000, 8))
+        self.addCleanup(network.close)
+        return BBApi("user", "code", network, f"http://127.0.0.1:{self.server.server_address[1]}")
+
+    def crawl(self):
+        return crawl(self.connect(), [LEAGUE], [SEASON], self.state_path, concurrency=4)
+
+    def test_every_league_match_is_fetched_once(self):
+        summary = self.crawl()
+
+        stages = summary["stages"]
+        self.assertEqual(stages["standings"], {"fetched": 1})
+        self.assertEqual(stages["schedule"], {"fetched": 16})
+        self.assertGreater(stages["boxscore"]["fetched"], 100)
+        self.assertEqual(summary["errors"], {})
+        self.assertEqual(sorted(self.server.boxscores), sorted(set(self.server.boxscores)))
+        self.assertEqual(summary["matches"], len(self.server.boxscores))
+        self.assertEqual(summary["requests"], 1 + 16 + len(self.server.boxscores))
+
+        state = CrawlState(self.state_path)
+        self.assertEqual(len(state.standings[f"{LEAGUE}_{SEASON}"]), 16)
+        self.assertEqual(state.boxscores, set(self.server.boxscores))
+
+    def test_rerun_resumes_and_retries_failures(self):
+        self.server.failing = lambda matchid: matchid.endswith("3")
+        first = self.crawl()
+        failed = {matchid for matchid in self.server.boxscores if matchid.endswith("3")}
+        self.assertTrue(failed)
+        self.assertEqual(first["stages"]["boxscore"]["failed"], len(failed))
+        self.assertEqual(len(first["errors"]), len(failed))
+
+        self.server.failing = lambda matchid: False
+        self.server.boxscores.clear()
+        second = self.crawl()
+
+        self.assertEqual(set(self.server.boxscores), failed)
+        self.assertEqual(second["requests"], len(failed))
+        self.assertEqual(second["stages"]["standings"], {"resumed": 1})
+        self.assertEqual(second["stages"]["schedule"], {"resumed": 16})
+        self.assertEqual(second["stages"]["boxscore"]["fetched"], len(failed))
+        self.assertEqual(second["matches"], first["matches"] + len(failed))
+        self.assertEqual(second["errors"], {})
+
+    def test_schedules_with_matches_to_play_are_fetched_again(self):
+        name = f"schedule_{TEAM}_{SEASON}.xml"
+        text = (MATCHES_DIR / name).read_text(encoding="utf-8")
+        # The last league match of the team is not played yet
+        start = text.rindex("type='league")
+        end = text.index("</match>", start)
+        served = self.state_path.parent / "served"
+        served.mkdir()
+        (served / name).write_text(text[:start] + re.sub(r"<score>\d+</score>", "", text[start:end]) + text[end:], encoding="utf-8")
+        self.server.directories = [served, MATCHES_DIR]
+
+        self.assertEqual(len(self.connect().schedule(TEAM, SEASON)), 23)
+        self.crawl()
+        state = CrawlState(self.state_path)
+        self.assertNotIn(f"{TEAM}_{SEASON}", state.schedules)
+        self.assertEqual(len(state.schedules), 15)
+
+        # Played by the next run
+        self.server.directories = [MATCHES_DIR]
+        (bbapi.CACHE_DIR / name).unlink()
+        second = self.crawl()
+
+        self.assertEqual(second["stages"]["schedule"], {"fetched": 1, "resumed": 15})
+        self.assertEqual(len(CrawlState(self.state_path).schedules[f"{TEAM}_{SEASON}"]), 24)
+
+    def test_prefetch_data_passes_the_rate_to_the_network(self):
+        url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        with mock.patch("crawler.BBApi") as api_class:
+            api_class.side_effect = lambda username, password, network: BBApi(username, password, network, url)
+            summary = bbapi.prefetch_data("user", "code", [LEAGUE], SEASON, SEASON, rate=500, state_path=self.state_path)
+
+        network = api_class.call_args.args[2]
+        self.addCleanup(network.close)
+        self.assertEqual(network.rate_limiter.interval, 1 / 500)
+        self.assertEqual(summary["errors"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
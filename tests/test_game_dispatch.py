@@ -0,0 +1,54 @@
+import unittest
+from argparse import Namespace
+
+from game import EVENT_HANDLERS, EVENT_HOOKS, Extension, Game, Possessions
+from main import PLAY_ARGS
+from tests.helpers import make_teams, play_report
+
+
+class ShotCounter(Extension):
+    def __init__(self) -> None:
+        super().__init__()
+        self.shots = 0
+
+    def on_shot_event(self, game, event):
+        self.shots += 1
+
+
+def play(extensions, time_hooks=False) -> Game:
+    return play_report(extensions=extensions, args=Namespace(**vars(PLAY_ARGS), time_hooks=time_hooks))
+
+
+class GameDispatchTests(unittest.TestCase):
+    def test_every_hooked_event_has_a_handler(self):
+        self.assertEqual(set(EVENT_HOOKS), set(EVENT_HANDLERS))
+
+    def test_only_overridden_hooks_are_dispatched(self):
+        counter = ShotCounter()
+        game = Game(1, [], *make_teams(), Namespace(), [counter])
+
+        handlers, hooks = game.dispatch_tables()
+
+        self.assertEqual(
+            [event_class for event_class, calls in hooks.items() if calls],
+            [event_class for event_class, hook in EVENT_HOOKS.items() if hook == "on_shot_event"],
+        )
+        self.assertTrue(counter.overrides("on_shot_event"))
+        self.assertFalse(counter.overrides("on_break_event"))
+
+    def test_hooks_are_called_for_matching_events(self):
+        counter = ShotCounter()
+        play([counter, Possessions()])
+
+        self.assertEqual(counter.shots, 2)
+
+    def test_hook_timings_are_collected_on_request(self):
+        game = play([ShotCounter()], time_hooks=True)
+
+        self.assertEqual(game.hook_timings["ShotCounter.on_shot_event"][0], 2)
+        self.assertEqual(game.hook_timings["Game.play_shot"][0], 2)
+        self.assertEqual(play([ShotCounter()]).hook_timings, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+import web_tool
+from game import LineupStints, Possessions
+from tests.helpers import make_report, play_report
+
+THREE_POINTER = "01004031700120010"
+# Home PG sub at 20: player 6 in for player 1
+SUB_AT_20 = "09510006100200000"
+JUMP_BALL = "09339012000000000"
+DEF_REBOUND = "19318011000260032"
+# Away shooting foul drawn at 30, then one free throw made and one missed
+FREE_THROWS = "15040002100300031" "15020002000300032" "15030002000300033"
+
+
+def play_with_stints(report: str) -> LineupStints:
+    stints = LineupStints()
+    play_report(report, [stints], starters=True)
+    return stints
+
+
+class LineupStintsTests(unittest.TestCase):
+    def test_substitution_starts_a_new_stint(self):
+        stints = play_with_stints(make_report().replace(THREE_POINTER, THREE_POINTER + SUB_AT_20))
+
+        home = [stint for stint in stints.stints if stint.side == 0]
+        self.assertEqual([stint.lineup for stint in home], [(0, 1, 2, 3, 4), (1, 2, 3, 4, 5)])
+        self.assertEqual([(stint.start, stint.end) for stint in home], [(0, 20), (20, 40)])
+        self.assertEqual([stint.plus_minus() for stint in home], [3, 0])
+
+    def test_sub_after_the_jump_ball_starts_the_game(self):
+        stints = play_with_stints(make_report().replace(JUMP_BALL, JUMP_BALL + SUB_AT_20.replace("0020", "0000")))
+
+        home = [stint for stint in stints.stints if stint.side == 0]
+        self.assertEqual([(stint.lineup, stint.start, stint.end) for stint in home], [((1, 2, 3, 4, 5), 0, 40)])
+
+    def test_subs_at_one_clock_leave_no_empty_stint(self):
+        # Then player 7 in for player 2, at the same clock
+        report = make_report().replace(THREE_POINTER, THREE_POINTER + SUB_AT_20 + "09510007200200000")
+        stints = play_with_stints(report)
+
+        home = [stint for stint in stints.stints if stint.side == 0]
+        self.assertEqual([(stint.lineup, stint.start, stint.end) for stint in home], [((0, 1, 2, 3, 4), 0, 20), ((1, 2, 3, 4, 6), 20, 40)])
+
+    def test_sub_straight_back_in_keeps_the_stint(self):
+        report = make_report().replace(THREE_POINTER, THREE_POINTER + SUB_AT_20 + "09510001600200000")
+        stints = play_with_stints(report)
+
+        home = [stint for stint in stints.stints if stint.side == 0]
+        self.assertEqual([(stint.lineup, stint.start, stint.end) for stint in home], [((0, 1, 2, 3, 4), 0, 40)])
+
+    def test_table_sums_points_and_possessions_per_lineup(self):
+        stints = play_with_stints(make_report())
+
+        home, away = stints.by_lineup()
+
+        self.assertEqual(home[(0, 1, 2, 3, 4)], [1, 40, 3, 0, 2, 1])
+        self.assertEqual(away[(0, 1, 2, 3, 4)], [1, 40, 0, 3, 1, 2])
+        self.assertEqual([len(possessions) for possessions in stints.tracker.possessions], [2, 1])
+
+    def test_box_score_possessions_are_counted_once(self):
+        possessions = Possessions()
+        game = play_report(make_report(), [possessions, LineupStints()], starters=True)
+
+        home = game.teams[0].stats.full.team_stats()
+
+        self.assertEqual(home["possessions"], possessions.table.count(0))
+
+    def test_free_throws_count_in_the_possession_table(self):
+        report = make_report().replace(DEF_REBOUND, DEF_REBOUND + FREE_THROWS)
+        possessions = Possessions()
+        play_report(report, [possessions], starters=True)
+
+        stints = play_with_stints(report)
+
+        self.assertEqual(stints.table.to_json(), possessions.table.to_json())
+        self.assertEqual(stints.table.scored(1), 1)
+
+    def test_multi_match_merge_keys_lineups_by_player(self):
+        stints = play_with_stints(make_report())
+        rows = stints.to_json()[0]
+        # The same five players sit in different roster slots in the second match
+        moved = [dict(row, lineup=[slot + 1 for slot in row["lineup"]]) for row in rows]
+        names = [{"name": f"Player{index}"} for index in range(7)]
+        lineup_map = {}
+
+        web_tool.add_lineup_stints(lineup_map, rows, web_tool.canonical_player_names(names[:6], [], "1"))
+        web_tool.add_lineup_stints(
+            lineup_map, moved, web_tool.canonical_player_names([{"name": ""}] + names[:6], [], "2")
+        )
+        lineups = web_tool.finalize_lineups(lineup_map)
+
+        self.assertEqual(len(lineups), 1)
+        self.assertEqual(lineups[0]["gp"], 2)
+        self.assertEqual(lineups[0]["pm"], 6)
+        self.assertEqual(lineups[0]["ortg"], 150.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from pack_store import PACK_DIR, SEGMENT, PackStore
+from resource_cache import ResourceCache
+from tests.helpers import MATCHES_DIR
+
+
+class PackStoreTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.store = PackStore(self.directory / PACK_DIR)
+
+    def test_entries_round_trip_compressed(self):
+        text = "<bbapi>" + "<match id='1' />" * 200 + "</bbapi>"
+
+        size = self.store.write("schedule_1_73.xml", text)
+
+        self.assertEqual(self.store.read("schedule_1_73.xml")[0], text)
+        self.assertLess(size, len(text) // 10)
+        self.assertIsNone(self.store.read("schedule_2_73.xml"))
+
+    def test_rewrites_and_deletes_shadow_older_records(self):
+        self.store.write("player_1.xml", "old")
+        self.store.write("player_1.xml", "new")
+        self.store.write("player_2.xml", "gone")
+        self.store.delete("player_2.xml")
+
+        reopened = PackStore(self.directory / PACK_DIR)
+
+        self.assertEqual(reopened.read("player_1.xml")[0], "new")
+        self.assertIsNone(reopened.read("player_2.xml"))
+        self.assertEqual(set(reopened.scan()), {"player_1.xml"})
+
+    def test_appends_of_another_store_are_picked_up(self):
+        other = PackStore(self.directory / PACK_DIR, codec="lzma")
+        self.store.scan()
+
+        other.write("report_5.xml", "<BBData />")
+
+        self.assertEqual(self.store.read("report_5.xml")[0], "<BBData />")
+
+    def test_torn_tail_record_is_ignored(self):
+        self.store.write("report_1.xml", "complete")
+        with open(self.directory / PACK_DIR / SEGMENT, "ab") as f:
+            f.write(b"BBPK\x01")
+
+        reopened = PackStore(self.directory / PACK_DIR)
+
+        self.assertEqual(set(reopened.scan()), {"report_1.xml"})
+
+    def test_torn_tail_record_is_cut_before_the_next_append(self):
+        self.store.write("report_1.xml", "complete")
+        with open(self.directory / PACK_DIR / SEGMENT, "ab") as f:
+            f.write(b"BBPK\x01\x00\x00\x0c")
+
+        PackStore(self.directory / PACK_DIR).write("report_2.xml", "after the crash")
+        reopened = PackStore(self.directory / PACK_DIR)
+
+        self.assertEqual(reopened.read("report_1.xml")[0], "complete")
+        self.assertEqual(reopened.read("report_2.xml")[0], "after the crash")
+
+    def test_dead_records_are_compacted_away(self):
+        store = PackStore(self.directory / "small", compact_min_bytes=100)
+        for version in range(50):
+            store.write("standings_1_73.xml", f"version {version}")
+            store.write(f"boxscore_{version}.xml", "<bbapi />")
+            store.delete(f"boxscore_{version}.xml")
+
+        stats = store.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertLessEqual(stats["segment_bytes"], 2 * stats["live_bytes"] + 100 + 128)
+        self.assertEqual(PackStore(self.directory / "small").read("standings_1_73.xml")[0], "version 49")
+
+    def test_evicting_cache_keeps_the_pack_bounded(self):
+        store = PackStore(self.directory / "bounded", compact_min_bytes=1000)
+        cache = ResourceCache(self.directory, max_bytes=2000, backend=store)
+        for key in range(200):
+            cache.put("report", key, f"<BBData>{key}</BBData>" * 20)
+
+        stats = store.stats()
+        self.assertLess(stats["entries"], 200)
+        # Dead records never outgrow the live ones by more than the minimum
+        self.assertLessEqual(stats["segment_bytes"], 2 * stats["live_bytes"] + 1000 + 128)
+
+    def test_corrupt_entries_are_cache_misses(self):
+        cache = ResourceCache(self.directory, backend=self.store)
+        cache.put("boxscore", 1, "<bbapi />")
+        entry = self.store.index["boxscore_1.xml"]
+        with open(self.directory / PACK_DIR / SEGMENT, "r+b") as f:
+            f.seek(entry.offset)
+            f.write(b"\x00" * entry.length)
+
+        self.assertEqual(cache.fetch("boxscore", 1, lambda: "<bbapi refetched='1' />"), "<bbapi refetched='1' />")
+        self.assertEqual(cache.counters["boxscore"]["errors"], 1)
+        self.assertEqual(cache.peek("boxscore", 1), "<bbapi refetched='1' />")
+
+    def test_compaction_keeps_live_entries_only(self):
+        for version in range(5):
+            self.store.write("standings_1_73.xml", f"version {version}")
+        self.store.write("boxscore_9.xml", "<bbapi />")
+        mtime = self.store.read("boxscore_9.xml")[1]
+        reader = PackStore(self.directory / PACK_DIR)
+        reader.scan()
+
+        before, after = self.store.compact()
+
+        self.assertLess(after, before)
+        self.assertEqual(reader.read("standings_1_73.xml")[0], "version 4")
+        self.assertEqual(reader.read("boxscore_9.xml"), ("<bbapi />", mtime))
+
+    def test_import_loose_files_into_a_cache(self):
+        loose = sorted(MATCHES_DIR.glob("standings_*.xml"))[:3]
+        for path in loose:
+            (self.directory / path.name).write_bytes(path.read_bytes())
+
+        self.assertEqual(self.store.import_loose(self.directory, delete=True), 3)
+        self.assertEqual(list(self.directory.glob("*.xml")), [])
+
+        cache = ResourceCache(self.directory, backend=self.store)
+        key = loose[0].stem.removeprefix("standings_")
+        self.assertIn(key, cache.keys("standings"))
+        self.assertEqual(cache.peek("standings", key), loose[0].read_text(encoding="utf-8"))
+        self.assertEqual(self.store.import_loose(self.directory), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from game import Game, PossessionOutcome, Possessions
+from tests.helpers import make_report, play_report
+
+DEF_REBOUND = "19318011000260032"
+# Home three pointer at 30, four seconds after the defensive rebound
+FAST_BREAK_THREE = "01004031700300010"
+
+
+def play_possessions(report: str) -> tuple[Game, Possessions]:
+    possessions = Possessions()
+    return play_report(report, [possessions]), possessions
+
+
+class PossessionTableTests(unittest.TestCase):
+    def test_table_rows_follow_the_ball(self):
+        _, possessions = play_possessions(make_report())
+
+        table = possessions.table.to_json()
+
+        self.assertEqual(table["team"], [0, 1, 0])
+        self.assertEqual(table["start"], [0, 2, 4])
+        self.assertEqual(table["end"], [1, 3, 4])
+        self.assertEqual(table["start_clock"], [0, 12, 26])
+        self.assertEqual(table["end_clock"], [12, 26, 40])
+        self.assertEqual(
+            table["outcome"],
+            [PossessionOutcome.SCORED, PossessionOutcome.MISSED, PossessionOutcome.TURNOVER],
+        )
+        self.assertEqual(table["points"], [3, 0, 0])
+        self.assertEqual([len(shotclocks) for shotclocks in possessions.possessions], [2, 1])
+
+    def test_team_stats_are_filled_from_the_table(self):
+        game, possessions = play_possessions(make_report())
+
+        home = game.teams[0].stats.full.team_stats()
+
+        self.assertEqual(home["possessions"], 2)
+        self.assertEqual(home["time_of_possession"], 26)
+        self.assertEqual(home["fastbreak_points"], 0)
+        self.assertEqual(possessions.table.points_per_possession(0), 1.5)
+        self.assertEqual(possessions.table.pace(), 108.0)
+
+    def test_transition_score_counts_as_fast_break(self):
+        game, possessions = play_possessions(
+            make_report().replace(DEF_REBOUND, DEF_REBOUND + FAST_BREAK_THREE)
+        )
+
+        self.assertEqual(possessions.table.to_json()["points"], [3, 0, 3, 0])
+        self.assertEqual(game.teams[0].stats.full.team_stats()["fastbreak_points"], 3)
+
+    def test_periods_without_possessions_count_zero(self):
+        game, _ = play_possessions(make_report())
+        # A period in which the team never had the ball
+        game.teams[0].push_stat_sheet()
+
+        stats = game.teams[0].stats.team_json()
+
+        self.assertEqual(stats["q2"]["possessions"], 0)
+        self.assertEqual(stats["q2"]["fastbreak_points"], 0)
+        self.assertEqual(stats["total"]["possessions"], 2)
+
+    def test_fields_stay_empty_without_the_extension(self):
+        game = play_report()
+
+        self.assertIsNone(game.teams[0].stats.full.team_stats()["possessions"])
+        self.assertIsNone(game.teams[0].stats.team_json()["q1"]["time_of_possession"])
+
+
+if __name__ == "__main__":
+    unittest.main()
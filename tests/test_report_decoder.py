@@ -0,0 +1,110 @@
+import json
+import unittest
+import xml.etree.ElementTree as XML
+from pathlib import Path
+
+from bench_convert import BUNDLED_MATCHES, columns_from_saved_game
+from event import EVENT_CONVERTERS, ReportColumns, ShotEvent, convert
+from event_types import ShotType
+from main import ViewmatchTarget, decode_report, iter_text_chunks, parse_report, parse_xml_stream
+from tests.helpers import make_document, make_report, make_teams
+
+
+class ReportDecoderTests(unittest.TestCase):
+    def test_decode_matches_bbevent_parser(self):
+        report = make_report()
+        ht, at = make_teams()
+        expected = parse_report(report, at, ht)
+        ht, at = make_teams()
+        columns = decode_report(report, at, ht)
+
+        self.assertIsInstance(columns, ReportColumns)
+        self.assertEqual(len(columns), len(expected))
+        for index, event in enumerate(expected):
+            self.assertEqual(repr(columns[index]), repr(event))
+
+    def test_shots_are_followed_by_result_events(self):
+        ht, at = make_teams()
+        columns = decode_report(make_report(), at, ht)
+
+        self.assertEqual(list(columns.type), [933, 100, 0, 201, 0, 931, 807, 962])
+        self.assertEqual(columns.data[2], "00040000")
+        self.assertEqual(columns.realclock[4], columns.realclock[3] + 2)
+        self.assertEqual(ht.active[0].id, 10000000)
+        self.assertEqual(at.active[4].id, 10000016)
+
+    def test_convert_accepts_columns_and_event_lists(self):
+        ht, at = make_teams()
+        columns = decode_report(make_report(), at, ht)
+        for index in range(len(columns)):
+            columns.player1obj[index] = ht.players[0]
+
+        from_columns = convert(columns)
+        from_events = convert(columns.to_events())
+
+        self.assertEqual(
+            [event.to_json() for event in from_columns],
+            [event.to_json() for event in from_events],
+        )
+        self.assertIsInstance(from_columns[1], ShotEvent)
+
+
+class ConvertDispatchTests(unittest.TestCase):
+    def test_every_shot_type_has_a_converter(self):
+        for shot_type in ShotType:
+            self.assertIn(int(shot_type), EVENT_CONVERTERS)
+
+    def test_bundled_matches_round_trip_event_kinds(self):
+        root = Path(__file__).resolve().parents[1]
+        for name in BUNDLED_MATCHES:
+            with open(root / name, encoding="utf-8") as f:
+                saved = json.load(f)
+
+            converted = convert(columns_from_saved_game(saved))
+
+            self.assertEqual(
+                [event.to_json()["event_type"] for event in converted],
+                [event["event_type"] for event in saved["events"]],
+            )
+
+
+class StreamingViewmatchTests(unittest.TestCase):
+    def test_streamed_chunks_yield_teams_players_and_report(self):
+        events, ht, at = parse_xml_stream(iter_text_chunks(make_document(), 7))
+
+        self.assertEqual((ht.id, ht.name, ht.short), (11, "Home Five", "HF"))
+        self.assertEqual((at.id, at.name, at.short), (22, "Away Five", "AF"))
+        self.assertEqual(len(ht.players), 12)
+        self.assertEqual(ht.players[3].name, "Home Player3")
+        self.assertEqual(len(events), 8)
+
+    def test_report_events_decode_while_the_document_streams(self):
+        document = make_document()
+        target = ViewmatchTarget()
+        parser = XML.XMLParser(target=target)
+
+        parser.feed(document[: document.index("</ReportString>")])
+
+        self.assertEqual(list(target.decoder.columns.type), [933, 100, 0, 201, 0, 931, 807, 962])
+        parser.feed(document[document.index("</ReportString>") :])
+        ht, at = make_teams()
+        events = parser.close()["ReportString"].finish(at, ht)
+        ht, at = make_teams()
+        self.assertEqual(list(events.data), list(decode_report(make_report(), at, ht).data))
+
+    def test_report_string_container_wins_inside_bbapi_envelope(self):
+        payload = (
+            '<bbapi version="1"><match><homeTeam id="1"><teamName>x</teamName></homeTeam>'
+            + make_document().replace("BBData", "payload")
+            + "</match></bbapi>"
+        )
+
+        events, ht, at = parse_xml_stream(iter_text_chunks(payload, 64))
+
+        self.assertEqual(ht.name, "Home Five")
+        self.assertEqual(at.players[0].name, "Away Player0")
+        self.assertEqual(len(events), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from resource_cache import HOUR, ResourceCache
+
+
+def fail():
+    raise ConnectionError("offline")
+
+
+class ResourceCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.cache = ResourceCache(self.directory)
+
+    def age(self, kind: str, key, secs: float) -> None:
+        path = self.directory / self.cache.name(kind, key)
+        then = time.time() - secs
+        os.utime(path, (then, then))
+
+    def test_documents_are_loaded_once_and_counted(self):
+        loads = []
+
+        def load():
+            loads.append(1)
+            return "<bbapi />"
+
+        for _ in range(3):
+            self.assertEqual(self.cache.fetch("boxscore", 1, load), "<bbapi />")
+
+        self.assertEqual(len(loads), 1)
+        self.assertEqual((self.directory / "boxscore_1.xml").read_text(encoding="utf-8"), "<bbapi />")
+        counters = self.cache.stats()["kinds"]["boxscore"]
+        self.assertEqual((counters["hits"], counters["misses"], counters["writes"]), (2, 1, 1))
+
+    def test_ttl_kinds_expire_and_immutable_kinds_do_not(self):
+        self.cache.put("schedule", "5_73", "old")
+        self.cache.put("boxscore", 1, "final")
+        self.age("schedule", "5_73", 7 * HOUR)
+        self.age("boxscore", 1, 1000 * HOUR)
+
+        self.assertEqual(self.cache.fetch("schedule", "5_73", lambda: "new"), "new")
+        self.assertEqual(self.cache.fetch("boxscore", 1, lambda: "refetched"), "final")
+        self.assertEqual(self.cache.counters["schedule"]["expired"], 1)
+
+    def test_expired_documents_are_served_when_the_refetch_fails(self):
+        self.cache.put("standings", "1_73", "stale")
+        self.age("standings", "1_73", 7 * HOUR)
+
+        self.assertEqual(self.cache.fetch("standings", "1_73", fail), "stale")
+        self.assertEqual(self.cache.counters["standings"]["stale"], 1)
+        with self.assertRaises(ConnectionError):
+            self.cache.fetch("standings", "2_73", fail)
+
+    def test_refresh_skips_a_fresh_copy(self):
+        self.cache.put("player", 9, "before")
+
+        self.assertEqual(self.cache.fetch("player", 9, lambda: "after", refresh=True), "after")
+
+    def test_rejected_documents_are_not_cached(self):
+        def validate(text):
+            if "<error" in text:
+                raise ValueError("error page")
+
+        self.cache.put("schedule", "5_73", "<bbapi />")
+        self.age("schedule", "5_73", 7 * HOUR)
+
+        error = '<bbapi><error message="NotAuthorized" /></bbapi>'
+        self.assertEqual(self.cache.fetch("schedule", "5_73", lambda: error, validate=validate), "<bbapi />")
+        with self.assertRaises(ValueError):
+            self.cache.fetch("boxscore", 1, lambda: error, validate=validate)
+        self.assertIsNone(self.cache.peek("boxscore", 1))
+        self.assertEqual(self.cache.counters["boxscore"]["rejected"], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for key in (1, 2, 3):
+            self.cache.put("report", key, "x" * 40)
+            self.age("report", key, 10 - key)
+        cache = ResourceCache(self.directory, max_bytes=100)
+        cache.get("report", 1)
+
+        cache.put("report", 4, "x" * 40)
+
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ["report_1.xml", "report_4.xml"])
+        self.assertEqual(cache.counters["report"]["evictions"], 2)
+        self.assertEqual(cache.stats()["bytes"], 80)
+
+    def test_write_failures_do_not_fail_the_fetch(self):
+        cache = ResourceCache(self.directory / "file.txt" / "cache")
+        (self.directory / "file.txt").write_text("", encoding="utf-8")
+
+        self.assertEqual(cache.fetch("report", 1, lambda: "text"), "text")
+        self.assertEqual(cache.counters["report"]["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
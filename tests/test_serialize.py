@@ -0,0 +1,57 @@
+import io
+import json
+import unittest
+from pathlib import Path
+
+from serialize import FORMAT_VERSION, compact, expand, read_game, write_game
+from tests.helpers import play_report
+
+BUNDLED_GAME = Path(__file__).resolve().parents[1] / "123786926.json"
+
+
+class SerializeTests(unittest.TestCase):
+    def test_streamed_formats_read_back_as_the_document(self):
+        game = play_report()
+        document = game.to_json()
+
+        for compact_format in (False, True):
+            out = io.StringIO()
+            write_game(game, out, compact_format=compact_format)
+            out.seek(0)
+            self.assertEqual(read_game(out), document)
+
+    def test_compact_events_are_arrays_with_shared_keys(self):
+        game = play_report()
+        out = io.StringIO()
+        write_game(game, out, compact_format=True)
+
+        data = json.loads(out.getvalue())
+
+        self.assertEqual(data["v"], FORMAT_VERSION)
+        shot = data["events"][1]
+        self.assertEqual(shot[0], "shot")
+        self.assertEqual(len(shot), len(data["k"]["shot"]) + 1)
+        self.assertIsInstance(data["teamHome"]["players"][0], list)
+
+    def test_bundled_game_round_trips_and_shrinks(self):
+        document = json.loads(BUNDLED_GAME.read_text(encoding="utf-8"))
+
+        packed = json.dumps(compact(document), separators=(",", ":"))
+
+        self.assertEqual(expand(json.loads(packed)), document)
+        self.assertLess(len(packed), len(json.dumps(document)) // 2)
+
+    def test_extra_report_keys_are_kept(self):
+        document = play_report().to_json()
+        document["matchid"] = "1"
+        document["lineup_stints"] = [[], []]
+
+        self.assertEqual(expand(compact(document)), document)
+
+    def test_unknown_versions_are_rejected(self):
+        with self.assertRaises(ValueError):
+            expand({"v": FORMAT_VERSION + 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
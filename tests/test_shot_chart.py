@@ -0,0 +1,182 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+import web_tool
+from shot_chart import COURT_SIZE, ShotChart, ShotGrid, ShotGridCache, court_image
+from team import Team
+from tests.helpers import ReplayApi, make_game_report
+from warehouse import Warehouse, team_key
+
+
+def shot(x, y, result, team=0):
+    return {
+        "event_type": "shot",
+        "attacking_team": team,
+        "shot_result": result,
+        "shot_pos_x": x,
+        "shot_pos_y": y,
+    }
+
+
+class ShotChartTests(unittest.TestCase):
+    def test_teams_do_not_allocate_images(self):
+        team = Team()
+        team.shot_chart.add_made(100, 50)
+        team.shot_chart.add_miss(120, 60)
+
+        self.assertIsNone(team.shot_chart._img)
+        self.assertEqual(list(team.shot_chart.shots), [100, 50, 1, 120, 60, 0])
+
+    def test_court_is_decoded_once_and_left_untouched(self):
+        chart = ShotChart()
+        chart.add_made(100, 50)
+        before = court_image().tobytes()
+
+        img = chart.img
+
+        self.assertIs(court_image(), court_image())
+        self.assertIsNot(img, court_image())
+        self.assertEqual(court_image().tobytes(), before)
+        self.assertNotEqual(img.tobytes(), before)
+
+    def test_shots_added_after_rendering_are_drawn(self):
+        chart = ShotChart()
+        chart.add_made(100, 50)
+        first = chart.img.tobytes()
+        chart.add_miss(200, 80)
+
+        self.assertIs(chart.img, chart.img)
+        self.assertNotEqual(chart.img.tobytes(), first)
+
+    def test_save_writes_the_rendered_chart(self):
+        chart = ShotChart()
+        chart.add_made(100, 50)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "chart.png"
+            chart.save(path)
+            with Image.open(path) as saved:
+                self.assertEqual(saved.size, court_image().size)
+
+
+class ShotGridTests(unittest.TestCase):
+    def make_document(self):
+        return {
+            "events": [
+                shot(340, 96, "1"),
+                shot(342, 97, "0"),
+                shot(343, 98, "4"),
+                shot(28, 96, "5", team=1),
+                {"event_type": "rebound", "attacking_team": 0},
+            ]
+        }
+
+    def make_shots(self):
+        """The home shots of make_document, as ShotGrid.add_shots takes them."""
+        return [(340, 96, "1"), (342, 97, "0"), (343, 98, "4")]
+
+    def test_bins_count_attempts_and_makes(self):
+        grid = ShotGrid()
+
+        grid.add_game("1", self.make_document(), 0)
+
+        self.assertEqual(sum(grid.attempts), 2)
+        self.assertEqual(grid.fg_pct(340, 96), 0.5)
+
+    def test_away_shots_are_mirrored_onto_the_same_basket(self):
+        grid = ShotGrid()
+
+        grid.add_game("1", self.make_document(), 1)
+
+        self.assertEqual(grid.fg_pct(COURT_SIZE[0] - 28, 96), 1.0)
+
+    def test_shots_bin_like_their_document(self):
+        grid = ShotGrid()
+        other = ShotGrid()
+
+        grid.add_game("1", self.make_document(), 0)
+        other.add_shots("1", self.make_shots(), 0)
+
+        self.assertEqual((grid.attempts, grid.made), (other.attempts, other.made))
+
+    def test_matches_are_binned_once(self):
+        grid = ShotGrid()
+
+        self.assertTrue(grid.add_game("1", self.make_document(), 0))
+        self.assertFalse(grid.add_game("1", self.make_document(), 0))
+        self.assertEqual(sum(grid.attempts), 2)
+
+    def test_merge_and_render(self):
+        grid = ShotGrid()
+        grid.add_game("1", self.make_document(), 0)
+        other = ShotGrid()
+        other.add_game("2", self.make_document(), 0)
+
+        grid.merge(other)
+        img = grid.render()
+
+        self.assertEqual(grid.matchids, {"1", "2"})
+        self.assertEqual(sum(grid.made), 2)
+        self.assertEqual(img.size, COURT_SIZE)
+        self.assertNotEqual(img.getpixel((340, 96)), court_image().convert("RGBA").getpixel((340, 96)))
+
+    def test_cache_only_adds_new_matches_and_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ShotGridCache(Path(tmp))
+            cache.update("team", "73", [("1", self.make_shots(), 0)])
+            cache.update("team", "73", [("1", self.make_shots(), 0), ("2", self.make_shots(), 0)])
+
+            reloaded = ShotGridCache(Path(tmp)).get("team", "73")
+
+        self.assertEqual(reloaded.matchids, {"1", "2"})
+        self.assertEqual(sum(reloaded.attempts), 4)
+
+    def test_concurrent_updates_keep_every_match(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ShotGridCache(Path(tmp))
+            threads = [
+                threading.Thread(target=cache.update, args=("team", "73", [(str(matchid), self.make_shots(), 0)]))
+                for matchid in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            reloaded = ShotGridCache(Path(tmp)).get("team", "73")
+            files = [path.name for path in Path(tmp).iterdir()]
+
+        self.assertEqual(reloaded.matchids, {str(matchid) for matchid in range(8)})
+        self.assertEqual(files, [cache.path("team", "73").name])
+
+    def test_report_heatmap_holds_only_its_matches(self):
+        report = make_game_report()
+        with tempfile.TemporaryDirectory() as tmp:
+            warehouse = Warehouse(Path(tmp) / "warehouse.sqlite3")
+            self.addCleanup(warehouse.close)
+            cache = ShotGridCache(Path(tmp) / "shot_grids")
+            key = team_key(report["teamHome"]["name"])
+            # An earlier report of the season
+            cache.update(key, "73", [("99", self.make_shots(), 0)])
+            with mock.patch.object(web_tool, "get_warehouse", return_value=warehouse), mock.patch.object(
+                web_tool, "SHOT_GRID_CACHE", cache
+            ), mock.patch.object(web_tool, "load_game_report", return_value=report), mock.patch.object(
+                web_tool, "prefetch_match_files"
+            ), mock.patch.object(web_tool, "BBApi", return_value=ReplayApi()):
+                status, payload = web_tool.aggregate_multi_match_report(
+                    ["7"], "", "", key, multi_source="team", team_schedule_season="73"
+                )
+
+        self.assertEqual(status, "ok")
+        heatmap = payload["shot_heatmap"]
+        self.assertEqual(heatmap["matches"], 1)
+        self.assertEqual(heatmap["season"]["matches"], 2)
+        self.assertEqual(heatmap["season"]["attempts"], heatmap["attempts"] + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
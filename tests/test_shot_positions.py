@@ -0,0 +1,29 @@
+import unittest
+
+from event import create_shot, shot_position
+
+
+class ShotPositionTests(unittest.TestCase):
+    # Reference positions from the original trig/if-ladder implementation.
+    EXPECTED = {
+        (0, 100, 51805514, 17): (292, 18),
+        (1, 203, 51805514, 1200): (9, 143),
+        (0, 411, 12345678, 2881): (338, 49),
+        (1, 105, 99, 3): (185, 72),
+    }
+
+    def test_create_shot_matches_reference_positions(self):
+        for (team, evtype, pid, gameclock), expected in self.EXPECTED.items():
+            shot = create_shot(team, evtype, pid, "", gameclock)
+            self.assertEqual((shot.x, shot.y), expected)
+
+    def test_repeated_shots_are_served_from_cache(self):
+        shot_position.cache_clear()
+        create_shot(0, 201, 42, "", 100)
+        create_shot(0, 201, 42, "", 100)
+
+        self.assertEqual(shot_position.cache_info().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from stats import Statistic, Stats
+
+
+class StatsBufferTests(unittest.TestCase):
+    def make_stats(self) -> Stats:
+        stats = Stats()
+        stats.new_qtr_sheet()
+        stats.add(Statistic.Points, 2)
+        stats.add(Statistic.FieldGoalsMade, 1)
+        stats.add(Statistic.FieldGoalsAtt, 1)
+        stats.new_qtr_sheet()
+        stats.add(Statistic.Points, 3)
+        stats.add(Statistic.OffRebounds, 1)
+        stats.add(Statistic.DefRebounds, 2)
+        stats.add(Statistic.SecsPG, 90)
+        return stats
+
+    def test_totals_are_column_sums_of_the_periods(self):
+        stats = self.make_stats()
+
+        self.assertEqual(stats.qtr[0].sheet[Statistic.Points], 2)
+        self.assertEqual(stats.qtr[1].sheet[Statistic.Points], 3)
+        self.assertEqual(stats.full.sheet[Statistic.Points], 5)
+        self.assertEqual(stats.totals()[Statistic.FieldGoalsMade], 1)
+
+    def test_writing_totals_keeps_quarters(self):
+        stats = Stats()
+        stats.new_qtr_sheet()
+        stats.qtr[0].sheet[Statistic.Points] = 20
+
+        stats.full.sheet[Statistic.Points] = 75
+        stats.full.sheet[Statistic.Assists] = 12
+
+        self.assertEqual(stats.qtr[0].sheet[Statistic.Points], 20)
+        self.assertEqual(stats.full.sheet[Statistic.Points], 75)
+        self.assertEqual(stats.full.team_stats()["ast"], 12)
+
+    def test_player_json_has_quarters_and_total(self):
+        stats = self.make_stats()
+
+        exported = stats.player_json()
+
+        self.assertEqual(list(exported), ["q1", "q2", "total"])
+        self.assertEqual(exported["q2"]["tr"], 3)
+        self.assertEqual(exported["total"]["pts"], 5)
+        self.assertEqual(exported["total"]["mins"], 2)
+        self.assertEqual(
+            list(exported["total"])[:7],
+            ["secs_pg", "secs_sg", "secs_sf", "secs_pf", "secs_c", "mins", "pts"],
+        )
+
+    def test_team_json_matches_sheet_exporters(self):
+        stats = self.make_stats()
+
+        exported = stats.team_json()
+
+        self.assertEqual(exported["q1"], stats.qtr[0].team_stats())
+        self.assertEqual(exported["total"]["pts"], 5)
+        self.assertIsNone(exported["total"]["timeouts60"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from game import KEYFRAME_STATS, BoxScoreTimeline, Game
+from tests.helpers import make_game_report, make_report, play_report
+
+END_OF_GAME = "09629000000000100"
+# The game ends at clock 48, eight seconds after the steal
+END_OF_GAME_AT_48 = "09629000000480100"
+
+
+def play_with_timeline(timeline: BoxScoreTimeline, report: str | None = None) -> Game:
+    return play_report(report, extensions=[timeline], starters=True)
+
+
+class BoxScoreTimelineTests(unittest.TestCase):
+    def test_checkpoints_on_scoring_and_breaks(self):
+        timeline = BoxScoreTimeline()
+        play_with_timeline(timeline)
+
+        # three pointer at 12, end of game after the steal at 40
+        self.assertEqual(timeline.gameclocks, [12, 40])
+        self.assertIsNone(timeline.at(11))
+        self.assertEqual(timeline.at(12).score(), (3, 0))
+        self.assertIs(timeline.at(39), timeline.at(12))
+
+    def test_every_event_checkpoints_are_exact(self):
+        timeline = BoxScoreTimeline(every=1)
+        game = play_with_timeline(timeline)
+
+        self.assertEqual(len(timeline.checkpoints), len(game.baseevents))
+        box = timeline.box_score(30)
+        self.assertEqual(box["score"], [3, 0])
+        self.assertEqual(box["teams"][0]["dr"], 1)
+        self.assertEqual(box["teams"][0]["to"], 0)
+        self.assertEqual(timeline.box_score(40)["teams"][1]["stl"], 1)
+
+    def test_box_score_needs_every_event(self):
+        timeline = BoxScoreTimeline()
+        play_with_timeline(timeline)
+
+        with self.assertRaises(ValueError):
+            timeline.box_score(30)
+
+    def test_final_box_score_matches_game_totals(self):
+        timeline = BoxScoreTimeline(every=1)
+        game = play_with_timeline(timeline)
+
+        box = timeline.box_score(100)
+
+        self.assertEqual(box["teams"][0], game.teams[0].stats.full.team_stats())
+        self.assertEqual(box["players"][1][2], game.teams[1].players[2].stats.full.player_stats())
+        self.assertEqual(box["active"], [[0, 1, 2, 3, 4], [0, 1, 2, 3, 4]])
+
+    def test_on_court_seconds_run_between_minutes_updates(self):
+        timeline = BoxScoreTimeline(every=1)
+        play_with_timeline(timeline, make_report().replace(END_OF_GAME, END_OF_GAME_AT_48))
+
+        box = timeline.box_score(30)
+
+        self.assertEqual(box["players"][0][0]["secs_pg"], 30)
+        self.assertEqual(box["players"][0][7]["secs_pg"], 0)
+        self.assertEqual(timeline.box_score(44)["players"][0][0]["secs_pg"], 44)
+        # no running time is added after the end of the game
+        self.assertEqual(timeline.box_score(100)["players"][0][0]["secs_pg"], 48)
+
+    def test_keyframes_are_compact_rows(self):
+        timeline = BoxScoreTimeline(every=3, on_changes=False)
+        game = play_with_timeline(timeline)
+
+        frames = timeline.keyframes()
+
+        self.assertEqual([frame["i"] for frame in frames], [3, 6])
+        self.assertEqual(len(frames[0]["p"][0]), len(game.teams[0].players))
+        self.assertEqual(len(frames[0]["p"][0][0]), len(KEYFRAME_STATS) + 1)
+        self.assertEqual(frames[0]["t"][0][-1], 3)
+        self.assertEqual(frames[0]["t"][1][-1], -3)
+
+    def test_only_animation_reports_carry_keyframes(self):
+        report = make_game_report(keyframe_every=3)
+
+        self.assertEqual([frame["i"] for frame in report["box_keyframes"]], [3, 6])
+        self.assertNotIn("box_keyframes", make_game_report())
+
+
+if __name__ == "__main__":
+    unittest.main()
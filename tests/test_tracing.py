@@ -0,0 +1,72 @@
+import contextlib
+import io
+import json
+import unittest
+
+from event import ReportColumns, convert
+from stats import Statistic
+from tests.helpers import play_report
+from tracing import JsonLinesSink, TraceLevel, Tracer, tracer
+
+
+class TracingTests(unittest.TestCase):
+    def test_disabled_tracer_prints_nothing(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            play_report()
+
+        self.assertEqual(out.getvalue(), "")
+
+    def test_capture_filters_by_level(self):
+        with tracer.capture(TraceLevel.EVENTS) as records:
+            play_report()
+
+        kinds = {record["kind"] for record in records}
+        self.assertIn("event", kinds)
+        self.assertNotIn("stat", kinds)
+        self.assertEqual({record["level"] for record in records}, {"EVENTS"})
+
+    def test_stats_level_includes_stat_records(self):
+        with tracer.capture(TraceLevel.STATS) as records:
+            play_report()
+
+        stats = [record for record in records if record["kind"] == "stat"]
+        self.assertTrue(stats)
+        self.assertEqual(tracer.level, TraceLevel.OFF)
+
+    def test_team_mismatches_are_traced_not_printed(self):
+        game, other = play_report(), play_report()
+        other.teams[0].stats.full.sheet[Statistic.Assists] += 1
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), tracer.capture(TraceLevel.DEBUG) as records:
+            self.assertNotEqual(game.teams[0], other.teams[0])
+
+        self.assertEqual(out.getvalue(), "")
+        (record,) = [record for record in records if record["kind"] == "team_stat_mismatch"]
+        self.assertEqual((record["value"], record["other"]), (record["other"] - 1, record["other"]))
+
+    def test_unknown_events_are_traced_not_printed(self):
+        columns = ReportColumns()
+        columns.append(0, 999, 0, 0, 0, 0, 10, 10, "")
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), tracer.capture(TraceLevel.DEBUG) as records:
+            self.assertEqual(convert(columns), [])
+
+        self.assertEqual(out.getvalue(), "")
+        self.assertEqual([record["type"] for record in records if record["kind"] == "unknown_event"], [999])
+
+    def test_json_lines_sink_writes_one_record_per_line(self):
+        stream = io.StringIO()
+        local = Tracer(TraceLevel.EVENTS, JsonLinesSink(stream))
+        local.emit(TraceLevel.EVENTS, "possession", team=1)
+        local.emit(TraceLevel.EVENTS, "possession", team=0)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), {"team": 1, "level": "EVENTS", "kind": "possession"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tests.helpers import make_boxscore, make_document
+from verify_corpus import cached_matchids, summarize, verify_corpus
+
+
+class VerifyCorpusTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = Path(self.tmp.name)
+        boxscore = make_boxscore()
+        for matchid in ("101", "102", "103"):
+            (self.cache / f"report_{matchid}.xml").write_text(make_document(), encoding="utf-8")
+        (self.cache / "boxscore_101.xml").write_text(boxscore, encoding="utf-8")
+        (self.cache / "boxscore_102.xml").write_text(
+            boxscore.replace("<ast>1</ast>", "<ast>2</ast>"), encoding="utf-8"
+        )
+
+    def test_only_matches_with_both_files_are_verified(self):
+        self.assertEqual(cached_matchids(self.cache), ["101", "102"])
+
+    def test_mismatches_are_counted_per_statistic(self):
+        records = list(verify_corpus(cached_matchids(self.cache), self.cache))
+        summary = summarize(records, 1.0)
+
+        self.assertEqual([record["ok"] for record in records], [True, False])
+        self.assertEqual(summary["mismatched_matches"], ["102"])
+        self.assertEqual(
+            summary["mismatches"],
+            {
+                "player.Assists": {"count": 1, "matches": 1},
+                "team.Assists": {"count": 1, "matches": 1},
+            },
+        )
+        self.assertEqual(summary["events"], 2 * records[0]["events"])
+        self.assertEqual(summary["events_per_sec"], summary["events"])
+
+    def test_unreadable_boxscores_are_reported(self):
+        (self.cache / "boxscore_103.xml").write_text("<bbapi>", encoding="utf-8")
+
+        summary = summarize(verify_corpus(["103"], self.cache), 1.0)
+
+        self.assertIn("ParseError", summary["errors"]["103"])
+
+
+if __name__ == "__main__":
+    unittest.main()
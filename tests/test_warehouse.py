@@ -0,0 +1,139 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import warehouse
+import web_tool
+from shot_chart import ShotGridCache
+from tests.helpers import ReplayApi, make_game_report
+from warehouse import Warehouse, team_key
+
+
+class WarehouseTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.warehouse = Warehouse(Path(tmp.name) / "warehouse.sqlite3")
+        self.addCleanup(self.warehouse.close)
+        self.report = make_game_report()
+        self.stored = {key: value for key, value in self.report.items() if key != "events"}
+        self.home = team_key(self.report["teamHome"]["name"])
+
+    def test_ingested_reports_read_back_unchanged(self):
+        self.warehouse.ingest(self.report, season=73)
+
+        self.assertTrue(self.warehouse.has("7"))
+        self.assertEqual(self.warehouse.games(["7", "8"]), {"7": self.stored})
+
+    def test_events_are_rows_in_report_order(self):
+        self.warehouse.ingest(self.report)
+
+        events = self.warehouse.events(["7", "8"])
+        self.assertEqual(list(events), ["7"])
+        expected = [{"match_id": 7, **warehouse.event_line(event)} for event in self.report["events"]]
+        self.assertEqual([dict(row) for row in events["7"]], expected)
+        (shot, _) = self.warehouse.events(["7"], ["shot"])["7"]
+        self.assertEqual((shot["code"], shot["result"], shot["team"], shot["player"]), ("100", "1", 0, 1))
+        self.assertIn("Scored.", shot["comment"])
+
+    def test_team_rows_are_queried_by_team_and_season(self):
+        self.warehouse.ingest(self.report, season=73)
+        self.warehouse.ingest(make_game_report("8"), season=74)
+
+        rows = self.warehouse.team_matches(self.home)
+        self.assertEqual([row["match_id"] for row in rows], [7, 8])
+        (row,) = self.warehouse.team_matches(self.home, "74")
+        total = self.report["teamHome"]["stats"]["total"]
+        self.assertEqual((row["side"], row["pts"], row["ast"]), (0, total["pts"], total["ast"]))
+        self.assertEqual(row["opp_pts"], self.report["teamAway"]["stats"]["total"]["pts"])
+
+        lines = self.warehouse.player_lines(self.home, 73)
+        self.assertEqual([line["name"] for line in lines], [player["name"] for player in self.report["teamHome"]["players"]])
+        self.assertEqual(sum(line["pts"] for line in lines), total["pts"])
+
+    def test_reingest_replaces_rows_and_keeps_the_season(self):
+        self.warehouse.ingest(self.report, season=73)
+        self.warehouse.ingest(self.report)
+
+        (row,) = self.warehouse.team_matches(self.home)
+        self.assertEqual(row["season"], 73)
+        self.assertEqual(len(self.warehouse.player_lines(self.home)), len(self.report["teamHome"]["players"]))
+
+    def test_reports_of_another_version_are_misses(self):
+        self.warehouse.ingest(self.report)
+
+        with mock.patch.object(warehouse, "REPORT_VERSION", warehouse.REPORT_VERSION + 1):
+            self.assertEqual(self.warehouse.games(["7"]), {})
+            self.assertFalse(self.warehouse.has("7"))
+            self.assertEqual(self.warehouse.events(["7"]), {})
+            self.warehouse.ingest(self.report)
+            self.assertEqual(self.warehouse.games(["7"]), {"7": self.stored})
+
+    def test_undecodable_reports_are_misses(self):
+        self.warehouse.ingest(self.report)
+        self.warehouse.ingest(make_game_report("8"))
+        with self.warehouse.connect() as conn:
+            conn.execute("UPDATE matches SET document = ? WHERE match_id = 7", (b"torn",))
+
+        self.assertEqual(list(self.warehouse.games(["7", "8"])), ["8"])
+
+    def aggregate(self, api, matchids=("7",), **kwargs):
+        """aggregate_multi_match_report of matchids for the home team, and
+        how many reports it had to load."""
+        reports = {matchid: make_game_report(matchid) for matchid in matchids}
+        shot_grids = ShotGridCache(self.warehouse.path.parent / "shot_grids")
+        with mock.patch.object(web_tool, "get_warehouse", return_value=self.warehouse), mock.patch.object(
+            web_tool, "SHOT_GRID_CACHE", shot_grids
+        ), mock.patch.object(
+            web_tool, "load_game_report", side_effect=lambda matchid, *args, **kwargs: reports[matchid]
+        ) as load, mock.patch.object(web_tool, "prefetch_match_files"), mock.patch.object(
+            web_tool, "BBApi", return_value=api
+        ):
+            return web_tool.aggregate_multi_match_report(list(matchids), "", "", self.home, **kwargs), load.call_count
+
+    def test_multi_match_report_reads_stored_games_after_login(self):
+        played, loads = self.aggregate(ReplayApi())
+        stored, reloads = self.aggregate(ReplayApi())
+
+        self.assertEqual(played[0], "ok")
+        self.assertEqual((loads, reloads), (1, 0))
+        self.assertEqual(stored, played)
+
+    def test_unstored_matches_aggregate_like_stored_ones(self):
+        stored, _ = self.aggregate(ReplayApi(), matchids=("7", "8"))
+        self.warehouse.close()
+        self.warehouse.path.unlink()
+
+        with mock.patch.object(self.warehouse, "ingest", side_effect=sqlite3.OperationalError):
+            unstored, loads = self.aggregate(ReplayApi(), matchids=("7", "8"))
+
+        self.assertEqual(loads, 2)
+        self.assertEqual(unstored, stored)
+        self.assertEqual(stored[1]["nba_dashboard"]["team_rows"][0]["team"]["poss"], 2)
+
+    def test_stored_games_need_a_valid_login(self):
+        self.warehouse.ingest(self.report)
+
+        (status, payload), loads = self.aggregate(ReplayApi(logged_in=False))
+
+        self.assertEqual(status, "error")
+        self.assertIn("login failed", payload["message"])
+        self.assertEqual(loads, 0)
+
+    def test_season_summary_covers_every_stored_match(self):
+        self.warehouse.ingest(make_game_report("8"), season=73)
+
+        (status, payload), _ = self.aggregate(ReplayApi(), multi_source="team", team_schedule_season="73")
+
+        self.assertEqual(status, "ok")
+        summary = payload["season_summary"]
+        total = self.report["teamHome"]["stats"]["total"]
+        self.assertEqual((summary["matches"], summary["wins"], summary["losses"]), (2, 2, 0))
+        self.assertEqual(summary["ppg"], total["pts"])
+        self.assertEqual(sum(row["gp"] for row in summary["players"]), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from types import SimpleNamespace
 from unittest.mock import patch
 
+import main
 import web_tool
 from bb_site import GameLogEntry, RosterPlayer
 
@@ -205,10 +206,10 @@ class U21ModeFlaskTests(unittest.TestCase):
         </bbapi>
         """
 
-        unwrapped = web_tool.pbp_payload_xml(payload)
+        fields = main.extract_viewmatch(main.iter_text_chunks(payload))
 
-        self.assertIn("<ReportString>abc</ReportString>", unwrapped)
-        self.assertNotIn("<bbapi", unwrapped)
+        self.assertEqual(fields["ReportString"].header, "abc")
+        self.assertEqual(fields["HomeTeam"], [("ID", "1"), ("Name", "Home")])
 
     def test_player_stat_rows_uses_points_assists_and_total_rebounds(self):
         class FakeFullStats:
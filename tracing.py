@@ -0,0 +1,100 @@
+"""Level-gated tracing for the parse/play hot path.
+
+Call sites guard every record with ``if tracer.level >= <level>:`` before any
+formatting happens, so a disabled tracer costs a single attribute load and
+integer compare per site. Enabled records are plain dicts handed to a sink:
+``print_sink`` renders them the way the old debug prints did, and
+``JsonLinesSink`` writes one JSON object per line for offline analysis.
+"""
+
+import json
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Callable, Iterator, TextIO
+
+
+class TraceLevel(IntEnum):
+    OFF = 0
+    # Game flow: event headers, shotclock and possession changes
+    EVENTS = 1
+    # Stat increments, minutes and substitutions
+    STATS = 2
+    # Raw report decoding and commentary resolution
+    DEBUG = 3
+
+
+TRACE_FORMATS = {
+    "event": "\n### {gameclock} {comments}",
+    "shotclock_set": "Set shotclock: {shotclock}",
+    "shotclock_left": "Remaining shotclock: {shotclock}",
+    "possession": "Next possession: {team}",
+    "possessions": "nPossessions: {away}:{home} (+1 {team})",
+    "stat": "{team},  {player},  {stat}: {value}",
+    "minutes": "MINUTES {team} - {player} +{secs}s = {total}",
+    "sub": "{sub_type} - OUT: {player_out}, IN: {player_in}",
+    "swap": "SWAP {team} - {player1} to {pos1} and {player2} to {pos2}",
+    "starter": "starter:  {index} {player}",
+    "unknown_event": "Unknown event {type}",
+    "raw_text": "\nRaw:\n\tprefix: {prefix}\n\tresult: {result}\n\tloc9: {evar1}\n\tvar: {variation}",
+    "raw_actors": "RAW2:\n\tloc3: {loc3}\n\tloc10: {loc10}\n\ttype: {type}\n\tprefix: {prefix}",
+    "comment": "{event}",
+    "player_minutes": "{player} {equal} {minutes} {other_minutes}",
+    "team_stat_mismatch": "Not eql: {stat} - {team}: {value} != {other}",
+    "player_stat_mismatch": "Not eql: {player} - {stat}: {value} != {other}",
+}
+
+
+def print_sink(record: dict[str, Any]) -> None:
+    fmt = TRACE_FORMATS.get(record["kind"])
+    if fmt is None:
+        print(record)
+    else:
+        print(fmt.format(**record))
+
+
+class JsonLinesSink:
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def __call__(self, record: dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, default=str, ensure_ascii=False))
+        self.stream.write("\n")
+
+
+class Tracer:
+    def __init__(
+        self,
+        level: int = TraceLevel.OFF,
+        sink: Callable[[dict[str, Any]], None] = print_sink,
+    ) -> None:
+        self.level = int(level)
+        self.sink = sink
+
+    def configure(
+        self,
+        level: int,
+        sink: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        # Stored as a plain int so the guard at call sites stays a cheap compare.
+        self.level = int(level)
+        if sink is not None:
+            self.sink = sink
+
+    def emit(self, level: int, kind: str, **fields: Any) -> None:
+        fields["level"] = TraceLevel(level).name
+        fields["kind"] = kind
+        self.sink(fields)
+
+    @contextmanager
+    def capture(self, level: int = TraceLevel.DEBUG) -> Iterator[list[dict[str, Any]]]:
+        """Collect records in a list for the duration of the block."""
+        records: list[dict[str, Any]] = []
+        old_level, old_sink = self.level, self.sink
+        self.configure(level, records.append)
+        try:
+            yield records
+        finally:
+            self.level, self.sink = old_level, old_sink
+
+
+tracer = Tracer()
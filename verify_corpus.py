@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Offline verification of the parser against cached box scores.
+
+Parses and plays every match under matches/ that has both a cached
+report_*.xml and boxscore_*.xml, in a process pool, and compares the played
+box score with the one BBAPI reported (the same statistics Team.__eq__ checks
+for --verify, plus player minutes). Prints the mismatches per statistic and
+the matches/sec and events/sec throughput.
+
+Exit code 1 if any match mismatches or fails to play, so parser performance
+work can be gated on stats staying identical.
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from tabulate import tabulate
+
+from bbapi import parse_boxscore
+from game import Game
+from main import CACHE_DIR, PLAY_ARGS, parse_xml
+from resource_cache import cache_for
+from stats import Statistic
+from team import Team
+
+VERIFIED_STATS = (
+    Statistic.Points,
+    Statistic.FieldGoalsMade,
+    Statistic.FieldGoalsAtt,
+    Statistic.ThreePointsMade,
+    Statistic.ThreePointsAtt,
+    Statistic.FreeThrowsMade,
+    Statistic.FreeThrowsAtt,
+    Statistic.OffRebounds,
+    Statistic.DefRebounds,
+    Statistic.Assists,
+    Statistic.Turnovers,
+    Statistic.Steals,
+    Statistic.Blocks,
+    Statistic.Fouls,
+)
+
+
+def cached_matchids(directory: Path = CACHE_DIR) -> list[str]:
+    """Match IDs with both a cached report and box score, sorted."""
+    cache = cache_for(directory)
+    reports = set(cache.keys("report")) & set(cache.keys("boxscore"))
+    return sorted(reports, key=lambda matchid: (len(matchid), matchid))
+
+
+def stat_mismatches(played: Team, expected: Team) -> list[str]:
+    """"team.<Stat>" / "player.<Stat>" keys of every statistic where played
+    differs from the BBAPI box score. Players are matched by name;
+    "player.Missing" counts box score players that never appear in played."""
+    mismatches = []
+    for stat in VERIFIED_STATS:
+        if played.stats.full.sheet[stat] != expected.stats.full.sheet[stat]:
+            mismatches.append(f"team.{stat.name}")
+
+    played_players = {player.name: player for player in played.players}
+    for expected_player in expected.players:
+        player = played_players.get(expected_player.name)
+        if player is None or player.id != expected_player.id:
+            mismatches.append("player.Missing")
+            continue
+        if player.stats.full.minutes() != expected_player.stats.full.minutes():
+            mismatches.append("player.Minutes")
+        for stat in VERIFIED_STATS:
+            if player.stats.full.sheet[stat] != expected_player.stats.full.sheet[stat]:
+                mismatches.append(f"player.{stat.name}")
+    return mismatches
+
+
+def verify_match(matchid: str, directory: Path = CACHE_DIR) -> dict[str, Any]:
+    """Play one cached match and compare it with its cached box score.
+
+    Failures are reported in the record instead of raised, like
+    main.play_match.
+    """
+    start = time.perf_counter()
+    record: dict[str, Any] = {"matchid": matchid, "ok": True, "events": 0, "mismatches": {}}
+    try:
+        cache = cache_for(directory)
+        text = cache.peek("report", matchid)
+        events, ht, at = parse_xml(text)
+        record["events"] = len(events)
+        game = Game(matchid, events, ht, at, PLAY_ARGS, [])
+        game.play()
+
+        away, home = parse_boxscore(cache.peek("boxscore", matchid))
+        mismatches = Counter(stat_mismatches(game.teams[0], home))
+        mismatches.update(stat_mismatches(game.teams[1], away))
+        record["mismatches"] = dict(mismatches)
+        record["ok"] = not mismatches
+    except Exception as e:
+        record["ok"] = False
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["secs"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _verify_match_args(item: tuple[str, Path]) -> dict[str, Any]:
+    return verify_match(*item)
+
+
+def verify_corpus(matchids: list[str], directory: Path = CACHE_DIR, jobs: int = 1) -> Iterator[dict[str, Any]]:
+    """Records of verify_match for every match, in input order."""
+    items = [(matchid, directory) for matchid in matchids]
+    if jobs <= 1:
+        yield from map(_verify_match_args, items)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(items) // (jobs * 4))
+        yield from executor.map(_verify_match_args, items, chunksize=chunksize)
+
+
+def summarize(records: Iterable[dict[str, Any]], wall_secs: float) -> dict[str, Any]:
+    matches = events = 0
+    mismatched: list[str] = []
+    errors: dict[str, str] = {}
+    by_stat: Counter = Counter()
+    matches_by_stat: Counter = Counter()
+    for record in records:
+        matches += 1
+        events += record["events"]
+        if "error" in record:
+            errors[record["matchid"]] = record["error"]
+        elif record["mismatches"]:
+            mismatched.append(record["matchid"])
+            by_stat.update(record["mismatches"])
+            matches_by_stat.update(record["mismatches"].keys())
+
+    return {
+        "matches": matches,
+        "events": events,
+        "mismatched_matches": mismatched,
+        "errors": errors,
+        "mismatches": {
+            key: {"count": by_stat[key], "matches": matches_by_stat[key]} for key in sorted(by_stat)
+        },
+        "wall_secs": round(wall_secs, 4),
+        "matches_per_sec": matches / wall_secs if wall_secs else 0.0,
+        "events_per_sec": events / wall_secs if wall_secs else 0.0,
+    }
+
+
+def print_summary(summary: dict[str, Any]) -> None:
+    if summary["mismatches"]:
+        rows = [[key, item["count"], item["matches"]] for key, item in summary["mismatches"].items()]
+        print(tabulate(rows, headers=["Statistic", "Mismatches", "Matches"]))
+        print()
+    for matchid, error in summary["errors"].items():
+        print(f"{matchid}: {error}")
+
+    ok = summary["matches"] - len(summary["mismatched_matches"]) - len(summary["errors"])
+    print(f"matches:    {ok}/{summary['matches']} identical")
+    if summary["mismatched_matches"]:
+        print(f"mismatched: {' '.join(summary['mismatched_matches'])}")
+    print(f"throughput: {summary['matches_per_sec']:,.1f} matches/s, {summary['events_per_sec']:,.0f} events/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", type=Path, default=CACHE_DIR, help="Directory with the cached XML files")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes")
+    parser.add_argument("--limit", type=int, help="Only verify the first N matches")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    matchids = cached_matchids(args.dir)[: args.limit]
+    if not matchids:
+        print(f"No match with both report_*.xml and boxscore_*.xml in {args.dir}.")
+        return 1
+
+    start = time.perf_counter()
+    records = list(verify_corpus(matchids, args.dir, max(1, args.jobs)))
+    summary = summarize(records, time.perf_counter() - start)
+
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        print_summary(summary)
+    return 1 if summary["mismatched_matches"] or summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""SQLite warehouse of played matches.
+
+A played match report (Game.to_json plus the web tool's report keys) is
+ingested once and then read back instead of being fetched, parsed and
+played again: finished matches never change, but the reports built from
+them do, so each one is stored with the REPORT_VERSION it was built by and
+only read back by the same version. Besides the report itself (compact
+format, zlib compressed) each match is split into indexed tables for
+queries across matches:
+
+* matches: season, start time, teams and score;
+* teams: per side box score totals, keyed by team ID and normalized name;
+* player_lines: per player box score lines;
+* tactics: offense, defense, effort and game day focus/pace per side;
+* events: the play by play, one row per event in report order.
+
+The stored report leaves the events out: they are read from the events
+table, so aggregations over many matches never decompress them.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterable
+
+from main import CACHE_DIR
+from serialize import compact, expand
+
+WAREHOUSE_PATH = CACHE_DIR / "warehouse.sqlite3"
+# The warehouse only holds derived data: a file of another schema version is
+# dropped and refilled as matches are loaded again
+SCHEMA_VERSION = 5
+# Bump when the report built by web_tool.load_game_report changes
+REPORT_VERSION = 1
+
+# SQL column -> key of the "total" stats of a team or player
+BOX_COLUMNS = {
+    "pts": "pts",
+    "fgm": "fgm",
+    "fga": "fga",
+    "tpm": "tpm",
+    "tpa": "tpa",
+    "ftm": "ftm",
+    "fta": "fta",
+    "oreb": "or",
+    "dreb": "dr",
+    "ast": "ast",
+    "tov": "to",
+    "stl": "stl",
+    "blk": "blk",
+    "pf": "pf",
+    "plus_minus": "+/-",
+}
+# Player seconds are the sum of the seconds at every position
+SECS_KEYS = ("secs_pg", "secs_sg", "secs_sf", "secs_pf", "secs_c")
+_BOX_SQL = ", ".join(f"{column} INTEGER NOT NULL DEFAULT 0" for column in BOX_COLUMNS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    season INTEGER,
+    start_time TEXT NOT NULL DEFAULT '',
+    home_id INTEGER NOT NULL,
+    away_id INTEGER NOT NULL,
+    home_score INTEGER NOT NULL,
+    away_score INTEGER NOT NULL,
+    report_version INTEGER NOT NULL,
+    document BLOB NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_by_season ON matches (season, match_id);
+
+CREATE TABLE IF NOT EXISTS teams (
+    match_id INTEGER NOT NULL REFERENCES matches ON DELETE CASCADE,
+    side INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    team_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    possessions INTEGER,
+    time_of_possession INTEGER,
+    {_BOX_SQL},
+    PRIMARY KEY (match_id, side)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS teams_by_key ON teams (team_key, match_id);
+CREATE INDEX IF NOT EXISTS teams_by_id ON teams (team_id, match_id);
+
+CREATE TABLE IF NOT EXISTS player_lines (
+    match_id INTEGER NOT NULL REFERENCES matches ON DELETE CASCADE,
+    side INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    player_id INTEGER,
+    name TEXT NOT NULL,
+    starter INTEGER NOT NULL,
+    secs INTEGER NOT NULL DEFAULT 0,
+    {_BOX_SQL},
+    PRIMARY KEY (match_id, side, slot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_lines_by_player ON player_lines (player_id);
+
+CREATE TABLE IF NOT EXISTS tactics (
+    match_id INTEGER NOT NULL REFERENCES matches ON DELETE CASCADE,
+    side INTEGER NOT NULL,
+    offense TEXT NOT NULL DEFAULT '',
+    defense TEXT NOT NULL DEFAULT '',
+    effort TEXT NOT NULL DEFAULT '',
+    focus TEXT,
+    pace TEXT,
+    PRIMARY KEY (match_id, side)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS events (
+    match_id INTEGER NOT NULL REFERENCES matches ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    code TEXT NOT NULL DEFAULT '',
+    result TEXT NOT NULL DEFAULT '',
+    team INTEGER,
+    player INTEGER,
+    other INTEGER,
+    assistant INTEGER,
+    gameclock INTEGER,
+    x INTEGER,
+    y INTEGER,
+    comment TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (match_id, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_by_type ON events (event_type, match_id, idx);
+"""
+
+
+# Tables of this and earlier schema versions, dropped on a version change
+TABLES = ("tactics", "events", "player_lines", "teams", "matches")
+
+
+def team_key(name: str) -> str:
+    """Team name normalized for matching across matches."""
+    return " ".join(name.split()).casefold()
+
+
+def _season(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _box_line(stats: dict) -> dict[str, int]:
+    total = stats.get("total", {})
+    return {column: total.get(key) or 0 for column, key in BOX_COLUMNS.items()}
+
+
+def team_line(team: dict) -> dict[str, Any]:
+    """Stored columns of a report team: possessions and box score."""
+    total = team["stats"].get("total", {})
+    return {
+        "possessions": total.get("possessions"),
+        "time_of_possession": total.get("time_of_possession"),
+        **_box_line(team["stats"]),
+    }
+
+
+def player_line(player: dict) -> dict[str, Any]:
+    """Stored columns of a report player, as in a player_lines() row."""
+    return {
+        "player_id": player["id"],
+        "name": player["name"],
+        "starter": int(bool(player["starter"])),
+        "secs": sum(player["stats"].get("total", {}).get(key) or 0 for key in SECS_KEYS),
+        **_box_line(player["stats"]),
+    }
+
+
+# Event key -> events column, per event type; the team and players are
+# the acting side first (attacker, player subbed in, injured player)
+EVENT_COLUMNS = {
+    "shot": {
+        "shot_type": "code",
+        "shot_result": "result",
+        "attacking_team": "team",
+        "attacker": "player",
+        "defender": "other",
+        "assistant": "assistant",
+        "shot_pos_x": "x",
+        "shot_pos_y": "y",
+    },
+    "free_throw": {"free_throw_type": "code", "shot_result": "result", "attacking_team": "team", "attacker": "player"},
+    "interrupt": {"interrupt_type": "code", "attacking_team": "team", "attacker": "player", "defender": "other"},
+    "foul": {"foul_type": "code", "attacking_team": "team", "attacker": "player", "defender": "other"},
+    "rebound": {"rebound_type": "code", "attacking_team": "team", "attacker": "player", "defender": "other"},
+    "injury": {"injury_type": "code", "injured_team": "team", "injured_player": "player", "causedby_player": "other"},
+    "sub": {"sub_type": "code", "team": "team", "player_in": "player", "player_out": "other"},
+    "break": {"break_type": "code", "team": "team"},
+}
+EVENT_FIELDS = ("event_type", "code", "result", "team", "player", "other", "assistant", "gameclock", "x", "y", "comment")
+
+
+def event_line(event: dict) -> dict[str, Any]:
+    """Stored columns of a report event, as in an events() row."""
+    line: dict[str, Any] = dict.fromkeys(EVENT_FIELDS)
+    line.update(event_type=event["event_type"], code="", result="", gameclock=event.get("gameclock"))
+    line["comment"] = " ".join(event.get("comments") or [])
+    for key, column in EVENT_COLUMNS.get(event["event_type"], {}).items():
+        value = event.get(key)
+        line[column] = str(value) if column in ("code", "result") and value is not None else value
+    return line
+
+
+def match_line(report: dict, side: int) -> dict[str, Any]:
+    """A team_matches() row of the team on side of a report, for reports
+    that could not be stored."""
+    teams = (report["teamHome"], report["teamAway"])
+    team, opponent = teams[side], teams[1 - side]
+    return {
+        "match_id": int(report["matchid"]),
+        "season": None,
+        "start_time": report.get("start_time", ""),
+        "side": side,
+        "name": team["name"],
+        "opponent": opponent["name"],
+        **team_line(team),
+        **{f"opp_{column}": value for column, value in team_line(opponent).items()},
+    }
+
+
+class Warehouse:
+    """Connections are per thread; every ingest is one transaction."""
+
+    def __init__(self, path: Path = WAREHOUSE_PATH) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA journal_mode = WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                with conn:
+                    for table in TABLES:
+                        conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    conn.executescript(SCHEMA)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def ingest(self, report: dict[str, Any], *, season=None) -> None:
+        """Store a match report, replacing an earlier copy. A season of
+        None keeps the one stored before, if any."""
+        match_id = int(report["matchid"])
+        teams = (report["teamHome"], report["teamAway"])
+        scores = [team["stats"].get("total", {}).get("pts") or 0 for team in teams]
+        stored = {key: value for key, value in report.items() if key != "events"}
+        document = zlib.compress(json.dumps(compact(stored), separators=(",", ":")).encode("utf-8"))
+
+        conn = self.connect()
+        with conn:
+            row = conn.execute("SELECT season FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+            season = _season(season)
+            if season is None and row is not None:
+                season = row["season"]
+            conn.execute("DELETE FROM matches WHERE match_id = ?", (match_id,))
+            conn.execute(
+                "INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    match_id,
+                    season,
+                    report.get("start_time", ""),
+                    teams[0]["id"],
+                    teams[1]["id"],
+                    scores[0],
+                    scores[1],
+                    REPORT_VERSION,
+                    document,
+                    time.time(),
+                ),
+            )
+
+            box_marks = ", ".join("?" * len(BOX_COLUMNS))
+            for side, team in enumerate(teams):
+                conn.execute(
+                    f"INSERT INTO teams VALUES (?, ?, ?, ?, ?, ?, ?, {box_marks})",
+                    (match_id, side, team["id"], team_key(team["name"]), team["name"], *team_line(team).values()),
+                )
+                conn.executemany(
+                    f"INSERT INTO player_lines VALUES (?, ?, ?, ?, ?, ?, ?, {box_marks})",
+                    (
+                        (match_id, side, slot, *player_line(player).values())
+                        for slot, player in enumerate(team["players"])
+                    ),
+                )
+                tactics = team.get("tactics")
+                if tactics:
+                    gdp = tactics.get("gdp") or {}
+                    conn.execute(
+                        "INSERT INTO tactics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            match_id,
+                            side,
+                            tactics.get("offense", ""),
+                            tactics.get("defense", ""),
+                            tactics.get("effort", ""),
+                            (gdp.get("focus") or {}).get("value"),
+                            (gdp.get("pace") or {}).get("value"),
+                        ),
+                    )
+            event_marks = ", ".join("?" * len(EVENT_FIELDS))
+            conn.executemany(
+                f"INSERT INTO events VALUES (?, ?, {event_marks})",
+                ((match_id, idx, *event_line(event).values()) for idx, event in enumerate(report.get("events", []))),
+            )
+
+    def has(self, matchid) -> bool:
+        row = self.connect().execute(
+            "SELECT 1 FROM matches WHERE match_id = ? AND report_version = ?", (int(matchid), REPORT_VERSION)
+        ).fetchone()
+        return row is not None
+
+    def games(self, matchids: Iterable) -> dict[str, dict[str, Any]]:
+        """matchid -> stored report without its events (see events()), for
+        the matchids in the warehouse. Reports of another REPORT_VERSION, or
+        that fail to decode, are left out so the caller builds and ingests
+        them again."""
+        ids = [int(matchid) for matchid in matchids]
+        if not ids:
+            return {}
+        marks = ", ".join("?" * len(ids))
+        rows = self.connect().execute(
+            f"SELECT match_id, document FROM matches WHERE match_id IN ({marks}) AND report_version = ?",
+            ids + [REPORT_VERSION],
+        )
+        games = {}
+        for row in rows:
+            try:
+                games[str(row["match_id"])] = expand(json.loads(zlib.decompress(row["document"])))
+            except (zlib.error, ValueError):
+                continue
+        return games
+
+    def events(self, matchids: Iterable, types: Iterable[str] | None = None) -> dict[str, list[sqlite3.Row]]:
+        """matchid -> event rows of the stored reports, in report order,
+        only those of the given event types when types are given."""
+        ids = [int(matchid) for matchid in matchids]
+        if not ids:
+            return {}
+        sql = f"""
+            SELECT e.match_id, {', '.join(f'e.{field}' for field in EVENT_FIELDS)}
+            FROM events e
+            JOIN matches m ON m.match_id = e.match_id
+            WHERE e.match_id IN ({', '.join('?' * len(ids))}) AND m.report_version = ? {{where}}
+            ORDER BY e.match_id, e.idx
+        """
+        params: list[Any] = ids + [REPORT_VERSION]
+        where = ""
+        if types is not None:
+            types = list(types)
+            where = f"AND e.event_type IN ({', '.join('?' * len(types))})"
+            params += types
+        events: dict[str, list[sqlite3.Row]] = {}
+        for row in self.connect().execute(sql.replace("{where}", where), params):
+            events.setdefault(str(row["match_id"]), []).append(row)
+        return events
+
+    def team_matches(self, key: str, season=None, matchids: Iterable | None = None) -> list[sqlite3.Row]:
+        """Matches of a team (by team_key), with its side, possessions and
+        box score and the opponent's as opp_ columns, oldest first."""
+        sql = """
+            SELECT m.match_id, m.season, m.start_time, t.side, t.name, o.name AS opponent, {box}
+            FROM teams t
+            JOIN matches m ON m.match_id = t.match_id
+            JOIN teams o ON o.match_id = t.match_id AND o.side = 1 - t.side
+            WHERE t.team_key = ? {where}
+            ORDER BY m.start_time, m.match_id
+        """
+        columns = ("possessions", "time_of_possession", *BOX_COLUMNS)
+        box = ", ".join([f"t.{column}" for column in columns] + [f"o.{column} AS opp_{column}" for column in columns])
+        return self._query(sql.replace("{box}", box), key, season, matchids)
+
+    def player_lines(self, key: str, season=None, matchids: Iterable | None = None) -> list[sqlite3.Row]:
+        """Box score lines of the players of a team (by team_key), by
+        match and roster slot."""
+        sql = """
+            SELECT p.*, m.season
+            FROM player_lines p
+            JOIN teams t ON t.match_id = p.match_id AND t.side = p.side
+            JOIN matches m ON m.match_id = p.match_id
+            WHERE t.team_key = ? {where}
+            ORDER BY m.start_time, p.match_id, p.slot
+        """
+        return self._query(sql, key, season, matchids)
+
+    def _query(self, sql: str, key: str, season, matchids: Iterable | None) -> list[sqlite3.Row]:
+        """Run sql for a team key, filtered to a season and, when given, to
+        the matchids stored by this REPORT_VERSION."""
+        params: list[Any] = [key]
+        where = ""
+        if _season(season) is not None:
+            where = "AND m.season = ?"
+            params.append(_season(season))
+        if matchids is not None:
+            ids = [int(matchid) for matchid in matchids]
+            where += f" AND m.match_id IN ({', '.join('?' * len(ids))}) AND m.report_version = ?"
+            params += ids + [REPORT_VERSION]
+        return self.connect().execute(sql.replace("{where}", where), params).fetchall()
@@ -3,28 +3,34 @@
 from __future__ import annotations
 
 from argparse import Namespace
+import asyncio
 import base64
-import contextlib
 from datetime import datetime
+from functools import lru_cache
 import hmac
 import io
 import json
 import os
 from pathlib import Path
 import re
+import sqlite3
 from typing import Any
 import xml.etree.ElementTree as xml
 
 from flask import Flask, jsonify, render_template_string, request
 
-from bbapi import BBApi
+from bbapi import AsyncBBApi, BBApi, fetch_all
 from bb_site import BBSiteClient
+from clocks import FEED_CLOCKS
 from coachparrot_model import SKILLS
-from game import Game
-from main import get_xml_text, parse_xml
+from game import STINT_COLUMNS, BoxScoreTimeline, Game, LineupStints, Possessions
+from main import CACHE_DIR, get_xml_text, parse_xml
 from minutes_analyzer import minutes_bp
+from serialize import compact
+from shot_chart import ShotGrid, ShotGridCache
 from u21_tracker import u21_tracker_bp
 from u21_training import PlayerMetadata, estimate_player, target_seasons_for_player
+from warehouse import Warehouse, event_line, match_line, player_line, team_key
 
 app = Flask(__name__)
 app.register_blueprint(minutes_bp)
@@ -32,10 +38,53 @@ app.register_blueprint(u21_tracker_bp)
 
 LOCAL_NATIONAL_OPTIONS_PATH = Path(__file__).with_name("national_options.json")
 DEFAULT_CURRENT_SEASON = int(os.environ.get("CURRENT_SEASON", "73"))
+# Animation view: box score keyframe every N events, so scrubbing replays at
+# most N events client-side.
+ANIMATION_KEYFRAME_EVERY = 40
+# Season shot grids of the multi-match report, binned once per match
+SHOT_GRID_CACHE = ShotGridCache(CACHE_DIR / "shot_grids")
+# Event types the multi-match report aggregates, read from the warehouse
+AGGREGATED_EVENTS = ("shot", "free_throw", "interrupt", "foul", "sub")
 VERCEL_ANALYTICS_HTML = """<script>
   window.va = window.va || function () { (window.vaq = window.vaq || []).push(arguments); };
 </script>
 <script defer src="/_vercel/insights/script.js"></script>"""
+# Inverse of serialize.expand for the report pages, which embed the game
+# document in the compact format to cut page weight.
+EXPAND_GAME_DATA_JS = """
+    function expandGameData(data) {
+      if (!data || data.v === undefined) return data;
+      const keys = data.k || {};
+      const record = (kind, row) => (
+        Array.isArray(row) ? Object.fromEntries(keys[kind].map((key, idx) => [key, row[idx]])) : row
+      );
+      const periods = (kind, stats) => Object.fromEntries(
+        Object.entries(stats).map(([period, row]) => [period, record(kind, row)])
+      );
+      const team = value => ({
+        ...value,
+        players: value.players.map(player => (
+          Array.isArray(player)
+            ? { id: player[0], name: player[1], starter: player[2], stats: periods("player", player[3]) }
+            : player
+        )),
+        stats: periods("team", value.stats)
+      });
+      const event = row => (
+        row.length === 2 && row[1] !== null && typeof row[1] === "object" && !Array.isArray(row[1])
+          ? { event_type: row[0], ...row[1] }
+          : { event_type: row[0], ...record(row[0], row.slice(1)) }
+      );
+      const out = {};
+      Object.entries(data).forEach(([key, value]) => {
+        if (key === "v" || key === "k") return;
+        if (key === "teamHome" || key === "teamAway") out[key] = team(value);
+        else if (key === "events") out[key] = value.map(event);
+        else out[key] = value;
+      });
+      return out;
+    }
+"""
 
 
 @app.after_request
@@ -2205,6 +2254,35 @@ MULTI_REPORT_HTML = """<!doctype html>
       </div>
     </section>
 
+    <section class="card">
+      <h2>Lineups</h2>
+      <div class="table-wrap">
+        <table id="lineupTable"></table>
+      </div>
+    </section>
+
+    <section class="card" id="seasonSummaryCard" hidden>
+      <h2>Season To Date</h2>
+      <p id="seasonSummaryNote" class="insight-note"></p>
+      <div class="table-wrap">
+        <table id="seasonSummaryTable"></table>
+      </div>
+    </section>
+
+    <section class="card">
+      <h2>Shot Heatmap</h2>
+      <label class="filter-field" id="shotHeatmapViewField" hidden>View
+        <select id="shotHeatmapView">
+          <option value="report">These matches</option>
+          <option value="season">Whole season</option>
+        </select>
+      </label>
+      <p id="shotHeatmapNote" class="insight-note"></p>
+      <div class="card-body">
+        <img id="shotHeatmap" alt="Field goal percentage by court zone" style="max-width:100%" />
+      </div>
+    </section>
+
     <section class="card">
       <h2>Defended Shot Log</h2>
       <div class="events-head">
@@ -2485,7 +2563,8 @@ MULTI_REPORT_HTML = """<!doctype html>
       const tableSorts = {
         playerSummary: { key: "fga", dir: "desc" },
         matchup: { key: "total_attempts", dir: "desc" },
-        defense: { key: "total_attempts", dir: "desc" }
+        defense: { key: "total_attempts", dir: "desc" },
+        lineups: { key: "mins", dir: "desc" }
       };
 
       /* MULTI FILTERS START */
@@ -2570,6 +2649,7 @@ MULTI_REPORT_HTML = """<!doctype html>
         renderPlayerSummaryTable();
         renderPlayerMatchupTable();
         renderPlayerDefenseTable();
+        renderLineupTable();
         renderOffensePlayersTable();
         renderDefendedShots();
         const state = filterState();
@@ -3270,6 +3350,96 @@ MULTI_REPORT_HTML = """<!doctype html>
         attachSortHandlers(table, tableSorts.defense, renderPlayerDefenseTable);
       }
 
+      const lineupColumns = [
+        { key: "players", label: "Lineup", type: "text", get: row => row.players.join(", ") },
+        { key: "gp", label: "GP", type: "number", get: row => row.gp },
+        { key: "stints", label: "Stints", type: "number", get: row => row.stints },
+        { key: "mins", label: "MIN", type: "number", get: row => row.mins },
+        { key: "pts_for", label: "PTS For", type: "number", get: row => row.pts_for },
+        { key: "pts_against", label: "PTS Against", type: "number", get: row => row.pts_against },
+        { key: "pm", label: "+/-", type: "number", get: row => row.pm },
+        { key: "poss", label: "Poss", type: "number", get: row => row.poss },
+        { key: "ortg", label: "ORtg", type: "number", get: row => row.ortg ?? -1 },
+        { key: "drtg", label: "DRtg", type: "number", get: row => row.drtg ?? -1 }
+      ];
+
+      function renderLineupTable() {
+        const table = document.getElementById("lineupTable");
+        const state = filterState();
+        const rows = sortRows(
+          (data.lineups || []).filter(row => (
+            (state.player === "all" || row.players.includes(state.player)) &&
+            (!state.minMinutes || row.mins >= state.minMinutes)
+          )),
+          lineupColumns,
+          tableSorts.lineups
+        );
+        table.innerHTML = `
+          <thead><tr>${lineupColumns.map(column => sortableHeader(column, tableSorts.lineups)).join("")}</tr></thead>
+          <tbody>
+            ${rows.map(row => `
+              <tr>
+                <td>${row.players.join(", ")}</td>
+                <td>${row.gp}</td>
+                <td>${row.stints}</td>
+                <td>${row.mins}</td>
+                <td>${row.pts_for}</td>
+                <td>${row.pts_against}</td>
+                <td>${row.pm}</td>
+                <td>${row.poss}</td>
+                <td>${row.ortg ?? "-"}</td>
+                <td>${row.drtg ?? "-"}</td>
+              </tr>
+            `).join("") || `<tr><td colspan="10" class="empty">No lineups match the current filters.</td></tr>`}
+          </tbody>
+        `;
+        attachSortHandlers(table, tableSorts.lineups, renderLineupTable);
+      }
+
+      const shotHeatmapView = document.getElementById("shotHeatmapView");
+
+      function renderShotHeatmap() {
+        let heatmap = data.shot_heatmap;
+        if (!heatmap) return;
+        const seasonView = shotHeatmapView.value === "season" && Boolean(heatmap.season);
+        if (seasonView) heatmap = heatmap.season;
+        document.getElementById("shotHeatmap").src = heatmap.image;
+        document.getElementById("shotHeatmapNote").textContent =
+          `${heatmap.attempts} field goal attempts from ${heatmap.matches} match${heatmap.matches === 1 ? "" : "es"}${seasonView ? ` of season ${heatmap.season}` : ""}, colored by FG% (blue cold, red hot); stronger color means more attempts.`;
+      }
+
+      if (data.shot_heatmap?.season) {
+        document.getElementById("shotHeatmapViewField").hidden = false;
+        shotHeatmapView.options[1].textContent = `Season ${data.shot_heatmap.season.season}`;
+        shotHeatmapView.addEventListener("change", renderShotHeatmap);
+      }
+      renderShotHeatmap();
+
+      function renderSeasonSummary() {
+        const summary = data.season_summary;
+        if (!summary) return;
+        document.getElementById("seasonSummaryCard").hidden = false;
+        document.getElementById("seasonSummaryNote").textContent =
+          `Season ${summary.season}: ${summary.wins}-${summary.losses} over ${summary.matches} stored match${summary.matches === 1 ? "" : "es"}, ${summary.ppg} points scored and ${summary.opp_ppg} allowed per game.`;
+        document.getElementById("seasonSummaryTable").innerHTML = `
+          <thead><tr><th>Player</th><th>GP</th><th>MPG</th><th>PPG</th><th>RPG</th><th>APG</th><th>+/-</th></tr></thead>
+          <tbody>
+            ${summary.players.map(row => `
+              <tr>
+                <td>${row.name}</td>
+                <td>${row.gp}</td>
+                <td>${row.mpg}</td>
+                <td>${row.ppg}</td>
+                <td>${row.rpg}</td>
+                <td>${row.apg}</td>
+                <td>${row.pm}</td>
+              </tr>
+            `).join("")}
+          </tbody>
+        `;
+      }
+
+      renderSeasonSummary();
       renderDetections();
 
       function renderOffensePlayersTable() {
@@ -3506,7 +3676,7 @@ MULTI_REPORT_HTML = """<!doctype html>
       }
 
       function sumTeamStats(rows, side) {
-        const out = { pts: 0, fgm: 0, fga: 0, tpm: 0, tpa: 0, ftm: 0, fta: 0, or: 0, dr: 0, tr: 0, to: 0 };
+        const out = { pts: 0, fgm: 0, fga: 0, tpm: 0, tpa: 0, ftm: 0, fta: 0, or: 0, dr: 0, tr: 0, to: 0, poss: 0, top: 0 };
         rows.forEach(row => {
           const source = row[side] || {};
           Object.keys(out).forEach(key => {
@@ -3517,7 +3687,18 @@ MULTI_REPORT_HTML = """<!doctype html>
       }
 
       function estimatedPoss(stats) {
-        return stats.fga + (0.44 * stats.fta) - stats.or + stats.to;
+        // Counted by the server when available, box score estimate otherwise
+        return stats.poss || (stats.fga + (0.44 * stats.fta) - stats.or + stats.to);
+      }
+
+      // Possessions per team per 48 minutes, from the counted possessions
+      function pace(row) {
+        const secs = row.stats.top + row.opp.top;
+        return secs ? ((row.stats.poss + row.opp.poss) / 2) * 2880 / secs : null;
+      }
+
+      function secondsToClock(secs) {
+        return `${Math.floor(secs / 60)}:${String(secs % 60).padStart(2, "0")}`;
       }
 
       function nullableRatio(value, denom) {
@@ -3590,7 +3771,7 @@ MULTI_REPORT_HTML = """<!doctype html>
           <div class="summary-card"><div class="k">Matches</div><div class="v">${teamRows.length}</div></div>
           <div class="summary-card"><div class="k">Team eFG%</div><div class="v">${pct(teamStats.fgm + 0.5 * teamStats.tpm, teamStats.fga) || "0.0%"}</div></div>
           <div class="summary-card"><div class="k">Opp eFG%</div><div class="v">${pct(oppStats.fgm + 0.5 * oppStats.tpm, oppStats.fga) || "0.0%"}</div></div>
-          <div class="summary-card"><div class="k">Poss Est.</div><div class="v">${teamPoss ? teamPoss.toFixed(1) : "0.0"}</div></div>
+          <div class="summary-card"><div class="k">${teamStats.poss ? "Poss" : "Poss Est."}</div><div class="v">${teamPoss ? teamPoss.toFixed(teamStats.poss ? 0 : 1) : "0.0"}</div></div>
           <div class="summary-card"><div class="k">View</div><div class="v">${view.replace(/([A-Z])/g, " $1")}</div></div>
         `;
       }
@@ -3691,11 +3872,13 @@ MULTI_REPORT_HTML = """<!doctype html>
         const columns = [
           { key: "label", label: "Side", type: "text", value: row => row.label },
           { key: "efg", label: "eFG%", value: row => pct(row.stats.fgm + 0.5 * row.stats.tpm, row.stats.fga), sortValue: row => nullableRatio(row.stats.fgm + 0.5 * row.stats.tpm, row.stats.fga) },
-          { key: "tov", label: "TOV% Est.", value: row => pct(row.stats.to, possValue(row)), sortValue: row => nullableRatio(row.stats.to, possValue(row)) },
+          { key: "tov", label: "TOV%", value: row => pct(row.stats.to, possValue(row)), sortValue: row => nullableRatio(row.stats.to, possValue(row)) },
           { key: "orb", label: "ORB%", value: row => pct(row.stats.or, row.stats.or + row.opp.dr), sortValue: row => nullableRatio(row.stats.or, row.stats.or + row.opp.dr) },
           { key: "ftr", label: "FTr", value: row => formatRatio(ratio(row.stats.fta, row.stats.fga)), sortValue: row => ratio(row.stats.fta, row.stats.fga) },
-          { key: "poss", label: "Poss Est.", value: row => possValue(row) ? possValue(row).toFixed(1) : "0.0", sortValue: possValue },
-          { key: "ptsPoss", label: "PTS/Poss Est.", value: row => formatRatio(ratio(row.stats.pts, possValue(row))), sortValue: row => ratio(row.stats.pts, possValue(row)) }
+          { key: "poss", label: "Poss", value: row => possValue(row) ? possValue(row).toFixed(row.stats.poss ? 0 : 1) : "0.0", sortValue: possValue },
+          { key: "ptsPoss", label: "PTS/Poss", value: row => formatRatio(ratio(row.stats.pts, possValue(row))), sortValue: row => ratio(row.stats.pts, possValue(row)) },
+          { key: "top", label: "TOP", value: row => row.stats.top ? secondsToClock(row.stats.top) : "-", sortValue: row => row.stats.top },
+          { key: "pace", label: "Pace", value: row => formatRatio(pace(row), 1), sortValue: pace }
         ];
         renderNbaTable(columns, rows, columns.length, "No team rows match the NBA dashboard filters.");
       }
@@ -4497,7 +4680,8 @@ REPORT_HTML = """<!doctype html>
   </main>
 
   <script>
-    const data = {{ report_json | tojson }};
+{{ expand_game_data_js | safe }}
+    const data = expandGameData({{ report_json | tojson }});
 
 
     const courtImageUrl = {{ court_image_url | tojson }};
@@ -6237,7 +6421,8 @@ ANIMATION_REPORT_HTML = """<!doctype html>
   </main>
 
   <script>
-    const data = {{ report_json | tojson }};
+{{ expand_game_data_js | safe }}
+    const data = expandGameData({{ report_json | tojson }});
 
 
     const courtImageUrl = {{ court_image_url | tojson }};
@@ -6270,7 +6455,8 @@ ANIMATION_REPORT_HTML = """<!doctype html>
     let lastFrame = null;
     let lastRenderedSecond = -1;
     let visualState = createInitialVisualState();
-    let latestReplay = replayTo(0);
+    // Set once the keyframes are read, below
+    let latestReplay = null;
 
     stage.style.backgroundImage = courtImageUrl ? `url("${courtImageUrl}")` : "none";
     slider.max = String(maxClock);
@@ -6400,104 +6586,181 @@ ANIMATION_REPORT_HTML = """<!doctype html>
       }
     }
 
-    function replayTo(clock) {
-      const stats = {
-        teams: [blankStats(), blankStats()],
-        players: [home.players.map(blankStats), away.players.map(blankStats)]
+    function newReplayState() {
+      return {
+        stats: {
+          teams: [blankStats(), blankStats()],
+          players: [home.players.map(blankStats), away.players.map(blankStats)]
+        },
+        active: [cloneActiveStarters(home), cloneActiveStarters(away)],
+        activeSince: [
+          home.players.map(() => 0),
+          away.players.map(() => 0)
+        ],
+        lastEvent: null,
+        next: 0
       };
-      const active = [cloneActiveStarters(home), cloneActiveStarters(away)];
-      const activeSince = [
-        home.players.map(() => 0),
-        away.players.map(() => 0)
-      ];
-      let lastEvent = null;
+    }
 
-      for (const ev of events) {
-        if (ev.gameclock > clock) break;
-        lastEvent = ev;
+    // Stats are counted as the server's Game counts them, so a replay that
+    // resumes from a server keyframe adds up to the same box score.
+    const turnoverInterrupts = new Set(["801", "802", "807", "808", "810", "812"]);
+    const stealInterrupts = new Set(["807", "808"]);
+    const defensiveFouls = new Set(["504", "507"]);
+    const nonReboundTypes = new Set(["933", "934"]);
 
-        if (ev.event_type === "shot") {
-          const side = Number(ev.attacking_team);
-          const defSide = Number(ev.defending_team);
-          const team = teamBySide(side);
-          const defTeam = teamBySide(defSide);
-          const shooter = normalizeSlot(ev.attacker, team.players.length);
-          const defender = normalizeSlot(ev.defender, defTeam.players.length);
-          const assistant = normalizeSlot(ev.assistant, team.players.length);
-          const result = String(ev.shot_result);
-          const isThree = Number(ev.shot_type) >= 100 && Number(ev.shot_type) < 200;
-          const made = madeResults.has(result);
-          const countFg = !missedNoFgResults.has(result);
-
-          if (countFg) {
-            addStat(stats, side, shooter, "fga", 1);
-            if (isThree) addStat(stats, side, shooter, "tpa", 1);
-          }
-          if (made) {
-            const pts = isThree ? 3 : 2;
-            addStat(stats, side, shooter, "fgm", 1);
-            addStat(stats, side, shooter, "pts", pts);
-            if (isThree) addStat(stats, side, shooter, "tpm", 1);
-            if (assistant !== null) addStat(stats, side, assistant, "ast", 1);
-            active[side].forEach(idx => addPlayerStat(stats, side, idx, "pm", pts));
-            active[defSide].forEach(idx => addPlayerStat(stats, defSide, idx, "pm", -pts));
-            stats.teams[side].pm += pts;
-            stats.teams[defSide].pm -= pts;
-          }
-          if (result === "3" && defender !== null) addStat(stats, defSide, defender, "blk", 1);
-        } else if (ev.event_type === "free_throw") {
-          const side = Number(ev.attacking_team);
-          const defSide = side === 0 ? 1 : 0;
-          const team = teamBySide(side);
-          const shooter = normalizeSlot(ev.attacker, team.players.length);
-          addStat(stats, side, shooter, "fta", 1);
-          if (madeResults.has(String(ev.shot_result))) {
-            addStat(stats, side, shooter, "ftm", 1);
-            addStat(stats, side, shooter, "pts", 1);
-            active[side].forEach(idx => addPlayerStat(stats, side, idx, "pm", 1));
-            active[defSide].forEach(idx => addPlayerStat(stats, defSide, idx, "pm", -1));
-            stats.teams[side].pm += 1;
-            stats.teams[defSide].pm -= 1;
-          }
-        } else if (ev.event_type === "rebound") {
-          const off = String(ev.rebound_type) === "9317";
-          const side = off ? Number(ev.attacking_team) : Number(ev.defending_team);
-          const team = teamBySide(side);
-          const idx = normalizeSlot(ev.attacker, team.players.length);
-          addStat(stats, side, idx, off ? "or" : "dr", 1);
-        } else if (ev.event_type === "interrupt") {
-          const side = Number(ev.attacking_team);
-          const defSide = Number(ev.defending_team);
+    function applyEvent(state, ev) {
+      const { stats, active, activeSince } = state;
+      state.lastEvent = ev;
+      state.next += 1;
+
+      if (ev.event_type === "shot") {
+        const side = Number(ev.attacking_team);
+        const defSide = Number(ev.defending_team);
+        const team = teamBySide(side);
+        const defTeam = teamBySide(defSide);
+        const shooter = normalizeSlot(ev.attacker, team.players.length);
+        const defender = normalizeSlot(ev.defender, defTeam.players.length);
+        const assistant = normalizeSlot(ev.assistant, team.players.length);
+        const result = String(ev.shot_result);
+        const isThree = Number(ev.shot_type) >= 100 && Number(ev.shot_type) < 200;
+        const made = madeResults.has(result);
+        const countFg = !missedNoFgResults.has(result);
+
+        if (countFg) {
+          addStat(stats, side, shooter, "fga", 1);
+          if (isThree) addStat(stats, side, shooter, "tpa", 1);
+        }
+        if (made) {
+          const pts = isThree ? 3 : 2;
+          addStat(stats, side, shooter, "fgm", 1);
+          addStat(stats, side, shooter, "pts", pts);
+          if (isThree) addStat(stats, side, shooter, "tpm", 1);
+          // Assists and blocks count for the team even when the player is
+          // unknown, as in ShotEvent.is_assisted
+          if (ev.assistant !== 0) addStat(stats, side, assistant, "ast", 1);
+          active[side].forEach(idx => addPlayerStat(stats, side, idx, "pm", pts));
+          active[defSide].forEach(idx => addPlayerStat(stats, defSide, idx, "pm", -pts));
+          stats.teams[side].pm += pts;
+          stats.teams[defSide].pm -= pts;
+        }
+        if (result === "3") addStat(stats, defSide, defender, "blk", 1);
+      } else if (ev.event_type === "free_throw") {
+        const side = Number(ev.attacking_team);
+        const defSide = side === 0 ? 1 : 0;
+        const team = teamBySide(side);
+        const shooter = normalizeSlot(ev.attacker, team.players.length);
+        addStat(stats, side, shooter, "fta", 1);
+        if (String(ev.shot_result) === "1") {
+          addStat(stats, side, shooter, "ftm", 1);
+          addStat(stats, side, shooter, "pts", 1);
+          active[side].forEach(idx => addPlayerStat(stats, side, idx, "pm", 1));
+          active[defSide].forEach(idx => addPlayerStat(stats, defSide, idx, "pm", -1));
+          stats.teams[side].pm += 1;
+          stats.teams[defSide].pm -= 1;
+        }
+      } else if (ev.event_type === "rebound") {
+        if (nonReboundTypes.has(String(ev.rebound_type))) return;
+        const off = String(ev.rebound_type) === "9317";
+        const side = off ? Number(ev.attacking_team) : Number(ev.defending_team);
+        const team = teamBySide(side);
+        const idx = normalizeSlot(ev.attacker, team.players.length);
+        addStat(stats, side, idx, off ? "or" : "dr", 1);
+      } else if (ev.event_type === "interrupt") {
+        const type = String(ev.interrupt_type);
+        const side = Number(ev.attacking_team);
+        const defSide = Number(ev.defending_team);
+        const team = teamBySide(side);
+        const defTeam = teamBySide(defSide);
+        if (turnoverInterrupts.has(type)) {
+          addStat(stats, side, normalizeSlot(ev.attacker, team.players.length), "to", 1);
+        } else if (type === "804") {
+          // Shot clock violations are team turnovers
+          addTeamStat(stats, side, "to", 1);
+        }
+        if (stealInterrupts.has(type)) {
+          addStat(stats, defSide, normalizeSlot(ev.defender, defTeam.players.length), "stl", 1);
+        }
+      } else if (ev.event_type === "foul") {
+        const type = String(ev.foul_type);
+        const side = Number(ev.attacking_team);
+        const defSide = Number(ev.defending_team);
+        if (type === "803") {
           const team = teamBySide(side);
-          const defTeam = teamBySide(defSide);
           const attacker = normalizeSlot(ev.attacker, team.players.length);
-          const defender = normalizeSlot(ev.defender, defTeam.players.length);
           addStat(stats, side, attacker, "to", 1);
-          if (["807", "808"].includes(String(ev.interrupt_type)) && defender !== null) {
-            addStat(stats, defSide, defender, "stl", 1);
-          }
-        } else if (ev.event_type === "foul") {
-          const side = Number(ev.attacking_team);
-          const defSide = Number(ev.defending_team);
-          if (String(ev.foul_type) === "803") {
-            const team = teamBySide(side);
-            const attacker = normalizeSlot(ev.attacker, team.players.length);
-            addStat(stats, side, attacker, "to", 1);
-            addStat(stats, side, attacker, "pf", 1);
-          } else {
-            const defTeam = teamBySide(defSide);
-            const defender = normalizeSlot(ev.defender, defTeam.players.length);
-            addStat(stats, defSide, defender, "pf", 1);
-          }
-        } else if (ev.event_type === "sub") {
-          applySub(active, activeSince, stats, ev, ev.gameclock);
+          addStat(stats, side, attacker, "pf", 1);
+        } else if (defensiveFouls.has(type)) {
+          const defTeam = teamBySide(defSide);
+          const defender = normalizeSlot(ev.defender, defTeam.players.length);
+          addStat(stats, defSide, defender, "pf", 1);
         }
+      } else if (ev.event_type === "sub") {
+        applySub(active, activeSince, stats, ev, ev.gameclock);
+      }
+    }
+
+    // Box score checkpoints computed by the server. Each one holds the state
+    // after the first `i` feed events, so a replay resumes from the latest
+    // one at or before the requested clock instead of from the tip-off. The
+    // feed is replayed in clock order: a checkpoint is only usable where the
+    // events before it in that order are exactly its first `i` feed events.
+    const keyframes = [];
+    {
+      // minFeedFrom[n]: lowest feed index of the events from n on
+      const minFeedFrom = new Array(events.length + 1).fill(Infinity);
+      for (let n = events.length - 1; n >= 0; n--) {
+        minFeedFrom[n] = Math.min(minFeedFrom[n + 1], events[n].feed_index);
       }
+      (data.box_keyframes || []).forEach(kf => {
+        let start = events.findIndex(ev => ev.feed_index > kf.i);
+        if (start < 0) start = events.length;
+        if (minFeedFrom[start] > kf.i) keyframes.push({ ...kf, start });
+      });
+    }
 
-      [0, 1].forEach(side => updateActiveSeconds(stats, side, active, activeSince, clock));
-      return { stats, active, lastEvent };
+    function keyframeAt(clock) {
+      let lo = 0;
+      let hi = keyframes.length;
+      while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (keyframes[mid].c <= clock) lo = mid + 1;
+        else hi = mid;
+      }
+      return lo ? keyframes[lo - 1] : null;
     }
 
+    function statsFromRow(row) {
+      const [secs, pts, fgm, fga, tpm, tpa, ftm, fta, or, dr, ast, to, stl, blk, pf, pm] = row;
+      return { secs, pts, fgm, fga, tpm, tpa, ftm, fta, or, dr, tr: or + dr, ast, to, stl, blk, pf, pm };
+    }
+
+    function keyframeState(kf) {
+      return {
+        stats: {
+          teams: kf.t.map(statsFromRow),
+          players: kf.p.map(rows => rows.map(statsFromRow))
+        },
+        active: kf.a.map(slots => new Set(slots.filter(idx => idx !== null))),
+        activeSince: [home.players.map(() => kf.c), away.players.map(() => kf.c)],
+        lastEvent: kf.start > 0 ? events[kf.start - 1] : null,
+        next: kf.start
+      };
+    }
+
+    function replayTo(clock) {
+      const kf = keyframeAt(clock);
+      const state = kf ? keyframeState(kf) : newReplayState();
+      for (let n = state.next; n < events.length; n++) {
+        if (events[n].gameclock > clock) break;
+        applyEvent(state, events[n]);
+      }
+
+      [0, 1].forEach(side => updateActiveSeconds(state.stats, side, state.active, state.activeSince, clock));
+      return { stats: state.stats, active: state.active, lastEvent: state.lastEvent };
+    }
+    latestReplay = replayTo(0);
+
     function createInitialVisualState() {
       const positions = [[], []];
       [home, away].forEach((team, side) => {
@@ -7095,38 +7358,6 @@ ANIMATION_REPORT_HTML = """<!doctype html>
 """
 
 
-def serialize_game(game: Game) -> dict[str, Any]:
-    teams: list[dict[str, Any]] = []
-    for team in game.teams:
-        players = []
-        for player in team.players:
-            stats: dict[str, Any] = {}
-            for qtr, stat in enumerate(player.stats.qtr, start=1):
-                stats[f"q{qtr}"] = stat.player_stats()
-            stats["total"] = player.stats.full.player_stats()
-
-            players.append(
-                {
-                    "id": player.id,
-                    "name": player.name,
-                    "starter": player.starter,
-                    "stats": stats,
-                }
-            )
-
-        team_stats: dict[str, Any] = {}
-        for qtr, stat in enumerate(team.stats.qtr, start=1):
-            team_stats[f"q{qtr}"] = stat.team_stats()
-        team_stats["total"] = team.stats.full.team_stats()
-
-        teams.append(
-            {"id": team.id, "name": team.name, "players": players, "stats": team_stats}
-        )
-
-    events = [event.to_json() for event in game.baseevents]
-    return {"teamHome": teams[0], "teamAway": teams[1], "events": events}
-
-
 def bbapi_error_message(xml_text: str) -> str:
     try:
         root = xml.fromstring(xml_text)
@@ -7387,23 +7618,6 @@ def extract_pbp_result_from_xml(matchid: str, xml_text: str) -> dict[str, Any] |
     )
 
 
-def pbp_payload_xml(xml_text: str) -> str:
-    root = xml.fromstring(xml_text)
-    if root.tag == "BBData":
-        return xml_text
-    bbdata = root.find(".//BBData")
-    if bbdata is not None:
-        return xml.tostring(bbdata, encoding="unicode")
-    if root.find("./ReportString") is not None:
-        return xml_text
-    for element in root.iter():
-        if element is root:
-            continue
-        if element.find("./ReportString") is not None:
-            return xml.tostring(element, encoding="unicode")
-    return xml_text
-
-
 def load_pbp_result(matchid: str, username: str, password: str) -> dict[str, Any]:
     api = BBApi(username, password)
     if not getattr(api, "logged_in", False):
@@ -7418,19 +7632,20 @@ def load_pbp_result(matchid: str, username: str, password: str) -> dict[str, Any
     game = None
     parse_error = ""
     try:
-        with contextlib.redirect_stdout(io.StringIO()):
-            events, home_team, away_team = parse_xml(pbp_payload_xml(pbp_xml))
-            args = Namespace(
-                matchid=matchid,
-                username=username,
-                password=password,
-                print_events=False,
-                print_stats=False,
-                save_charts=False,
-                verify=False,
-            )
-            game = Game(matchid, events, home_team, away_team, args, [])
-            game.play()
+        # The streaming parser scopes fields to the element holding the
+        # ReportString, so the payload no longer needs to be unwrapped.
+        events, home_team, away_team = parse_xml(pbp_xml)
+        args = Namespace(
+            matchid=matchid,
+            username=username,
+            password=password,
+            print_events=False,
+            print_stats=False,
+            save_charts=False,
+            verify=False,
+        )
+        game = Game(matchid, events, home_team, away_team, args, [])
+        game.play()
     except Exception as exc:
         parse_error = str(exc)
 
@@ -7474,7 +7689,7 @@ def load_pbp_result(matchid: str, username: str, password: str) -> dict[str, Any
 
 
 def normalize_team_key(name: str) -> str:
-    return " ".join(name.split()).casefold()
+    return team_key(name)
 
 
 def normalize_player_key(name: str) -> str:
@@ -8049,13 +8264,12 @@ def build_u21_training_report(
     if not roster:
         report_warnings.append("No players were found on the selected U21 roster page.")
 
-    for roster_player in roster:
+    infos = fetch_all(api, "player_info", [roster_player.player_id for roster_player in roster])
+    for roster_player, info in zip(roster, infos):
         player_warnings: list[str] = []
-        try:
-            info = api.player_info(roster_player.player_id)
-        except Exception as exc:
+        if isinstance(info, Exception):
+            player_warnings.append(f"BBAPI metadata failed: {info}")
             info = {"player_id": roster_player.player_id}
-            player_warnings.append(f"BBAPI metadata failed: {exc}")
 
         metadata = PlayerMetadata(
             player_id=roster_player.player_id,
@@ -8182,59 +8396,55 @@ def nba_tactic_group(code: Any) -> str:
 
 
 def nba_is_clutch(gameclock: Any, selected_score: int, opponent_score: int) -> bool:
-    try:
-        clock = int(gameclock)
-    except (TypeError, ValueError):
-        return False
     if abs(selected_score - opponent_score) > 5:
         return False
-    if 2580 <= clock < 2880:
-        return True
-    if clock >= 2880:
-        return ((clock - 2880) % 420) >= 120
-    return False
+    if type(gameclock) is not int:
+        try:
+            gameclock = int(gameclock)
+        except (TypeError, ValueError):
+            return False
+    return FEED_CLOCKS.is_clutch(gameclock)
+
+
+# Report stat key -> column of a warehouse box score line
+LINE_COLUMNS = {
+    "pts": "pts",
+    "fgm": "fgm",
+    "fga": "fga",
+    "tpm": "tpm",
+    "tpa": "tpa",
+    "ftm": "ftm",
+    "fta": "fta",
+    "or": "oreb",
+    "dr": "dreb",
+    "ast": "ast",
+    "to": "tov",
+    "stl": "stl",
+    "blk": "blk",
+    "pf": "pf",
+    "pm": "plus_minus",
+}
 
 
-def build_nba_team_row(
-    matchid: str,
-    result: str,
-    tactic_group: str,
-    team_obj: dict[str, Any],
-    opp_obj: dict[str, Any],
-) -> dict[str, Any]:
-    team = team_obj["stats"]["total"]
-    opp = opp_obj["stats"]["total"]
-    return {
-        "matchid": matchid,
-        "result": result,
-        "tactic_group": tactic_group,
-        "team": {
-            "pts": team["pts"],
-            "fgm": team["fgm"],
-            "fga": team["fga"],
-            "tpm": team["tpm"],
-            "tpa": team["tpa"],
-            "ftm": team["ftm"],
-            "fta": team["fta"],
-            "or": team["or"],
-            "dr": team["dr"],
-            "tr": team["tr"],
-            "to": team["to"],
-        },
-        "opponent": {
-            "pts": opp["pts"],
-            "fgm": opp["fgm"],
-            "fga": opp["fga"],
-            "tpm": opp["tpm"],
-            "tpa": opp["tpa"],
-            "ftm": opp["ftm"],
-            "fta": opp["fta"],
-            "or": opp["or"],
-            "dr": opp["dr"],
-            "tr": opp["tr"],
-            "to": opp["to"],
-        },
-    }
+def line_stats(line, prefix: str = "") -> dict[str, int]:
+    """Report keyed box score of a warehouse team or player line; prefix
+    picks the opponent's columns of a team_matches() row."""
+    stats = {key: line[prefix + column] for key, column in LINE_COLUMNS.items()}
+    stats["tr"] = stats["or"] + stats["dr"]
+    return stats
+
+
+def build_nba_team_row(matchid: str, result: str, tactic_group: str, line) -> dict[str, Any]:
+    """Team and opponent rows of the dashboard from a team_matches() row."""
+    sides = {}
+    for name, prefix in (("team", ""), ("opponent", "opp_")):
+        stats = line_stats(line, prefix)
+        sides[name] = {
+            **{key: stats[key] for key in ("pts", "fgm", "fga", "tpm", "tpa", "ftm", "fta", "or", "dr", "tr", "to")},
+            "poss": line[prefix + "possessions"] or 0,
+            "top": line[prefix + "time_of_possession"] or 0,
+        }
+    return {"matchid": matchid, "result": result, "tactic_group": tactic_group, **sides}
 
 
 def game_team_entry(game_data: dict[str, Any], selected_team_key: str) -> tuple[int, dict[str, Any]] | None:
@@ -8363,6 +8573,47 @@ def finalize_tactic_minutes(tactic_minutes: dict[str, Any]) -> list[dict[str, An
     return out
 
 
+def add_lineup_stints(
+    lineup_map: dict[tuple[str, ...], dict[str, Any]],
+    stint_rows: list[dict[str, Any]],
+    slot_map: dict[int, tuple[str, str]],
+) -> None:
+    """Merge one match's lineup table (roster slots) into lineup_map, keyed
+    by the canonical player keys so lineups line up across matches."""
+    for row in stint_rows:
+        players = sorted(slot_map[slot] for slot in row["lineup"] if slot in slot_map)
+        key = tuple(player_key for player_key, _ in players)
+        entry = lineup_map.setdefault(
+            key,
+            {"players": [label for _, label in players], "gp": 0, **{column: 0 for column in STINT_COLUMNS}},
+        )
+        entry["gp"] += 1
+        for column in STINT_COLUMNS:
+            entry[column] += row[column]
+
+
+def finalize_lineups(lineup_map: dict[tuple[str, ...], dict[str, Any]]) -> list[dict[str, Any]]:
+    out = []
+    for entry in sorted(lineup_map.values(), key=lambda item: -item["secs"]):
+        poss_for = entry["poss_for"]
+        poss_against = entry["poss_against"]
+        out.append(
+            {
+                "players": entry["players"],
+                "gp": entry["gp"],
+                "stints": entry["stints"],
+                "mins": secs_to_minutes(entry["secs"]),
+                "pts_for": entry["pts_for"],
+                "pts_against": entry["pts_against"],
+                "pm": entry["pts_for"] - entry["pts_against"],
+                "poss": poss_for,
+                "ortg": round(100 * entry["pts_for"] / poss_for, 1) if poss_for else None,
+                "drtg": round(100 * entry["pts_against"] / poss_against, 1) if poss_against else None,
+            }
+        )
+    return out
+
+
 def build_team_candidates(games: list[dict[str, Any]]) -> list[dict[str, Any]]:
     counts: dict[str, dict[str, Any]] = {}
     for game_data in games:
@@ -8376,8 +8627,16 @@ def build_team_candidates(games: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return [entry for entry in counts.values() if entry["count"] == top_count]
 
 
-def load_game_report(matchid: str, username: str, password: str) -> dict[str, Any]:
-    api = BBApi(username, password)
+def load_game_report(
+    matchid: str,
+    username: str,
+    password: str,
+    *,
+    api: BBApi | None = None,
+    keyframe_every: int = 0,
+) -> dict[str, Any]:
+    if api is None:
+        api = BBApi(username, password)
     if not getattr(api, "logged_in", False):
         raise ValueError("BBAPI login failed. Check username/password.")
 
@@ -8385,23 +8644,36 @@ def load_game_report(matchid: str, username: str, password: str) -> dict[str, An
     api.boxscore(matchid=int(matchid))
     boxscore_metadata = parse_boxscore_metadata(api.get_xml_boxscore(matchid=int(matchid)))
 
-    # Silence verbose debug prints from parsing/game simulation in web mode.
-    with contextlib.redirect_stdout(io.StringIO()):
-        text = get_xml_text(matchid)
-        events, home_team, away_team = parse_xml(text)
+    text = get_xml_text(matchid)
+    events, home_team, away_team = parse_xml(text)
 
-        args = Namespace(
-            matchid=matchid,
-            username=username,
-            password=password,
-            print_events=False,
-            print_stats=False,
-            save_charts=False,
-            verify=False,
-        )
-        game = Game(matchid, events, home_team, away_team, args, [])
-        game.play()
-    report = serialize_game(game)
+    args = Namespace(
+        matchid=matchid,
+        username=username,
+        password=password,
+        print_events=False,
+        print_stats=False,
+        save_charts=False,
+        verify=False,
+    )
+    possessions = Possessions()
+    stints = LineupStints()
+    extensions = [possessions, stints]
+    if keyframe_every:
+        timeline = BoxScoreTimeline(every=keyframe_every, on_changes=False)
+        extensions.append(timeline)
+    game = Game(matchid, events, home_team, away_team, args, extensions)
+    game.play()
+    report = game.to_json()
+    report["lineup_stints"] = stints.to_json()
+    if keyframe_every:
+        report["box_keyframes"] = timeline.keyframes()
+    table = possessions.table
+    report["possessions"] = {
+        "table": table.to_json(),
+        "pace": table.pace(),
+        "points_per_possession": [table.points_per_possession(side) for side in (0, 1)],
+    }
     report["matchid"] = str(matchid)
     report["start_time"] = boxscore_metadata.get("start_time", "")
     report["teamHome"]["tactics"] = boxscore_metadata["home"]
@@ -8412,8 +8684,90 @@ def load_game_report(matchid: str, username: str, password: str) -> dict[str, An
     return report
 
 
-def generate_report(matchid: str, username: str, password: str) -> dict[str, Any]:
-    return load_game_report(matchid, username, password)
+def prefetch_match_files(api: BBApi, matchids: list[str]) -> None:
+    """Fetch the box scores and match reports of matchids into the matches/
+    cache concurrently, so loading them one by one only reads files.
+    Failures are left for load_game_report to report."""
+    if not matchids:
+        return
+
+    async def run():
+        client = AsyncBBApi(api)
+        try:
+            await client.fan_out(
+                lambda matchid: asyncio.gather(
+                    client.get_xml_boxscore(matchid), client.call(get_xml_text, matchid)
+                ),
+                matchids,
+                return_exceptions=True,
+            )
+        finally:
+            client.executor.shutdown(wait=False, cancel_futures=True)
+
+    asyncio.run(run())
+
+
+def generate_report(
+    matchid: str, username: str, password: str, *, keyframe_every: int = 0
+) -> dict[str, Any]:
+    return load_game_report(matchid, username, password, keyframe_every=keyframe_every)
+
+
+def season_summary(key: str, season: str) -> dict[str, Any] | None:
+    """Record and per game player averages of a team over every match of
+    season in the warehouse, from its stored rows alone."""
+    try:
+        matches = get_warehouse().team_matches(key, season)
+        lines = get_warehouse().player_lines(key, season)
+    except sqlite3.Error:
+        return None
+    if not matches:
+        return None
+
+    players: dict[Any, dict[str, Any]] = {}
+    for line in lines:
+        entry = players.setdefault(
+            line["player_id"] or line["name"],
+            {"name": line["name"], "gp": 0, "secs": 0, "pts": 0, "reb": 0, "ast": 0, "pm": 0},
+        )
+        entry["name"] = line["name"]
+        if line["secs"] or line["starter"]:
+            entry["gp"] += 1
+        entry["secs"] += line["secs"]
+        entry["pts"] += line["pts"]
+        entry["reb"] += line["oreb"] + line["dreb"]
+        entry["ast"] += line["ast"]
+        entry["pm"] += line["plus_minus"]
+
+    rows = []
+    for entry in players.values():
+        gp = entry["gp"]
+        if not gp:
+            continue
+        rows.append(
+            {
+                "name": entry["name"],
+                "gp": gp,
+                "mpg": round(entry["secs"] / 60 / gp, 1),
+                "ppg": round(entry["pts"] / gp, 1),
+                "rpg": round(entry["reb"] / gp, 1),
+                "apg": round(entry["ast"] / gp, 1),
+                "pm": entry["pm"],
+            }
+        )
+    rows.sort(key=lambda row: row["ppg"], reverse=True)
+
+    count = len(matches)
+    wins = sum(1 for match in matches if match["pts"] > match["opp_pts"])
+    return {
+        "season": season,
+        "matches": count,
+        "wins": wins,
+        "losses": count - wins,
+        "ppg": round(sum(match["pts"] for match in matches) / count, 1),
+        "opp_ppg": round(sum(match["opp_pts"] for match in matches) / count, 1),
+        "players": rows,
+    }
 
 
 def aggregate_multi_match_report(
@@ -8436,19 +8790,48 @@ def aggregate_multi_match_report(
     initial_rows: list[dict[str, Any]] = []
     warnings: list[str] = []
 
+    # The warehouse is shared: only a valid BBAPI login reads from it
+    api = BBApi(username, password)
+    if not getattr(api, "logged_in", False):
+        return (
+            "error",
+            {"message": "BBAPI login failed. Check username/password.", "rows": [], "warnings": []},
+        )
+
+    # Finished matches never change: played ones are read from the warehouse
+    season = {"team": team_schedule_season, "national": national_season}.get(multi_source, "")
+    warehouse = get_warehouse()
+    # Stored reports come without their events: the aggregated ones are
+    # read from the indexed events table
+    try:
+        stored_games = warehouse.games(matchid for matchid in matchids if matchid.isdigit())
+        stored_events = warehouse.events(stored_games, AGGREGATED_EVENTS)
+    except sqlite3.Error:
+        stored_games = {}
+        stored_events = {}
+    missing = [matchid for matchid in matchids if matchid.isdigit() and matchid not in stored_games]
+    # Every other match is loaded with the same login, its files fetched concurrently
+    prefetch_match_files(api, missing)
+
     for matchid in matchids:
         if not matchid.isdigit():
             msg = "Match ID must be numeric."
             warnings.append(f"Match {matchid}: {msg}")
             initial_rows.append(blank_match_row(matchid, msg))
             continue
-        try:
-            game_data = load_game_report(matchid, username, password)
-        except Exception as exc:
-            msg = f"Skipped: {exc}"
-            warnings.append(f"Match {matchid}: {exc}")
-            initial_rows.append(blank_match_row(matchid, msg))
-            continue
+        game_data = stored_games.get(matchid)
+        if game_data is None:
+            try:
+                game_data = load_game_report(matchid, username, password, api=api)
+            except Exception as exc:
+                msg = f"Skipped: {exc}"
+                warnings.append(f"Match {matchid}: {exc}")
+                initial_rows.append(blank_match_row(matchid, msg))
+                continue
+            try:
+                warehouse.ingest(game_data, season=season or None)
+            except sqlite3.Error:
+                pass
 
         loaded_games.append(game_data)
 
@@ -8478,11 +8861,26 @@ def aggregate_multi_match_report(
             return ("choose_team", candidates)
         selected_team_key = candidates[0]["key"]
 
+    # Box scores come from the stored team and player rows; a match that
+    # could not be stored is split into the same rows here
+    match_lines: dict[str, Any] = {}
+    player_lines: dict[str, list[Any]] = {}
+    try:
+        loaded_ids = [game_data["matchid"] for game_data in loaded_games]
+        for line in warehouse.team_matches(selected_team_key, matchids=loaded_ids):
+            match_lines[str(line["match_id"])] = line
+        for line in warehouse.player_lines(selected_team_key, matchids=loaded_ids):
+            player_lines.setdefault(str(line["match_id"]), []).append(line)
+    except sqlite3.Error:
+        match_lines = {}
+
+    shot_games: list[tuple[str, list[tuple[Any, Any, str]], int]] = []
     player_summary_map: dict[str, dict[str, Any]] = {}
     matchup_map: dict[str, dict[str, Any]] = {}
     defense_map: dict[str, dict[str, Any]] = {}
     offense_map: dict[str, dict[str, Any]] = {}
     tactic_minutes = init_tactic_minutes()
+    lineup_map: dict[tuple[str, ...], dict[str, Any]] = {}
     nba_player_rows: list[dict[str, Any]] = []
     nba_team_rows: list[dict[str, Any]] = []
     defended_shot_events: list[dict[str, str]] = []
@@ -8495,25 +8893,6 @@ def aggregate_multi_match_report(
     defender_names: set[str] = set()
     shot_result_codes: set[str] = set()
 
-    stat_fields = [
-        "pts",
-        "fgm",
-        "fga",
-        "tpm",
-        "tpa",
-        "ftm",
-        "fta",
-        "+/-",
-        "or",
-        "dr",
-        "tr",
-        "ast",
-        "to",
-        "stl",
-        "blk",
-        "pf",
-    ]
-
     for game_data in loaded_games:
         matchid = game_data["matchid"]
         found = game_team_entry(game_data, selected_team_key)
@@ -8544,8 +8923,14 @@ def aggregate_multi_match_report(
         team_name = team_obj["name"]
         used_matches += 1
 
-        team_pts = team_obj["stats"]["total"]["pts"]
-        opp_pts = opp_obj["stats"]["total"]["pts"]
+        line = match_lines.get(matchid)
+        if line is None:
+            line = match_line(game_data, side)
+            lines = [player_line(player) for player in team_obj["players"]]
+        else:
+            lines = player_lines.get(matchid, [])
+        team_pts = line["pts"]
+        opp_pts = line["opp_pts"]
         result = "W" if team_pts > opp_pts else "L"
         tactic_group = nba_tactic_group(team_obj.get("tactics", {}).get("offense"))
         if result == "W":
@@ -8578,49 +8963,30 @@ def aggregate_multi_match_report(
             team_obj["players"],
             slot_map,
         )
-
-        for idx, player in enumerate(team_obj["players"]):
+        add_lineup_stints(lineup_map, game_data["lineup_stints"][side], slot_map)
+        events = stored_events.get(matchid)
+        if events is None:
+            events = [event_line(ev) for ev in game_data["events"] if ev["event_type"] in AGGREGATED_EVENTS]
+        shots = [
+            (ev["x"], ev["y"], ev["result"])
+            for ev in events
+            if ev["event_type"] == "shot" and int(ev["team"]) == side
+        ]
+        shot_games.append((matchid, shots, side))
+
+        for idx, player_row in enumerate(lines):
             if idx not in slot_map:
                 continue
             player_key, player_label = slot_map[idx]
-            totals = player["stats"]["total"]
+            totals = line_stats(player_row)
             entry = player_summary_map.setdefault(
                 player_key,
-                {
-                    "name": player_label,
-                    "gp": 0,
-                    "secs_pg": 0,
-                    "secs_sg": 0,
-                    "secs_sf": 0,
-                    "secs_pf": 0,
-                    "secs_c": 0,
-                    "pts": 0,
-                    "fgm": 0,
-                    "fga": 0,
-                    "tpm": 0,
-                    "tpa": 0,
-                    "ftm": 0,
-                    "fta": 0,
-                    "or": 0,
-                    "dr": 0,
-                    "tr": 0,
-                    "ast": 0,
-                    "to": 0,
-                    "stl": 0,
-                    "blk": 0,
-                    "pf": 0,
-                    "pm": 0,
-                },
+                {"name": player_label, "gp": 0, "secs": 0, **{field: 0 for field in totals}},
             )
             entry["gp"] += 1
-            entry["secs_pg"] += totals["secs_pg"]
-            entry["secs_sg"] += totals["secs_sg"]
-            entry["secs_sf"] += totals["secs_sf"]
-            entry["secs_pf"] += totals["secs_pf"]
-            entry["secs_c"] += totals["secs_c"]
-            for field in stat_fields:
-                target = "pm" if field == "+/-" else field
-                entry[target] += totals[field]
+            entry["secs"] += player_row["secs"]
+            for field, value in totals.items():
+                entry[field] += value
 
             matchup_map.setdefault(player_key, {"name": player_label, **matchup_stats()})
             defense_map.setdefault(player_key, {"name": player_label, **defense_stats()})
@@ -8632,64 +8998,42 @@ def aggregate_multi_match_report(
             if idx in slot_map and player.get("starter")
         }
         nba_match_rows: dict[str, dict[str, Any]] = {}
-        for idx, player in enumerate(team_obj["players"]):
+        for idx, player_row in enumerate(lines):
             if idx not in slot_map:
                 continue
             player_key, player_label = slot_map[idx]
-            totals = player["stats"]["total"]
-            total_secs = sum(int(totals.get(key, 0) or 0) for _, _, key in POSITION_SECONDS)
             row = empty_nba_player_row(matchid, result, tactic_group, player_label)
-            row.update(
-                {
-                    "mins": secs_to_minutes(total_secs),
-                    "pts": totals["pts"],
-                    "fgm": totals["fgm"],
-                    "fga": totals["fga"],
-                    "tpm": totals["tpm"],
-                    "tpa": totals["tpa"],
-                    "ftm": totals["ftm"],
-                    "fta": totals["fta"],
-                    "or": totals["or"],
-                    "dr": totals["dr"],
-                    "tr": totals["tr"],
-                    "ast": totals["ast"],
-                    "to": totals["to"],
-                    "stl": totals["stl"],
-                    "blk": totals["blk"],
-                    "pf": totals["pf"],
-                    "pm": totals["+/-"],
-                }
-            )
+            row.update({"mins": secs_to_minutes(player_row["secs"]), **line_stats(player_row)})
             nba_match_rows[player_key] = row
-        nba_team_rows.append(build_nba_team_row(matchid, result, tactic_group, team_obj, opp_obj))
+        nba_team_rows.append(build_nba_team_row(matchid, result, tactic_group, line))
 
         selected_score = 0
         opponent_score = 0
 
-        for ev in game_data["events"]:
+        for ev in events:
             if ev["event_type"] == "shot":
-                made = str(ev["shot_result"]) in {"1", "2", "5"}
-                shot_type = str(ev["shot_type"])
-                shot_result = str(ev["shot_result"])
+                shot_type = ev["code"]
+                shot_result = ev["result"]
+                made = shot_result in {"1", "2", "5"}
                 shot_type_codes.add(shot_type)
                 shot_result_codes.add(shot_result)
                 points = shot_points(shot_type)
-                clutch = nba_is_clutch(ev.get("gameclock"), selected_score, opponent_score)
+                clutch = nba_is_clutch(ev["gameclock"], selected_score, opponent_score)
                 counted_fg_attempt = shot_result != "4"
 
-                if int(ev["attacking_team"]) == side:
+                if int(ev["team"]) == side:
                     for player_key in slot_map.values():
                         add_shot_stat(
                             matchup_map[player_key[0]]["teamOn" if player_key[0] in active_keys else "teamOff"],
                             made,
                         )
 
-                    shooter_idx = normalize_slot(ev["attacker"], len(team_obj["players"]))
+                    shooter_idx = normalize_slot(ev["player"], len(team_obj["players"]))
                     if shooter_idx is not None and shooter_idx in slot_map:
                         shooter_key, _ = slot_map[shooter_idx]
                         shooter_stats = matchup_map[shooter_key]
 
-                        defender_idx = normalize_slot(ev["defender"], len(opp_obj["players"]))
+                        defender_idx = normalize_slot(ev["other"], len(opp_obj["players"]))
                         if defender_idx is not None:
                             add_shot_stat(shooter_stats["defended"], made)
                         else:
@@ -8718,7 +9062,7 @@ def aggregate_multi_match_report(
                                 add_nba_shot_split(nba_row["shots_mid"], made)
                             else:
                                 add_nba_shot_split(nba_row["shots_three"], made)
-                            defender_idx = normalize_slot(ev["defender"], len(opp_obj["players"]))
+                            defender_idx = normalize_slot(ev["other"], len(opp_obj["players"]))
                             add_nba_shot_split(nba_row["defended" if defender_idx is not None else "open"], made)
                             assistant_idx = normalize_slot(ev["assistant"], len(team_obj["players"]))
                             add_nba_shot_split(nba_row["assisted" if assistant_idx is not None else "unassisted"], made)
@@ -8741,7 +9085,7 @@ def aggregate_multi_match_report(
                                 if active_key in nba_match_rows:
                                     nba_match_rows[active_key]["clutch"]["pm"] += points
 
-                if int(ev["defending_team"]) == side:
+                if int(ev["team"]) != side:
                     for player_key in slot_map.values():
                         add_shot_stat(
                             defense_map[player_key[0]]["teamDefOn" if player_key[0] in active_keys else "teamDefOff"],
@@ -8751,7 +9095,7 @@ def aggregate_multi_match_report(
                         if nba_key in nba_match_rows:
                             add_nba_shot_split(nba_match_rows[nba_key]["team_def_on" if nba_key in active_keys else "team_def_off"], made)
 
-                    defender_idx = normalize_slot(ev["defender"], len(team_obj["players"]))
+                    defender_idx = normalize_slot(ev["other"], len(team_obj["players"]))
                     if defender_idx is not None and defender_idx in slot_map:
                         defender_key, defender_label = slot_map[defender_idx]
                         defender_names.add(defender_label)
@@ -8774,11 +9118,11 @@ def aggregate_multi_match_report(
                             else:
                                 add_nba_shot_split(nba_row["defended_three"], made)
 
-                        shooter_idx = normalize_slot(ev["attacker"], len(opp_obj["players"]))
+                        shooter_idx = normalize_slot(ev["player"], len(opp_obj["players"]))
                         shooter_name = (
                             opp_obj["players"][shooter_idx]["name"]
                             if shooter_idx is not None and shooter_idx < len(opp_obj["players"])
-                            else f'#{ev["attacker"]}'
+                            else f'#{ev["player"]}'
                         )
                         defended_shot_events.append(
                             {
@@ -8788,7 +9132,7 @@ def aggregate_multi_match_report(
                                 "opponent": opp_obj["name"],
                                 "shot_type": shot_type,
                                 "shot_result": shot_result,
-                                "comment": " ".join(ev.get("comments", [])) or "(no commentary)",
+                                "comment": ev["comment"] or "(no commentary)",
                             }
                         )
                     if clutch and made:
@@ -8797,7 +9141,7 @@ def aggregate_multi_match_report(
                                 nba_match_rows[active_key]["clutch"]["pm"] -= points
 
                 if made:
-                    if int(ev["attacking_team"]) == side:
+                    if int(ev["team"]) == side:
                         selected_score += points
                     else:
                         opponent_score += points
@@ -8805,10 +9149,10 @@ def aggregate_multi_match_report(
                 continue
 
             if ev["event_type"] == "free_throw":
-                made = is_nba_made_result(ev.get("shot_result"))
-                clutch = nba_is_clutch(ev.get("gameclock"), selected_score, opponent_score)
-                if int(ev["attacking_team"]) == side:
-                    shooter_idx = normalize_slot(ev["attacker"], len(team_obj["players"]))
+                made = is_nba_made_result(ev["result"])
+                clutch = nba_is_clutch(ev["gameclock"], selected_score, opponent_score)
+                if int(ev["team"]) == side:
+                    shooter_idx = normalize_slot(ev["player"], len(team_obj["players"]))
                     if clutch and shooter_idx is not None and shooter_idx in slot_map:
                         shooter_key, _ = slot_map[shooter_idx]
                         if shooter_key in nba_match_rows and made:
@@ -8828,18 +9172,18 @@ def aggregate_multi_match_report(
                         opponent_score += 1
                 continue
 
-            if ev["event_type"] == "interrupt" and int(ev["attacking_team"]) == side:
-                if clutch := nba_is_clutch(ev.get("gameclock"), selected_score, opponent_score):
-                    player_idx = normalize_slot(ev.get("attacker"), len(team_obj["players"]))
+            if ev["event_type"] == "interrupt" and int(ev["team"]) == side:
+                if clutch := nba_is_clutch(ev["gameclock"], selected_score, opponent_score):
+                    player_idx = normalize_slot(ev["player"], len(team_obj["players"]))
                     if player_idx is not None and player_idx in slot_map:
                         player_key, _ = slot_map[player_idx]
                         if player_key in nba_match_rows:
                             nba_match_rows[player_key]["clutch"]["to"] += 1
                 continue
 
-            if ev["event_type"] == "foul" and int(ev["attacking_team"]) == side and str(ev.get("foul_type")) == "803":
-                if clutch := nba_is_clutch(ev.get("gameclock"), selected_score, opponent_score):
-                    player_idx = normalize_slot(ev.get("attacker"), len(team_obj["players"]))
+            if ev["event_type"] == "foul" and int(ev["team"]) == side and ev["code"] == "803":
+                if clutch := nba_is_clutch(ev["gameclock"], selected_score, opponent_score):
+                    player_idx = normalize_slot(ev["player"], len(team_obj["players"]))
                     if player_idx is not None and player_idx in slot_map:
                         player_key, _ = slot_map[player_idx]
                         if player_key in nba_match_rows:
@@ -8847,10 +9191,10 @@ def aggregate_multi_match_report(
                 continue
 
             if ev["event_type"] == "sub" and int(ev["team"]) == side:
-                if str(ev["sub_type"]) == "9520":
+                if ev["code"] == "9520":
                     continue
-                player_in_idx = normalize_player_index(ev["player_in"], len(team_obj["players"]))
-                player_out_idx = normalize_player_index(ev["player_out"], len(team_obj["players"]))
+                player_in_idx = normalize_player_index(ev["player"], len(team_obj["players"]))
+                player_out_idx = normalize_player_index(ev["other"], len(team_obj["players"]))
                 if player_out_idx is not None and player_out_idx in slot_map:
                     active_keys.discard(slot_map[player_out_idx][0])
                 if player_in_idx is not None and player_in_idx in slot_map:
@@ -8870,20 +9214,25 @@ def aggregate_multi_match_report(
 
     match_rows.sort(key=lambda row: row.get("start_time", ""), reverse=True)
 
+    # The heatmap bins only the submitted matches. A known season also
+    # accumulates them into the cached season grid, offered as a season view.
+    shot_grid = ShotGrid()
+    for matchid, shots, side in shot_games:
+        shot_grid.add_shots(matchid, shots, side)
+    shot_heatmap = shot_heatmap_json(shot_grid)
+    if season:
+        with SHOT_GRID_CACHE.lock:
+            season_grid = SHOT_GRID_CACHE.update(selected_team_key, season, shot_games)
+            if season_grid.matchids - shot_grid.matchids:
+                shot_heatmap["season"] = {"season": season, **shot_heatmap_json(season_grid)}
+
     player_summary = []
     for entry in player_summary_map.values():
-        total_secs = (
-            entry["secs_pg"]
-            + entry["secs_sg"]
-            + entry["secs_sf"]
-            + entry["secs_pf"]
-            + entry["secs_c"]
-        )
         player_summary.append(
             {
                 "name": entry["name"],
                 "gp": entry["gp"],
-                "mins": secs_to_minutes(total_secs),
+                "mins": secs_to_minutes(entry["secs"]),
                 "pts": entry["pts"],
                 "fgm": entry["fgm"],
                 "fga": entry["fga"],
@@ -8970,6 +9319,9 @@ def aggregate_multi_match_report(
                 "team_schedule_types": list(team_schedule_types or DEFAULT_TEAM_SCHEDULE_TYPES),
             },
             "tactic_minutes": finalize_tactic_minutes(tactic_minutes),
+            "lineups": finalize_lineups(lineup_map),
+            "shot_heatmap": shot_heatmap,
+            "season_summary": season_summary(selected_team_key, season) if season else None,
             "player_summary": player_summary,
             "matchup": matchup_rows,
             "defense": defense_rows,
@@ -8991,6 +9343,28 @@ def aggregate_multi_match_report(
     )
 
 
+def shot_heatmap_json(grid: ShotGrid) -> dict[str, Any]:
+    return {
+        "image": image_data_url(grid.render()),
+        "matches": len(grid.matchids),
+        "attempts": sum(grid.attempts),
+    }
+
+
+def image_data_url(img) -> str:
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    data = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return f"data:image/png;base64,{data}"
+
+
+@lru_cache(maxsize=None)
+def get_warehouse() -> Warehouse:
+    """Played multi-match reports, stored once and read back on later
+    requests. Opened on first use, not when the module is imported."""
+    return Warehouse(CACHE_DIR / "warehouse.sqlite3")
+
+
 def get_court_image_data_url() -> str:
     court_path = Path(__file__).with_name("court.png")
     if not court_path.exists():
@@ -9251,14 +9625,20 @@ def report() -> tuple[str, int] | str:
         return render_template_string(PBP_RESULT_HTML, result=result)
 
     try:
-        report_json = generate_report(matchid, username, password)
+        report_json = generate_report(
+            matchid,
+            username,
+            password,
+            keyframe_every=ANIMATION_KEYFRAME_EVERY if mode == "animation" else 0,
+        )
     except Exception as exc:
         return form_error(f"Failed to generate report: {exc}", 500, keep_password=False)
 
     if mode == "animation":
         return render_template_string(
             ANIMATION_REPORT_HTML,
-            report_json=report_json,
+            report_json=compact(report_json),
+            expand_game_data_js=EXPAND_GAME_DATA_JS,
             matchid=matchid,
             username=username,
             court_image_url=get_court_image_data_url(),
@@ -9266,7 +9646,8 @@ def report() -> tuple[str, int] | str:
 
     return render_template_string(
         REPORT_HTML,
-        report_json=report_json,
+        report_json=compact(report_json),
+        expand_game_data_js=EXPAND_GAME_DATA_JS,
         matchid=matchid,
         username=username,
         password=password,